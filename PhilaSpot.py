@@ -3,14 +3,27 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from datetime import datetime, timedelta
 import json
-from geopy.distance import geodesic
 import folium
+from folium.plugins import HeatMap
 from streamlit_folium import st_folium
-import hashlib
+import uuid
+import io
 from typing import Dict, List, Tuple
 import time
+from walking_network import straight_line_minutes
+from metrics import REGISTRY, span, timed
+from live_feed import LiveFeedManager
+from report_io import detect_format, export_to_tempfile
+from hot_reload import DatasetReloader
+from parking_core import (
+    ComprehensiveParkingAPI, ComprehensiveParkingDatabase, load_database_progressively, load_resident_database
+)
+from partitions import PartitionedInventory
+from report_log import REPORTS_PER_PAGE
+from timeseries import OccupancySampler
 
 # Page configuration
 st.set_page_config(
@@ -76,8 +89,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'user_reports' not in st.session_state:
-    st.session_state.user_reports = []
 if 'selected_parking' not in st.session_state:
     st.session_state.selected_parking = None
 if 'database_loaded' not in st.session_state:
@@ -90,517 +101,57 @@ if 'user_preferences' not in st.session_state:
         'needs_handicap': False
     }
 
-class ComprehensiveParkingDatabase:
-    def __init__(self):
-        self.garages_lots = self._load_garages_lots()
-        self.parking_meters = self._load_parking_meters()
-        self.permit_zones = self._load_permit_zones()
-        self.destinations = self._load_destinations()
-        self.user_reports = []
-        
-    @st.cache_data
-    def _load_garages_lots(_self):
-        real_ppa_facilities = [
-            {"name": "8th & Race Garage", "lat": 39.9565, "lon": -75.1525, "operator": "PPA", "type": "garage"},
-            {"name": "2nd & Lombard Garage", "lat": 39.9387, "lon": -75.1436, "operator": "PPA", "type": "garage"},
-            {"name": "11th & Vine Garage", "lat": 39.9587, "lon": -75.1578, "operator": "PPA", "type": "garage"},
-            {"name": "AutoPark at the Bell", "lat": 39.9496, "lon": -75.1503, "operator": "PPA", "type": "garage"},
-            {"name": "Convention Center Garage", "lat": 39.9553, "lon": -75.1596, "operator": "PPA", "type": "garage"},
-            {"name": "Independence Mall Garage", "lat": 39.9496, "lon": -75.1470, "operator": "PPA", "type": "garage"},
-            {"name": "University City Garage", "lat": 39.9522, "lon": -75.1932, "operator": "UPHS", "type": "garage"},
-            {"name": "Temple University Garage", "lat": 39.9812, "lon": -75.1567, "operator": "Temple", "type": "garage"},
-            {"name": "Art Museum Garage", "lat": 39.9656, "lon": -75.1810, "operator": "PMA", "type": "garage"},
-            {"name": "Fashion District Garage", "lat": 39.9520, "lon": -75.1598, "operator": "Private", "type": "garage"},
-        ]
-        
-        garages_data = []
-        for i, facility in enumerate(real_ppa_facilities):
-            # Assign actual rates
-            if facility["name"] == "8th & Race Garage":
-                hourly_rate = 12
-                daily_max = 17
-            elif facility["name"] == "2nd & Lombard Garage":
-                hourly_rate = 6  # approx $3/30min
-                daily_max = 25
-            elif facility["name"] == "11th & Vine Garage":
-                hourly_rate = 12
-                daily_max = 18
-            elif facility["name"] == "AutoPark at the Bell":
-                hourly_rate = 14
-                daily_max = 32
-            elif facility["name"] == "Convention Center Garage":
-                hourly_rate = 17
-                daily_max = 40
-            elif facility["name"] == "Independence Mall Garage":
-                hourly_rate = 14
-                daily_max = 32
-            elif facility["name"] == "University City Garage":
-                hourly_rate = 15.95
-                daily_max = 30  # approximate
-            elif facility["name"] == "Temple University Garage":
-                hourly_rate = 7
-                daily_max = 22
-            elif facility["name"] == "Art Museum Garage":
-                hourly_rate = 10  # evening flat rate
-                daily_max = 39
-            elif facility["name"] == "Fashion District Garage":
-                hourly_rate = 10
-                daily_max = 35
-            else:
-                hourly_rate = 5
-                daily_max = 20
-            
-            base_capacity = 400 if facility["operator"] == "PPA" else 200
-            available_spots = max(1, int(base_capacity * 0.5))  # just placeholder
-            
-            garages_data.append({
-                "id": f"facility_{i+1}",
-                "name": facility["name"],
-                "type": facility["type"],
-                "operator": facility["operator"],
-                "latitude": facility["lat"],
-                "longitude": facility["lon"],
-                "total_spots": base_capacity,
-                "available_spots": available_spots,
-                "hourly_rate": round(hourly_rate, 2),
-                "daily_max": round(daily_max, 2),
-                "hours_operation": "24/7" if facility["operator"] == "PPA" else "6AM-11PM",
-                "features": ["covered", "24_hour_access", "security", "handicap_accessible"],
-                "payment_methods": ["cash", "credit_card", "mobile_app"],
-                "phone": f"215-683-{1000 + i}",
-                "address": f"{facility['name'].split()[0]} Street, Philadelphia, PA",
-                "last_updated": datetime.now()
-            })
-        
-        return pd.DataFrame(garages_data)
+# Initialize the comprehensive system
+@st.cache_resource
+def initialize_comprehensive_system():
+    partitions = PartitionedInventory.from_environment()
+    if partitions is not None:
+        # Meters and permit blocks load tile by tile as searches and the map reach them.
+        return ComprehensiveParkingAPI(load_resident_database(), partitions), None
+    # Garages are searchable as soon as they load; meters and permit blocks follow as a reload.
+    database, complete = load_database_progressively()
+    return ComprehensiveParkingAPI(database), complete
 
-    @st.cache_data
-    def _load_parking_meters(_self):
-        np.random.seed(43)
-        
-        metered_streets = [
-            {"street": "Market St", "from_block": 400, "to_block": 2000, "base_lat": 39.9526, "base_lon": -75.1652, "zone": "Center City Core", "rate": 4.00},
-            {"street": "Chestnut St", "from_block": 400, "to_block": 2000, "base_lat": 39.9489, "base_lon": -75.1634, "zone": "Center City Core", "rate": 4.00},
-            {"street": "Walnut St", "from_block": 400, "to_block": 2000, "base_lat": 39.9467, "base_lon": -75.1632, "zone": "Center City Core", "rate": 4.00},
-            {"street": "Spring Garden St", "from_block": 200, "to_block": 2400, "base_lat": 39.9611, "base_lon": -75.1580, "zone": "Center City Area", "rate": 3.50},
-            {"street": "Delaware Ave", "from_block": 100, "to_block": 1200, "base_lat": 39.9530, "base_lon": -75.1403, "zone": "Long-term", "rate": 2.50},
-            {"street": "2nd St", "from_block": 2100, "to_block": 2800, "base_lat": 39.9676, "base_lon": -75.1427, "zone": "Northern Liberties", "rate": 2.00},
-        ]
-        
-        meters_data = []
-        meter_id_counter = 1000000
-        
-        for street_info in metered_streets:
-            num_meters = np.random.randint(8, 15)
-            
-            for i in range(num_meters):
-                block = np.random.randint(street_info["from_block"], street_info["to_block"])
-                block_offset = (block - street_info["from_block"]) / (street_info["to_block"] - street_info["from_block"])
-                lat_variation = np.random.uniform(-0.008, 0.008) * block_offset
-                lon_variation = np.random.uniform(-0.008, 0.008) * block_offset
-                
-                zone_description = {
-                    "Center City Core": "Arch to Locust St, 4th to 20th St",
-                    "Center City Area": "Spring Garden to Bainbridge St, River to River",
-                    "Long-term": "4-hour and 12-hour time limits",
-                    "Northern Liberties": "Northern Liberties neighborhood",
-                }.get(street_info["zone"], street_info["zone"])
-                
-                meters_data.append({
-                    "id": f"meter_{meter_id_counter}",
-                    "meter_number": str(meter_id_counter),
-                    "street_name": street_info["street"],
-                    "block_number": str(block),
-                    "side": np.random.choice(["North", "South", "East", "West"]),
-                    "latitude": street_info["base_lat"] + lat_variation,
-                    "longitude": street_info["base_lon"] + lon_variation,
-                    "rate_per_hour": street_info["rate"],
-                    "time_limit_hours": np.random.choice([1, 2, 4]),
-                    "enforcement_days": "MON-SAT",
-                    "enforcement_start": "08:00",
-                    "enforcement_end": "20:00",
-                    "meter_type": np.random.choice(["single_space", "multi_space"]),
-                    "payment_methods": ["coin", "credit_card", "mobile_app"],
-                    "operational_status": np.random.choice(["active", "out_of_order"], p=[0.95, 0.05]),
-                    "zone": street_info["zone"],
-                    "zone_description": zone_description,
-                    "mobile_zone_number": f"91{np.random.randint(1000, 9999)}"
-                })
-                
-                meter_id_counter += 1
-        
-        return pd.DataFrame(meters_data)
-    
-    @st.cache_data  
-    def _load_permit_zones(_self):
-        np.random.seed(44)
-        
-        neighborhoods = [
-            {"name": "Center City East", "zone": "A", "base_lat": 39.9500, "base_lon": -75.1500, "permit_cost": 35},
-            {"name": "Center City West", "zone": "B", "base_lat": 39.9500, "base_lon": -75.1700, "permit_cost": 35},
-            {"name": "Northern Liberties", "zone": "C", "base_lat": 39.9676, "base_lon": -75.1427, "permit_cost": 35},
-            {"name": "South Philadelphia", "zone": "D", "base_lat": 39.9200, "base_lon": -75.1600, "permit_cost": 35},
-            {"name": "University City", "zone": "E", "base_lat": 39.9522, "base_lon": -75.1932, "permit_cost": 35},
-            {"name": "Fishtown", "zone": "F", "base_lat": 39.9676, "base_lon": -75.1300, "permit_cost": 35},
-        ]
-        
-        permit_data = []
-        
-        for neighborhood in neighborhoods:
-            num_blocks = np.random.randint(15, 25)
-            
-            for i in range(num_blocks):
-                street_name = f"{np.random.choice(['N', 'S'])} {np.random.randint(2, 25)}th St"
-                block_number = str(np.random.randint(100, 2800))
-                
-                lat_offset = np.random.uniform(-0.015, 0.015)
-                lon_offset = np.random.uniform(-0.015, 0.015)
-                
-                permit_required = np.random.choice([True, False], p=[0.8, 0.2])
-                
-                time_restrictions = np.random.choice([
-                    "8AM-6PM Mon-Fri",
-                    "8AM-8PM Mon-Sat",
-                    "6PM-8AM Daily (Overnight Only)"
-                ], p=[0.5, 0.3, 0.2])
-                
-                if permit_required:
-                    visitor_allowed = np.random.choice([True, False], p=[0.7, 0.3])
-                    max_visitor_hours = np.random.choice([2, 3, 4]) if visitor_allowed else 0
-                else:
-                    visitor_allowed = True
-                    max_visitor_hours = 999
-                
-                permit_data.append({
-                    "id": f"permit_{neighborhood['zone']}_{i+1}",
-                    "neighborhood": neighborhood["name"],
-                    "permit_zone": f"Zone {neighborhood['zone']}",
-                    "street_name": street_name,
-                    "block_number": block_number,
-                    "block_side": np.random.choice(["Both", "North", "South", "East", "West"]),
-                    "latitude": neighborhood["base_lat"] + lat_offset,
-                    "longitude": neighborhood["base_lon"] + lon_offset,
-                    "permit_required": permit_required,
-                    "permit_type": f"Residential Zone {neighborhood['zone']}" if permit_required else "No Permit Required",
-                    "permit_cost_annual": neighborhood["permit_cost"] if permit_required else 0,
-                    "time_restrictions": time_restrictions,
-                    "visitor_parking_allowed": visitor_allowed,
-                    "max_visitor_hours": max_visitor_hours,
-                    "estimated_spaces": np.random.randint(12, 28),
-                    "last_updated": datetime.now() - timedelta(days=np.random.randint(1, 30))
-                })
-        
-        return pd.DataFrame(permit_data)
+def build_next_database():
+    if api.partitions is not None:
+        return load_resident_database()
+    return ComprehensiveParkingDatabase()
 
-    def _load_destinations(self):
-        return {
-            "Independence Hall": {
-                "lat": 39.9496, "lon": -75.1503, "parking": "none", 
-                "category": "historic", "description": "Birthplace of America - no on-site parking"
-            },
-            "Liberty Bell Center": {
-                "lat": 39.9496, "lon": -75.1503, "parking": "none",
-                "category": "historic", "description": "Iconic symbol - no on-site parking"
-            },
-            "Philadelphia Art Museum": {
-                "lat": 39.9656, "lon": -75.1810, "parking": "limited_paid",
-                "category": "museum", "description": "World-class art museum - limited paid parking"
-            },
-            "Reading Terminal Market": {
-                "lat": 39.9526, "lon": -75.1596, "parking": "garage_nearby",
-                "category": "food", "description": "Historic food market - nearby parking garages"
-            },
-            "Citizens Bank Park": {
-                "lat": 39.9061, "lon": -75.1665, "parking": "stadium_lots",
-                "category": "sports", "description": "Phillies stadium - large parking lots available"
-            },
-            "Lincoln Financial Field": {
-                "lat": 39.9008, "lon": -75.1675, "parking": "stadium_lots", 
-                "category": "sports", "description": "Eagles stadium - extensive parking"
-            },
-            "Wells Fargo Center": {
-                "lat": 39.9012, "lon": -75.1720, "parking": "stadium_lots",
-                "category": "sports", "description": "76ers/Flyers arena - ample parking"
-            },
-            "University of Pennsylvania": {
-                "lat": 39.9522, "lon": -75.1932, "parking": "garage_available",
-                "category": "university", "description": "Ivy League university - parking garages available"
-            },
-            "Temple University": {
-                "lat": 39.9812, "lon": -75.1567, "parking": "garage_available",
-                "category": "university", "description": "Major university - multiple parking options"
-            },
-            "Hospital of the University of Pennsylvania": {
-                "lat": 39.9496, "lon": -75.1924, "parking": "garage_available",
-                "category": "hospital", "description": "Major hospital - patient/visitor parking"
-            },
-            "Rittenhouse Square": {
-                "lat": 39.9496, "lon": -75.1719, "parking": "meter_street",
-                "category": "shopping", "description": "Upscale shopping district - metered street parking"
-            },
-            "Fashion District Philadelphia": {
-                "lat": 39.9520, "lon": -75.1598, "parking": "mall_garage",
-                "category": "shopping", "description": "Major shopping center - parking garage included"
-            },
-            "30th Street Station": {
-                "lat": 39.9558, "lon": -75.1819, "parking": "limited_expensive",
-                "category": "transportation", "description": "Major train station - limited expensive parking"
-            },
-            "South Street": {
-                "lat": 39.9413, "lon": -75.1582, "parking": "meter_street",
-                "category": "entertainment", "description": "Entertainment district - metered parking"
-            },
-            "Old City": {
-                "lat": 39.9500, "lon": -75.1450, "parking": "meter_limited",
-                "category": "historic", "description": "Historic district - limited metered parking"
-            },
-            "Northern Liberties": {
-                "lat": 39.9676, "lon": -75.1427, "parking": "street_some_permit",
-                "category": "neighborhood", "description": "Trendy neighborhood - mix of street parking"
-            }
-        }
+@st.cache_resource
+def start_metrics_endpoint():
+    return REGISTRY.serve()
 
-class AdvancedParkingPredictor:
-    def __init__(self, database):
-        self.database = database
-        
-    def predict_availability(self, location_type: str, location_id: str, target_datetime: datetime, user_reports: List = None) -> Dict:
-        hour = target_datetime.hour
-        day_of_week = target_datetime.weekday()
-        is_weekend = day_of_week >= 5
-        
-        base_patterns = {
-            "garage": {
-                "weekday": {7: 0.2, 8: 0.1, 9: 0.15, 10: 0.3, 11: 0.25, 12: 0.2, 13: 0.2, 14: 0.25, 15: 0.3, 16: 0.25, 17: 0.1, 18: 0.15, 19: 0.4, 20: 0.6, 21: 0.7, 22: 0.8},
-                "weekend": {8: 0.6, 9: 0.5, 10: 0.4, 11: 0.3, 12: 0.2, 13: 0.2, 14: 0.25, 15: 0.3, 16: 0.4, 17: 0.5, 18: 0.6, 19: 0.7, 20: 0.8, 21: 0.8, 22: 0.9}
-            },
-            "meter": {
-                "weekday": {8: 0.2, 9: 0.1, 10: 0.15, 11: 0.1, 12: 0.05, 13: 0.1, 14: 0.15, 15: 0.2, 16: 0.3, 17: 0.1, 18: 0.2, 19: 0.4, 20: 0.8},
-                "weekend": {9: 0.7, 10: 0.6, 11: 0.5, 12: 0.3, 13: 0.2, 14: 0.25, 15: 0.4, 16: 0.5, 17: 0.6, 18: 0.7, 19: 0.8, 20: 0.9}
-            }
-        }
-        
-        pattern_type = "weekend" if is_weekend else "weekday"
-        base_availability = base_patterns.get(location_type, {}).get(pattern_type, {}).get(hour, 0.5)
-        
-        confidence = "low"
-        if user_reports:
-            recent_reports = [r for r in user_reports if r.get('location_id') == location_id and 
-                            (datetime.now() - r.get('timestamp', datetime.now())).total_seconds() < 3600]
-            
-            if recent_reports:
-                available_reports = sum(1 for r in recent_reports if r.get('status') in ['available', 'limited'])
-                total_reports = len(recent_reports)
-                
-                if total_reports >= 3:
-                    confidence = "high"
-                    user_availability = available_reports / total_reports
-                    base_availability = 0.3 * base_availability + 0.7 * user_availability
-                elif total_reports >= 1:
-                    confidence = "medium"
-        
-        return {
-            "availability": max(0.05, min(0.95, base_availability)),
-            "confidence": confidence,
-            "factors": {
-                "time_of_day": hour,
-                "day_type": pattern_type,
-                "user_reports": len(user_reports) if user_reports else 0
-            }
-        }
+@st.cache_resource
+def start_live_feeds(_database):
+    feeds = LiveFeedManager.from_environment(_database)
+    if feeds:
+        feeds.start()
+    return feeds
 
-class ComprehensiveParkingAPI:
-    def __init__(self, database):
-        self.database = database
-        self.predictor = AdvancedParkingPredictor(database)
-    
-    def find_parking_near_destination(self, destination: str, radius_miles: float = 1.0, user_preferences: Dict = None) -> Dict:
-        if destination not in self.database.destinations:
-            return {"error": "Destination not found"}
-        
-        dest_info = self.database.destinations[destination]
-        dest_lat, dest_lon = dest_info["lat"], dest_info["lon"]
-        
-        nearby_options = {
-            "garages_lots": [],
-            "meters": [],
-            "permit_zones": []
-        }
-        
-        # Find nearby garages and lots
-        for _, location in self.database.garages_lots.iterrows():
-            distance = geodesic((dest_lat, dest_lon), (location.latitude, location.longitude)).miles
-            if distance <= radius_miles:
-                
-                if user_preferences:
-                    if user_preferences.get('needs_ev_charging') and 'ev_charging' not in location.features:
-                        continue
-                    if user_preferences.get('needs_handicap') and 'handicap_accessible' not in location.features:
-                        continue
-                
-                prediction = self.predictor.predict_availability(
-                    location.type, location.id, datetime.now(), st.session_state.user_reports
-                )
-                
-                nearby_options["garages_lots"].append({
-                    "id": location.id,
-                    "name": location['name'],
-                    "type": location.type,
-                    "operator": location.operator,
-                    "distance": round(distance, 2),
-                    "total_spots": location.total_spots,
-                    "available_spots": location.available_spots,
-                    "hourly_rate": location.hourly_rate,
-                    "daily_max": location.daily_max,
-                    "hours": location.hours_operation,
-                    "features": location.features,
-                    "payment_methods": location.payment_methods,
-                    "phone": location.phone,
-                    "coordinates": [location.latitude, location.longitude],
-                    "prediction": prediction
-                })
-        
-        # Find nearby meters
-        for _, meter in self.database.parking_meters.iterrows():
-            distance = geodesic((dest_lat, dest_lon), (meter.latitude, meter.longitude)).miles
-            if distance <= radius_miles and meter.operational_status == "active":
-                
-                prediction = self.predictor.predict_availability(
-                    "meter", meter.id, datetime.now(), st.session_state.user_reports
-                )
-                
-                nearby_options["meters"].append({
-                    "id": meter.id,
-                    "street": meter.street_name,
-                    "block": meter.block_number,
-                    "side": meter.side,
-                    "distance": round(distance, 2),
-                    "rate": meter.rate_per_hour,
-                    "time_limit": meter.time_limit_hours,
-                    "enforcement_days": meter.enforcement_days,
-                    "enforcement_hours": f"{meter.enforcement_start}-{meter.enforcement_end}",
-                    "payment_methods": meter.payment_methods,
-                    "coordinates": [meter.latitude, meter.longitude],
-                    "prediction": prediction,
-                    "zone": meter.zone,
-                    "zone_description": meter.zone_description,
-                    "mobile_zone_number": meter.mobile_zone_number
-                })
-        
-        # Find nearby permit zones
-        for _, zone in self.database.permit_zones.iterrows():
-            distance = geodesic((dest_lat, dest_lon), (zone.latitude, zone.longitude)).miles
-            if distance <= radius_miles:
-                
-                prediction = self.predictor.predict_availability(
-                    "permit", zone.id, datetime.now(), st.session_state.user_reports
-                )
-                
-                nearby_options["permit_zones"].append({
-                    "id": zone.id,
-                    "neighborhood": zone.neighborhood,
-                    "street": zone.street_name,
-                    "block": zone.block_number,
-                    "distance": round(distance, 2),
-                    "permit_required": zone.permit_required,
-                    "permit_zone": zone.permit_zone,
-                    "restrictions": zone.time_restrictions,
-                    "visitor_allowed": zone.visitor_parking_allowed,
-                    "max_visitor_hours": zone.max_visitor_hours,
-                    "estimated_spaces": zone.estimated_spaces,
-                    "coordinates": [zone.latitude, zone.longitude],
-                    "prediction": prediction
-                })
-        
-        for category in nearby_options:
-            nearby_options[category].sort(key=lambda x: x["distance"])
-        
-        return {
-            "destination": destination,
-            "destination_info": dest_info,
-            "search_radius": radius_miles,
-            "parking_options": nearby_options,
-            "total_found": sum(len(options) for options in nearby_options.values())
-        }
-    
-    def add_user_report(self, location_id: str, location_type: str, status: str, notes: str = "") -> bool:
-        report = {
-            "id": len(st.session_state.user_reports) + 1,
-            "location_id": location_id,
-            "location_type": location_type,
-            "status": status,
-            "notes": notes,
-            "timestamp": datetime.now(),
-            "user_session": hashlib.md5(str(id(st.session_state)).encode()).hexdigest()[:8]
-        }
-        
-        st.session_state.user_reports.append(report)
-        return True
-    
-    def get_reports_summary(self, location_id: str, hours_back: int = 6) -> Dict:
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
-        recent_reports = [
-            r for r in st.session_state.user_reports
-            if r["location_id"] == location_id and r["timestamp"] > cutoff_time
-        ]
-        
-        if not recent_reports:
-            return {"status": "unknown", "confidence": "none", "report_count": 0, "trend": "stable"}
-        
-        status_counts = {}
-        for report in recent_reports:
-            status = report["status"]
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
-        most_common = max(status_counts.items(), key=lambda x: x[1])
-        
-        confidence = "low"
-        if len(recent_reports) >= 5:
-            confidence = "high"
-        elif len(recent_reports) >= 2:
-            confidence = "medium"
-        
-        return {
-            "status": most_common[0],
-            "confidence": confidence,
-            "report_count": len(recent_reports),
-            "status_breakdown": status_counts,
-            "trend": "stable"
-        }
-    
-    def get_parking_analytics(self) -> Dict:
-        total_garage_spots = self.database.garages_lots['total_spots'].sum()
-        available_garage_spots = self.database.garages_lots['available_spots'].sum()
-        
-        return {
-            "total_locations": {
-                "garages_lots": len(self.database.garages_lots),
-                "meters": len(self.database.parking_meters),
-                "permit_zones": len(self.database.permit_zones)
-            },
-            "garage_occupancy": {
-                "total_spots": int(total_garage_spots),
-                "available_spots": int(available_garage_spots),
-                "occupancy_rate": round((1 - available_garage_spots/total_garage_spots) * 100, 1)
-            },
-            "user_engagement": {
-                "total_reports": len(st.session_state.user_reports),
-                "reports_last_hour": len([r for r in st.session_state.user_reports 
-                                        if (datetime.now() - r["timestamp"]).total_seconds() < 3600])
-            },
-            "popular_destinations": list(self.database.destinations.keys())[:10]
-        }
+@st.cache_resource
+def start_history_sampler(_api):
+    sampler = OccupancySampler(_api.history, lambda: _api.database)
+    sampler.start()
+    return sampler
 
-# Initialize the comprehensive system
 @st.cache_resource
-def initialize_comprehensive_system():
-    database = ComprehensiveParkingDatabase()
-    api = ComprehensiveParkingAPI(database)
-    return database, api
+def start_dataset_reloader(_api, _live_feeds, _startup_load):
+    reloader = DatasetReloader(_api, build_next_database)
+    if _live_feeds:
+        reloader.on_swap(lambda database: setattr(_live_feeds, "database", database))
+    if _startup_load is not None:
+        reloader.adopt_when_ready(_startup_load)
+    return reloader
 
 # Initialize system
 try:
-    database, api = initialize_comprehensive_system()
+    api, startup_load = initialize_comprehensive_system()
+    # Each rerun reads the current inventory version once; a reload swaps in the next for later reruns.
+    database = api.database
+    metrics_url = start_metrics_endpoint()
+    live_feeds = start_live_feeds(database)
+    reloader = start_dataset_reloader(api, live_feeds, startup_load)
+    start_history_sampler(api)
     st.session_state.database_loaded = True
 except Exception as e:
     st.error(f"Error initializing system: {str(e)}")
@@ -616,6 +167,10 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+if database.pending_sources:
+    still_loading = ", ".join(name.replace("_", " ") for name in database.pending_sources)
+    st.info(f"⏳ Still loading {still_loading} — garage results are live; the rest appear on your next search.")
+
 # Sidebar
 with st.sidebar:
     st.header("🎯 Find Parking")
@@ -643,7 +198,7 @@ with st.sidebar:
     )
     
     if destination_input == "":
-        custom_destination = st.text_input("Or enter custom location:")
+        custom_destination = st.text_input("Or enter custom location:", help="A place name, or coordinates as `lat, lon`")
         if custom_destination:
             destination_input = custom_destination
     
@@ -655,6 +210,8 @@ with st.sidebar:
         target_time = st.time_input("Time:", datetime.now().time())
     
     target_datetime = datetime.combine(target_date, target_time)
+    stay_hours = st.slider("How long? (hours):", 0.5, 12.0, 2.0, 0.5)
+    legal_only = st.checkbox("Only show spots legal for my stay", value=True)
     
     st.subheader("⚙️ Preferences")
     
@@ -679,106 +236,375 @@ with st.sidebar:
         'needs_ev_charging': needs_ev,
         'needs_handicap': needs_handicap,
         'needs_covered': needs_covered,
-        'needs_security': needs_security
+        'needs_security': needs_security,
+        'legal_only': legal_only
     })
     
     sort_by = st.selectbox(
         "Sort results by:",
-        ["Distance", "Price (Low to High)", "Availability", "User Reports"]
+        ["Recommended", "Distance", "Price (Low to High)", "Availability", "User Reports"],
+        help="Recommended weighs each option by the space it has left, so drivers headed to the same place spread out"
+    )
+
+def parse_coordinates(text: str):
+    parts = text.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    return (lat, lon) if -90 <= lat <= 90 and -180 <= lon <= 180 else None
+
+def session_fingerprint() -> str:
+    # id(st.session_state) is the same proxy object for every browser session; holds need one id per session.
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:8]
+    return st.session_state.session_id
+
+def submit_card_report(option: Dict):
+    success = api.add_user_report(
+        option['id'], option['category'],
+        st.session_state[f"status_{option['id']}"], st.session_state[f"notes_{option['id']}"],
+        user_session=session_fingerprint()
     )
+    if success:
+        st.session_state[f"show_report_{option['id']}"] = False
+        st.session_state[f"report_sent_{option['id']}"] = True
+    else:
+        st.session_state[f"report_failed_{option['id']}"] = True
+
+@st.fragment
+def render_report_form(option: Dict):
+    if st.session_state.pop(f"report_sent_{option['id']}", False):
+        st.success("✅ Report submitted!")
+    if st.session_state.pop(f"report_failed_{option['id']}", False):
+        st.error("Reports are backed up right now. Please try again in a moment.")
+    
+    if st.button(f"📝 Report", key=f"report_{option['id']}"):
+        st.session_state[f"show_report_{option['id']}"] = True
+    
+    if st.session_state.get(f"show_report_{option['id']}", False):
+        st.markdown("---")
+        with st.form(f"report_form_{option['id']}"):
+            st.write("**Quick Status Report:**")
+            status_col1, status_col2 = st.columns(2)
+            with status_col1:
+                st.selectbox(
+                    "Current Status:",
+                    ["available", "limited", "full", "out_of_order"],
+                    key=f"status_{option['id']}"
+                )
+            with status_col2:
+                st.text_input("Notes (optional):", key=f"notes_{option['id']}")
+            
+            # The callback runs before the fragment reruns, so the form closes without st.rerun().
+            st.form_submit_button("Submit Report", on_click=submit_card_report, args=(option,))
+
+
+@st.fragment
+@timed("render.fragment.parking_results")
+def render_parking_results(options: List[Dict], stay_hours: float):
+    summaries = api.get_reports_summaries([option["id"] for option in options])
+    for i, option in enumerate(options):
+        reports = summaries[option["id"]]
+        
+        availability = option["prediction"]["availability"]
+        if availability > 0.7:
+            avail_class = "high"
+            status_icon = "🟢"
+        elif availability > 0.4:
+            avail_class = "medium"
+            status_icon = "🟡"
+        else:
+            avail_class = "low"
+            status_icon = "🔴"
+        
+        with st.container():
+            st.markdown(f'<div class="parking-card availability-{avail_class}">', unsafe_allow_html=True)
+            
+            col_h1, col_h2 = st.columns([3, 1])
+            with col_h1:
+                if option["category"] == "garage_lot":
+                    title = f"{status_icon} {option['name']}"
+                elif option["category"] == "meter":
+                    title = f"{status_icon} Meter - {option['street']} (Block {option['block']})"
+                else:
+                    title = f"{status_icon} Street - {option['street']} ({option['neighborhood']})"
+                
+                st.markdown(f"**{title}**")
+            
+            with col_h2:
+                st.markdown(f"**{option['distance']} mi**")
+                if option.get('walk_minutes') is not None:
+                    st.caption(f"🚶 {option['walk_minutes']:.0f} min walk")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.write(f"**Type**: {option['category'].replace('_', '/').title()}")
+                
+                if option["category"] == "garage_lot":
+                    st.write(f"**Available**: {option.get('available_spots', '?')}/{option.get('total_spots', '?')}")
+                    if option.get('held'):
+                        st.caption(f"🔒 {option['held']} held by other drivers")
+                    st.write(f"**Operator**: {option.get('operator', 'Unknown')}")
+                elif option["category"] == "meter":
+                    st.write(f"**Time Limit**: {option['time_limit']}hr")
+                    st.write(f"**Zone**: {option['zone']}")
+                else:
+                    permit_text = "Required" if option.get('permit_required') else "Not Required"
+                    st.write(f"**Permit**: {permit_text}")
+            
+            with col2:
+                st.write(f"**AI Prediction**: {availability:.0%}")
+                st.write(f"**Confidence**: {option['prediction']['confidence'].title()}")
+                
+                if option["category"] == "garage_lot":
+                    st.write(f"**Hours**: {option.get('hours', 'Unknown')}")
+                elif option["category"] == "permit":
+                    if option.get('visitor_allowed'):
+                        st.write(f"**Visitor**: {option.get('max_visitor_hours', 0)}hr max")
+                    else:
+                        st.write("**Visitor**: Not Allowed")
+            
+            with col3:
+                if option["estimated_cost"] != float("inf"):
+                    st.write(f"**Est. Total**: ${option['estimated_cost']:.2f} for {stay_hours:g}hr")
+                if option["category"] == "garage_lot":
+                    st.write(f"**Price**: ${option['hourly_rate']:.2f}/hr")
+                    st.write(f"**Daily Max**: ${option['daily_max']:.2f}")
+                    
+                    features = option.get('features', [])
+                    feature_matches = 0
+                    if st.session_state.user_preferences.get('needs_ev_charging') and 'ev_charging' in features:
+                        feature_matches += 1
+                    if st.session_state.user_preferences.get('needs_handicap') and 'handicap_accessible' in features:
+                        feature_matches += 1
+                    
+                    st.write(f"**Features**: {', '.join(features[:3])}")
+                    if feature_matches > 0:
+                        st.success(f"✓ {feature_matches} matches")
+                        
+                elif option["category"] == "meter":
+                    st.write(f"**Rate**: ${option['rate']:.2f}/hr")
+                    st.write(f"**Enforcement**: {option['enforcement_hours']}")
+                    if option.get('free_now'):
+                        st.success("**FREE** during your stay")
+                else:
+                    st.write(f"**Restrictions**: {option.get('restrictions', 'None')}")
+                    if not option.get('permit_required'):
+                        st.success("**FREE** Street Parking")
+            
+            with col4:
+                st.write(f"**Reports**: {reports['report_count']}")
+                if reports['trend'] == "filling_up":
+                    st.caption("📉 Filling up lately")
+                elif reports['trend'] == "freeing_up":
+                    st.caption("📈 Freeing up lately")
+                if not option.get('legal', True):
+                    st.error(f"Not legal for {stay_hours:g}hr")
+                
+                if st.button(f"📍 Select", key=f"select_{option['id']}"):
+                    expires = api.hold_spot(option['id'], session_fingerprint())
+                    if expires is None:
+                        st.warning("Every open space here is already held — pick another option.")
+                    else:
+                        st.session_state.selected_parking = option
+                        st.success(f"Selected! Held until {datetime.fromtimestamp(expires).strftime('%H:%M')}")
+
+            
+            render_report_form(option)
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown("---")
+    
+    if st.session_state.selected_parking:
+        selected = st.session_state.selected_parking
+        st.subheader("🎯 Your Selected Parking Option")
+        
+        with st.container():
+            st.markdown('<div class="parking-card">', unsafe_allow_html=True)
+            col_s1, col_s2 = st.columns([2, 1])
+            
+            with col_s1:
+                st.markdown(f"**{selected.get('name', selected.get('street', 'Selected Location'))}**")
+                st.write(f"📍 **Distance**: {selected['distance']} miles")
+                hold = api.holds.holding(session_fingerprint())
+                if hold and hold[0] == selected['id']:
+                    st.caption(f"🔒 A space is held for you until {datetime.fromtimestamp(hold[1]).strftime('%H:%M')}")
+                
+                if selected['category'] == 'garage_lot':
+                    st.write(f"💰 **Cost**: ${selected['hourly_rate']:.2f}/hour")
+                    if 'phone' in selected:
+                        st.write(f"📞 **Phone**: {selected['phone']}")
+                elif selected['category'] == 'meter':
+                    st.write(f"💰 **Cost**: ${selected['rate']:.2f}/hour")
+                    st.write(f"⏰ **Time Limit**: {selected['time_limit']} hours")
+            
+            with col_s2:
+                walk_time = int(round(selected.get('walk_minutes') or straight_line_minutes(selected['distance'])))
+                st.metric("🚶‍♂️ Walking Time", f"{walk_time} min")
+                st.metric("🎯 AI Confidence", f"{selected['prediction']['availability']:.0%}")
+                
+                if st.button("🧭 Get Directions", key="get_directions"):
+                    coords = selected['coordinates']
+                    maps_url = f"https://www.google.com/maps/dir/?api=1&destination={coords[0]},{coords[1]}"
+                    st.markdown(f"[Open in Google Maps]({maps_url})")
+            
+            reachable = api.get_reachable_destinations(selected['id'])
+            if reachable:
+                st.write("🗺️ **Also within walking range**: " + " · ".join(
+                    f"{entry['destination']} ({entry['walk_minutes']:.0f} min)" for entry in reachable[:6]
+                ))
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+
 
 # Main content area
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["🗺️ Live Map", "📍 Search Results", "📊 Analytics", "📱 Community Reports", "🚀 System Info"])
 
-with tab1:
+@st.fragment
+@timed("render.tab.live_map")
+def render_live_map(destination_input: str):
     st.subheader("Live Parking Map - Philadelphia")
+    show_heatmap = st.toggle("🔥 Citywide availability heatmap", value=False,
+                             help="Expected open spaces right now, aggregated into a grid sized to the map zoom")
     
-    m = folium.Map(location=[39.9526, -75.1652], zoom_start=12, tiles='OpenStreetMap')
-    
-    if destination_input and destination_input in database.destinations:
-        dest_info = database.destinations[destination_input]
-        folium.Marker(
-            location=[dest_info["lat"], dest_info["lon"]],
-            popup=folium.Popup(f"""
-                <b>📍 {destination_input}</b><br>
-                Category: {dest_info.get('category', 'N/A').title()}<br>
-                Parking: {dest_info['parking'].replace('_', ' ').title()}<br>
-                <em>{dest_info.get('description', '')}</em>
-            """, max_width=300),
-            icon=folium.Icon(color='red', icon='star')
-        ).add_to(m)
-    
-    for _, garage in database.garages_lots.head(10).iterrows():
-        availability_pct = (garage.available_spots / garage.total_spots) * 100
+    with span("render.map_build"):
+        m = folium.Map(location=[39.9526, -75.1652], zoom_start=12, tiles='OpenStreetMap')
         
-        if availability_pct > 60:
-            color = 'green'
-            status = "Available"
-        elif availability_pct > 30:
-            color = 'orange'
-            status = "Limited"  
-        else:
-            color = 'red'
-            status = "Nearly Full"
+        if show_heatmap:
+            # Zooming reruns this fragment with the map's new state, so the grid follows the zoom.
+            zoom = (st.session_state.get("live_map") or {}).get("zoom") or 12
+            HeatMap(
+                api.get_availability_heatmap(zoom),
+                name="Availability",
+                radius=24,
+                blur=18,
+                min_opacity=0.25,
+                gradient={0.2: '#ef4444', 0.5: '#f59e0b', 1.0: '#10b981'}
+            ).add_to(m)
+    
+        if destination_input and destination_input in database.destinations:
+            dest_info = database.destinations[destination_input]
+            folium.Marker(
+                location=[dest_info["lat"], dest_info["lon"]],
+                popup=folium.Popup(f"""
+                    <b>📍 {destination_input}</b><br>
+                    Category: {dest_info.get('category', 'N/A').title()}<br>
+                    Parking: {dest_info['parking'].replace('_', ' ').title()}<br>
+                    <em>{dest_info.get('description', '')}</em>
+                """, max_width=300),
+                icon=folium.Icon(color='red', icon='star')
+            ).add_to(m)
         
-        reports = api.get_reports_summary(garage.id)
+            if database.walk_times and destination_input in database.walk_times.isochrones:
+                band_colors = {5: '#10b981', 10: '#f59e0b', 15: '#ef4444'}
+                for band, rings in sorted(database.walk_times.isochrones[destination_input].items(), reverse=True):
+                    for ring in rings:
+                        folium.Polygon(
+                            locations=ring,
+                            color=band_colors.get(band, '#3b82f6'),
+                            weight=1,
+                            fill=True,
+                            fill_opacity=0.08,
+                            tooltip=f"{band} min walk"
+                        ).add_to(m)
+    
+        garages = database.garages_lots.head(10)
+        summaries = api.get_reports_summaries(garages["id"].tolist())
+        for _, garage in garages.iterrows():
+            availability_pct = (garage.available_spots / garage.total_spots) * 100
         
-        popup_html = f"""
-        <b>{garage['name']}</b><br>
-        <strong>Type:</strong> {garage.type.title()} ({garage.operator})<br>
-        <strong>Available:</strong> {garage.available_spots}/{garage.total_spots} spots<br>
-        <strong>Rate:</strong> ${garage.hourly_rate:.2f}/hour<br>
-        <strong>Status:</strong> {status}<br>
-        <strong>User Reports:</strong> {reports['report_count']}<br>
-        <strong>Phone:</strong> {garage.phone}
-        """
+            if availability_pct > 60:
+                color = 'green'
+                status = "Available"
+            elif availability_pct > 30:
+                color = 'orange'
+                status = "Limited"  
+            else:
+                color = 'red'
+                status = "Nearly Full"
+        
+            reports = summaries[garage.id]
+        
+            popup_html = f"""
+            <b>{garage['name']}</b><br>
+            <strong>Type:</strong> {garage.type.title()} ({garage.operator})<br>
+            <strong>Available:</strong> {garage.available_spots}/{garage.total_spots} spots<br>
+            <strong>Rate:</strong> ${garage.hourly_rate:.2f}/hour<br>
+            <strong>Status:</strong> {status}<br>
+            <strong>User Reports:</strong> {reports['report_count']}<br>
+            <strong>Updated:</strong> {pd.Timestamp(garage.last_updated).strftime('%H:%M:%S')}<br>
+            <strong>Phone:</strong> {garage.phone}
+            """
         
-        folium.CircleMarker(
-            location=[garage.latitude, garage.longitude],
-            radius=10,
-            popup=folium.Popup(popup_html, max_width=350),
-            color=color,
-            weight=3,
-            fillColor=color,
-            fillOpacity=0.7,
-            tooltip=f"{garage['name']} - {status}"
-        ).add_to(m)
-    
-    for _, meter in database.parking_meters.head(20).iterrows():
-        if meter.operational_status == "active":
             folium.CircleMarker(
-                location=[meter.latitude, meter.longitude],
-                radius=4,
-                popup=folium.Popup(f"""
-                    <b>Parking Meter</b><br>
-                    <strong>Location:</strong> {meter.street_name}<br>
-                    <strong>Rate:</strong> ${meter.rate_per_hour:.2f}/hour<br>
-                    <strong>Limit:</strong> {meter.time_limit_hours} hours
-                """, max_width=300),
-                color='blue',
-                weight=2,
-                fillColor='lightblue',
-                fillOpacity=0.6,
-                tooltip=f"Meter - ${meter.rate_per_hour}/hr"
+                location=[garage.latitude, garage.longitude],
+                radius=10,
+                popup=folium.Popup(popup_html, max_width=350),
+                color=color,
+                weight=3,
+                fillColor=color,
+                fillOpacity=0.7,
+                tooltip=f"{garage['name']} - {status}"
             ).add_to(m)
     
-    legend_html = '''
-        <div style="position: fixed; 
-                    bottom: 20px; left: 20px; width: 200px; height: 160px; 
-                    background-color: white; border:2px solid grey; z-index:9999; 
-                    font-size:14px; padding: 10px; color:black;">
-        <b style="color:black;">Legend</b><br>
-        <i class="fa fa-star" style="color:red"></i> <span style="color:black;">Destination</span><br>
-        <i class="fa fa-circle" style="color:green"></i> <span style="color:black;">Available Parking</span><br>
-        <i class="fa fa-circle" style="color:orange"></i> <span style="color:black;">Limited Parking</span><br>
-        <i class="fa fa-circle" style="color:red"></i> <span style="color:black;">Nearly Full</span><br>
-        <i class="fa fa-circle" style="color:blue"></i> <span style="color:black;">Parking Meters</span>
-        </div>
-        '''
-    m.get_root().html.add_child(folium.Element(legend_html))
+        bounds = (st.session_state.get("live_map") or {}).get("bounds") or {}
+        view = None
+        if bounds.get("_southWest") and bounds.get("_northEast"):
+            view = (bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+                    bounds["_northEast"]["lat"], bounds["_northEast"]["lng"])
+        for _, meter in api.get_meters_in_view(view).head(20).iterrows():
+            if meter.operational_status == "active":
+                folium.CircleMarker(
+                    location=[meter.latitude, meter.longitude],
+                    radius=4,
+                    popup=folium.Popup(f"""
+                        <b>Parking Meter</b><br>
+                        <strong>Location:</strong> {meter.street_name}<br>
+                        <strong>Rate:</strong> ${meter.rate_per_hour:.2f}/hour<br>
+                        <strong>Limit:</strong> {meter.time_limit_hours} hours
+                    """, max_width=300),
+                    color='blue',
+                    weight=2,
+                    fillColor='lightblue',
+                    fillOpacity=0.6,
+                    tooltip=f"Meter - ${meter.rate_per_hour}/hr"
+                ).add_to(m)
+    
+        legend_html = '''
+            <div style="position: fixed; 
+                        bottom: 20px; left: 20px; width: 200px; height: 160px; 
+                        background-color: white; border:2px solid grey; z-index:9999; 
+                        font-size:14px; padding: 10px; color:black;">
+            <b style="color:black;">Legend</b><br>
+            <i class="fa fa-star" style="color:red"></i> <span style="color:black;">Destination</span><br>
+            <i class="fa fa-circle" style="color:green"></i> <span style="color:black;">Available Parking</span><br>
+            <i class="fa fa-circle" style="color:orange"></i> <span style="color:black;">Limited Parking</span><br>
+            <i class="fa fa-circle" style="color:red"></i> <span style="color:black;">Nearly Full</span><br>
+            <i class="fa fa-circle" style="color:blue"></i> <span style="color:black;">Parking Meters</span>
+            </div>
+            '''
+        m.get_root().html.add_child(folium.Element(legend_html))
 
     
-    map_data = st_folium(m, width=None, height=600)
+
+    with span("render.map_component"):
+        map_data = st_folium(m, width=None, height=600, key="live_map")
+        
+    if map_data and map_data.get("last_clicked"):
+        clicked = map_data["last_clicked"]
+        rules = api.get_permit_rules_at(clicked["lat"], clicked["lng"])
+        if rules["match"] == "block":
+            visitor_text = f"{rules['max_visitor_hours']}hr visitor parking" if rules["visitor_allowed"] else "no visitor parking"
+            st.info(f"🅿️ {rules['permit_zone']} • {rules['street']} (Block {rules['block']}) • "
+                    f"{rules['restrictions']} • {visitor_text}")
+        elif rules["match"] == "zone":
+            st.info(f"🅿️ Inside {rules['permit_zone']} • check posted block signs for hours")
+        else:
+            st.caption("No residential permit rules at the clicked point.")
     
     col1, col2, col3, col4 = st.columns(4)
     analytics = api.get_parking_analytics()
@@ -792,31 +618,107 @@ with tab1:
     with col4:
         st.metric("Community Reports", analytics['user_engagement']['total_reports'])
 
-with tab2:
+@st.fragment
+@timed("render.batch_search")
+def render_batch_search(stay_hours: float, target_datetime: datetime, max_distance: float, legal_only: bool):
+    with st.expander("🚚 Multi-destination search (fleets & events)"):
+        selected = st.multiselect("Destinations:", list(database.destinations.keys()))
+        extra_points = st.text_area(
+            "More points, one per line as `name, lat, lon`:",
+            placeholder="Depot A, 39.9612, -75.1553"
+        )
+        per_point = st.slider("Options per point:", 1, 25, 5)
+        
+        if st.button("🔎 Search All Points", key="batch_search"):
+            points = [
+                {"name": name, "lat": database.destinations[name]["lat"], "lon": database.destinations[name]["lon"]}
+                for name in selected
+            ]
+            invalid = []
+            for line in extra_points.splitlines():
+                parts = [part.strip() for part in line.split(",")]
+                if not line.strip():
+                    continue
+                try:
+                    name, lat, lon = parts[0], float(parts[-2]), float(parts[-1])
+                except (ValueError, IndexError):
+                    invalid.append(line)
+                    continue
+                points.append({"name": name or f"point_{len(points) + 1}", "lat": lat, "lon": lon})
+            if invalid:
+                st.warning(f"Skipped {len(invalid)} line(s) that aren't `name, lat, lon`.")
+            
+            if not points:
+                st.info("Pick destinations or enter points to search.")
+                return
+            
+            results, summary = api.find_parking_batch(
+                points, max_distance, stay_hours, target_datetime, per_point, legal_only
+            )
+            st.dataframe(pd.DataFrame(summary).rename(columns={
+                "origin": "Point", "found": "Found", "nearest_miles": "Nearest (mi)",
+                "cheapest": "Cheapest Option", "cheapest_cost": "Cheapest Cost ($)"
+            }), use_container_width=True, hide_index=True)
+            st.download_button(
+                "📥 Download All Options (CSV)",
+                data=results.to_csv(index=False),
+                file_name="philaspot_batch_search.csv",
+                mime="text/csv"
+            )
+
+
+@st.fragment
+def render_spot_reach():
+    with st.expander("🅿️ What does a spot serve?"):
+        candidates = api.spot_candidates()
+        labels = dict(zip(candidates["id"], candidates["label"]))
+        spot_id = st.selectbox("Parking location:", list(labels), format_func=lambda spot: labels.get(spot, spot))
+        reachable = api.get_reachable_destinations(spot_id)
+        if reachable:
+            st.dataframe(pd.DataFrame(reachable).rename(columns={
+                "destination": "Destination", "walk_minutes": "Walk (min)", "distance": "Distance (mi)", "band": "Band (min)"
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.info("No destinations within walking range of this spot.")
+
+
+with tab1:
+    render_live_map(destination_input)
+
+with tab2, span("render.tab.search_results"):
     if destination_input:
         st.subheader(f"Parking Options for '{destination_input}'")
         
+        custom_point = None if destination_input in database.destinations else parse_coordinates(destination_input)
         if destination_input in database.destinations:
             parking_results = api.find_parking_near_destination(
-                destination_input, max_distance, st.session_state.user_preferences
+                destination_input, max_distance, st.session_state.user_preferences,
+                target_datetime, stay_hours
+            )
+        elif custom_point:
+            parking_results = api.find_parking_near_point(
+                *custom_point, max_distance, st.session_state.user_preferences, target_datetime, stay_hours
             )
         else:
             st.warning("⚠️ Custom destination - using Center City for search")
             parking_results = api.find_parking_near_destination(
-                "Reading Terminal Market", max_distance, st.session_state.user_preferences  
+                "Reading Terminal Market", max_distance, st.session_state.user_preferences,
+                target_datetime, stay_hours
             )
             parking_results["destination"] = destination_input
         
         if "error" not in parking_results:
             dest_info = parking_results["destination_info"]
-            parking_status = dest_info["parking"]
+            parking_status = dest_info.get("parking")
             
             if parking_status == "none":
                 st.error("🚫 This destination has NO on-site parking available.")
             elif parking_status in ["limited", "limited_paid", "limited_expensive"]:
                 st.warning(f"⚠️ {dest_info['description']}")
-            else:
+            elif "description" in dest_info:
                 st.info(f"ℹ️ {dest_info['description']}")
+            else:
+                st.info(f"📍 Searching around {dest_info['lat']:.5f}, {dest_info['lon']:.5f}")
             
             total_found = parking_results["total_found"]
             if total_found == 0:
@@ -824,178 +726,44 @@ with tab2:
             else:
                 st.success(f"✅ Found {total_found} parking options within {max_distance} miles")
                 
+                with st.expander(f"💸 Cheapest legal options for {stay_hours:g} hours"):
+                    cheapest = api.find_cheapest_parking_at(
+                        dest_info["lat"], dest_info["lon"], stay_hours, target_datetime, max_distance, limit=5
+                    )
+                    if cheapest.empty:
+                        st.write("No legal options for this stay within your distance.")
+                    else:
+                        st.dataframe(
+                            cheapest[["label", "category", "total_cost", "distance"]].rename(columns={
+                                "label": "Location", "category": "Type", "total_cost": "Total Cost ($)", "distance": "Distance (mi)"
+                            }),
+                            use_container_width=True, hide_index=True
+                        )
+                
                 all_options = []
                 
                 for option in parking_results["parking_options"]["garages_lots"]:
                     option["category"] = "garage_lot"
-                    option["sort_price"] = option["hourly_rate"]
                     all_options.append(option)
                 
                 for option in parking_results["parking_options"]["meters"]:
                     option["category"] = "meter"
-                    option["sort_price"] = option["rate"]
                     all_options.append(option)
                 
                 for option in parking_results["parking_options"]["permit_zones"]:
                     option["category"] = "permit"
-                    option["sort_price"] = 0 if not option["permit_required"] else 999
                     all_options.append(option)
                 
-                if sort_by == "Distance":
+                if sort_by == "Recommended":
+                    all_options = api.rank_for_session(all_options, session_fingerprint(), destination_input)
+                elif sort_by == "Distance":
                     all_options.sort(key=lambda x: x["distance"])
                 elif sort_by == "Price (Low to High)":
-                    all_options.sort(key=lambda x: x["sort_price"])
+                    all_options.sort(key=lambda x: (x["estimated_cost"], x["distance"]))
                 elif sort_by == "Availability":
                     all_options.sort(key=lambda x: x["prediction"]["availability"], reverse=True)
                 
-                for i, option in enumerate(all_options[:10]):
-                    reports = api.get_reports_summary(option["id"])
-                    
-                    availability = option["prediction"]["availability"]
-                    if availability > 0.7:
-                        avail_class = "high"
-                        status_icon = "🟢"
-                    elif availability > 0.4:
-                        avail_class = "medium"
-                        status_icon = "🟡"
-                    else:
-                        avail_class = "low"
-                        status_icon = "🔴"
-                    
-                    with st.container():
-                        st.markdown(f'<div class="parking-card availability-{avail_class}">', unsafe_allow_html=True)
-                        
-                        col_h1, col_h2 = st.columns([3, 1])
-                        with col_h1:
-                            if option["category"] == "garage_lot":
-                                title = f"{status_icon} {option['name']}"
-                            elif option["category"] == "meter":
-                                title = f"{status_icon} Meter - {option['street']} (Block {option['block']})"
-                            else:
-                                title = f"{status_icon} Street - {option['street']} ({option['neighborhood']})"
-                            
-                            st.markdown(f"**{title}**")
-                        
-                        with col_h2:
-                            st.markdown(f"**{option['distance']} mi**")
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        with col1:
-                            st.write(f"**Type**: {option['category'].replace('_', '/').title()}")
-                            
-                            if option["category"] == "garage_lot":
-                                st.write(f"**Available**: {option.get('available_spots', '?')}/{option.get('total_spots', '?')}")
-                                st.write(f"**Operator**: {option.get('operator', 'Unknown')}")
-                            elif option["category"] == "meter":
-                                st.write(f"**Time Limit**: {option['time_limit']}hr")
-                                st.write(f"**Zone**: {option['zone']}")
-                            else:
-                                permit_text = "Required" if option.get('permit_required') else "Not Required"
-                                st.write(f"**Permit**: {permit_text}")
-                        
-                        with col2:
-                            st.write(f"**AI Prediction**: {availability:.0%}")
-                            st.write(f"**Confidence**: {option['prediction']['confidence'].title()}")
-                            
-                            if option["category"] == "garage_lot":
-                                st.write(f"**Hours**: {option.get('hours', 'Unknown')}")
-                            elif option["category"] == "permit":
-                                if option.get('visitor_allowed'):
-                                    st.write(f"**Visitor**: {option.get('max_visitor_hours', 0)}hr max")
-                                else:
-                                    st.write("**Visitor**: Not Allowed")
-                        
-                        with col3:
-                            if option["category"] == "garage_lot":
-                                st.write(f"**Price**: ${option['hourly_rate']:.2f}/hr")
-                                st.write(f"**Daily Max**: ${option['daily_max']:.2f}")
-                                
-                                features = option.get('features', [])
-                                feature_matches = 0
-                                if st.session_state.user_preferences.get('needs_ev_charging') and 'ev_charging' in features:
-                                    feature_matches += 1
-                                if st.session_state.user_preferences.get('needs_handicap') and 'handicap_accessible' in features:
-                                    feature_matches += 1
-                                
-                                st.write(f"**Features**: {', '.join(features[:3])}")
-                                if feature_matches > 0:
-                                    st.success(f"✓ {feature_matches} matches")
-                                    
-                            elif option["category"] == "meter":
-                                st.write(f"**Rate**: ${option['rate']:.2f}/hr")
-                                st.write(f"**Enforcement**: {option['enforcement_hours']}")
-                            else:
-                                st.write(f"**Restrictions**: {option.get('restrictions', 'None')}")
-                                if not option.get('permit_required'):
-                                    st.success("**FREE** Street Parking")
-                        
-                        with col4:
-                            st.write(f"**Reports**: {reports['report_count']}")
-                            
-                            if st.button(f"📍 Select", key=f"select_{option['id']}"):
-                                st.session_state.selected_parking = option
-                                st.success("Selected!")
-                            
-                            if st.button(f"📝 Report", key=f"report_{option['id']}"):
-                                st.session_state[f"show_report_{option['id']}"] = True
-                        
-                        if st.session_state.get(f"show_report_{option['id']}", False):
-                            st.markdown("---")
-                            with st.form(f"report_form_{option['id']}"):
-                                st.write("**Quick Status Report:**")
-                                status_col1, status_col2 = st.columns(2)
-                                with status_col1:
-                                    status = st.selectbox(
-                                        "Current Status:",
-                                        ["available", "limited", "full", "out_of_order"],
-                                        key=f"status_{option['id']}"
-                                    )
-                                with status_col2:
-                                    notes = st.text_input("Notes (optional):", key=f"notes_{option['id']}")
-                                
-                                submitted = st.form_submit_button("Submit Report")
-                                if submitted:
-                                    success = api.add_user_report(option['id'], option['category'], status, notes)
-                                    if success:
-                                        st.success("✅ Report submitted!")
-                                        st.session_state[f"show_report_{option['id']}"] = False
-                                        st.rerun()
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        st.markdown("---")
-                
-                if st.session_state.selected_parking:
-                    selected = st.session_state.selected_parking
-                    st.subheader("🎯 Your Selected Parking Option")
-                    
-                    with st.container():
-                        st.markdown('<div class="parking-card">', unsafe_allow_html=True)
-                        col_s1, col_s2 = st.columns([2, 1])
-                        
-                        with col_s1:
-                            st.markdown(f"**{selected.get('name', selected.get('street', 'Selected Location'))}**")
-                            st.write(f"📍 **Distance**: {selected['distance']} miles")
-                            
-                            if selected['category'] == 'garage_lot':
-                                st.write(f"💰 **Cost**: ${selected['hourly_rate']:.2f}/hour")
-                                if 'phone' in selected:
-                                    st.write(f"📞 **Phone**: {selected['phone']}")
-                            elif selected['category'] == 'meter':
-                                st.write(f"💰 **Cost**: ${selected['rate']:.2f}/hour")
-                                st.write(f"⏰ **Time Limit**: {selected['time_limit']} hours")
-                        
-                        with col_s2:
-                            walk_time = int((selected['distance'] * 60) / 3)
-                            st.metric("🚶‍♂️ Walking Time", f"{walk_time} min")
-                            st.metric("🎯 AI Confidence", f"{selected['prediction']['availability']:.0%}")
-                            
-                            if st.button("🧭 Get Directions", key="get_directions"):
-                                coords = selected['coordinates']
-                                maps_url = f"https://www.google.com/maps/dir/?api=1&destination={coords[0]},{coords[1]}"
-                                st.markdown(f"[Open in Google Maps]({maps_url})")
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
+                render_parking_results(all_options[:10], stay_hours)
         
         else:
             st.error(f"❌ {parking_results['error']}")
@@ -1029,40 +797,24 @@ with tab2:
                     <p style="color:black; margin-top:4px;">{dest['desc']}</p>
                 </div>
                 """, unsafe_allow_html=True)
+    
+    render_batch_search(stay_hours, target_datetime, max_distance, legal_only)
+    render_spot_reach()
 
 
-with tab3:
-    st.subheader("📊 System Analytics & Insights")
-    
-    analytics = api.get_parking_analytics()
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Locations", f"{sum(analytics['total_locations'].values()):,}")
-    with col2:
-        st.metric("Garage Occupancy", f"{analytics['garage_occupancy']['occupancy_rate']}%")
-    with col3:
-        st.metric("Available Spots", f"{analytics['garage_occupancy']['available_spots']:,}")
-    with col4:
-        st.metric("Community Reports", analytics['user_engagement']['total_reports'])
-    
-    st.subheader("🗺️ Parking Infrastructure Breakdown")
-    location_data = pd.DataFrame(list(analytics['total_locations'].items()), 
-                                columns=['Type', 'Count'])
+# Analytics figures are cached as Plotly JSON across reruns and sessions, each keyed by the version of
+# the data it draws; a figure is only rebuilt when its own inputs move.
+@st.cache_data(max_entries=4)
+def location_mix_figures(inventory_version: int, _total_locations: Dict[str, int]) -> Tuple[str, str]:
+    location_data = pd.DataFrame(list(_total_locations.items()), columns=['Type', 'Count'])
     location_data['Type'] = location_data['Type'].str.replace('_', ' ').str.title()
     
-    col1, col2 = st.columns(2)
-    with col1:
-        fig = px.pie(location_data, values='Count', names='Type', 
-                    title="Distribution of Parking Types")
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        fig = px.bar(location_data, x='Type', y='Count',
-                    title="Parking Locations by Type")
-        st.plotly_chart(fig, use_container_width=True)
-    
-    st.subheader("📈 Occupancy Trends by Hour")
+    pie = px.pie(location_data, values='Count', names='Type', title="Distribution of Parking Types")
+    bar = px.bar(location_data, x='Type', y='Count', title="Parking Locations by Type")
+    return pie.to_json(), bar.to_json()
+
+@st.cache_data(max_entries=4)
+def hourly_occupancy_figure(inventory_version: int) -> str:
     hours = list(range(24))
     occupancy_pattern = []
     
@@ -1084,9 +836,59 @@ with tab3:
                  title="Average Garage Occupancy by Hour of Day")
     fig.add_hline(y=80, line_dash="dash", line_color="red", 
                   annotation_text="High Occupancy (80%)")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_json()
 
-with tab4:
+@st.cache_data(max_entries=4)
+def recorded_occupancy_figure(history_samples: int, inventory_version: int) -> str:
+    recorded = api.get_occupancy_history(hours_back=24)
+    if len(recorded) <= 1:
+        return ""
+    recorded["occupancy"] = recorded["occupancy"] * 100
+    return px.line(recorded, x="time", y="occupancy", title="Recorded Garage Occupancy, Last 24 Hours (%)").to_json()
+
+def show_figure(figure_json: str):
+    st.plotly_chart(pio.from_json(figure_json), use_container_width=True)
+
+@st.fragment
+@timed("render.tab.analytics")
+def render_analytics():
+    st.subheader("📊 System Analytics & Insights")
+    
+    analytics = api.get_parking_analytics()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Locations", f"{sum(analytics['total_locations'].values()):,}")
+    with col2:
+        st.metric("Garage Occupancy", f"{analytics['garage_occupancy']['occupancy_rate']}%")
+    with col3:
+        st.metric("Available Spots", f"{analytics['garage_occupancy']['available_spots']:,}")
+    with col4:
+        st.metric("Community Reports", analytics['user_engagement']['total_reports'])
+    
+    st.subheader("🗺️ Parking Infrastructure Breakdown")
+    pie_json, bar_json = location_mix_figures(database.inventory_version, analytics['total_locations'])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        show_figure(pie_json)
+    
+    with col2:
+        show_figure(bar_json)
+    
+    st.subheader("📈 Occupancy Trends by Hour")
+    show_figure(hourly_occupancy_figure(database.inventory_version))
+    
+    recorded_json = recorded_occupancy_figure(api.history.samples, database.inventory_version)
+    if recorded_json:
+        show_figure(recorded_json)
+
+with tab3:
+    render_analytics()
+
+@st.fragment
+@timed("render.tab.community_reports")
+def render_community_reports():
     st.subheader("📱 Community Reports & Crowdsourced Data")
     
     st.markdown("""
@@ -1119,12 +921,12 @@ with tab4:
             if report_type == "garage_lot":
                 locations = database.garages_lots[['id', 'name']].values.tolist()
                 location_options = [f"{loc[1]} ({loc[0]})" for loc in locations]
-            elif report_type == "meter":
-                locations = database.parking_meters[['id', 'street_name', 'block_number']].head(10).values.tolist()
-                location_options = [f"{loc[1]} - Block {loc[2]} ({loc[0]})" for loc in locations]
             else:
-                locations = database.permit_zones[['id', 'neighborhood', 'street_name']].head(10).values.tolist()
-                location_options = [f"{loc[1]} - {loc[2]} ({loc[0]})" for loc in locations]
+                # Meters and permit blocks come from the spot listing, which also covers partitioned inventory.
+                candidates = api.spot_candidates()
+                category = "meter" if report_type == "meter" else "permit"
+                locations = candidates[candidates["category"] == category][['id', 'label']].head(10).values.tolist()
+                location_options = [f"{loc[1]} ({loc[0]})" for loc in locations]
             
             selected_location = st.selectbox("Select Location:", [""] + location_options)
         
@@ -1146,14 +948,39 @@ with tab4:
         
         if submit_report and selected_location:
             location_id = selected_location.split('(')[-1].rstrip(')')
-            success = api.add_user_report(location_id, report_type, status, notes)
+            success = api.add_user_report(location_id, report_type, status, notes, user_session=session_fingerprint())
             if success:
                 st.success("✅ Thank you! Your report has been added.")
                 st.balloons()
+            else:
+                st.error("Reports are backed up right now. Please try again in a moment.")
         elif submit_report:
             st.warning("Please select a location to report on.")
     
-    if st.session_state.user_reports:
+    with st.expander("📦 Bulk import / export"):
+        uploaded = st.file_uploader("Report file (JSON lines or CSV):", type=["jsonl", "json", "csv"])
+        defer_indexes = st.checkbox("Rebuild indexes after import (faster for large files)")
+        if uploaded is not None and st.button("📥 Import Reports"):
+            valid_ids = api.spot_candidates()['id']
+            with st.spinner("Importing reports..."):
+                result = api.import_reports(
+                    io.TextIOWrapper(uploaded, encoding="utf-8"), detect_format(uploaded.name),
+                    valid_location_ids=valid_ids, defer_indexes=defer_indexes
+                )
+            summary = f"Imported {result['imported']:,} reports ({result['rejected']:,} rejected)"
+            if result["error"]:
+                st.error(f"{summary}; {result['error']}.")
+            else:
+                st.success(f"{summary}.")
+        
+        export_format = st.selectbox("Export format:", ["jsonl", "csv"])
+        st.download_button(
+            "📤 Export All Reports",
+            data=lambda: export_to_tempfile(api.reports, export_format),
+            file_name=f"philaspot_reports.{export_format}",
+        )
+    
+    if api.reports.count():
         st.subheader("📋 Recent Community Reports")
         
         col1, col2 = st.columns(2)
@@ -1166,60 +993,40 @@ with tab4:
                                          default=["available", "limited", "full", "out_of_order"])
         
         cutoff_time = datetime.now() - timedelta(hours=hours_filter)
-        filtered_reports = [
-            r for r in st.session_state.user_reports
-            if (r["timestamp"] > cutoff_time and r["status"] in status_filter)
-        ]
+        filtered_reports = api.report_log.select(cutoff_time.timestamp(), status_filter)
         
-        if filtered_reports:
-            filtered_reports.sort(key=lambda x: x["timestamp"], reverse=True)
-            
-            report_data = []
-            for report in filtered_reports:
-                time_ago = datetime.now() - report["timestamp"]
-                if time_ago.total_seconds() < 3600:
-                    time_str = f"{int(time_ago.total_seconds() // 60)} min ago"
-                else:
-                    time_str = f"{int(time_ago.total_seconds() // 3600)} hr ago"
-                
-                status_emoji = {
-                    "available": "🟢",
-                    "limited": "🟡", 
-                    "full": "🔴",
-                    "out_of_order": "⚫"
-                }[report["status"]]
-                
-                report_data.append({
-                    "Time": time_str,
-                    "Location": report["location_id"],
-                    "Type": report["location_type"].replace('_', '/').title(),
-                    "Status": f"{status_emoji} {report['status'].title()}",
-                    "Notes": report.get("notes", "")[:30] + "..." if len(report.get("notes", "")) > 30 else report.get("notes", ""),
-                    "Reporter": f"User {report['user_session']}"
-                })
-            
-            reports_df = pd.DataFrame(report_data)
-            st.dataframe(reports_df, use_container_width=True, hide_index=True)
+        if len(filtered_reports):
+            pages = (len(filtered_reports) - 1) // REPORTS_PER_PAGE + 1
+            page = st.number_input("Page:", 1, pages, 1) if pages > 1 else 1
+            first = (page - 1) * REPORTS_PER_PAGE
+            st.dataframe(filtered_reports.page(first, first + REPORTS_PER_PAGE),
+                         use_container_width=True, hide_index=True)
+            if pages > 1:
+                st.caption(f"Showing {first + 1}-{min(first + REPORTS_PER_PAGE, len(filtered_reports))} "
+                           f"of {len(filtered_reports):,} reports")
             
+            summary = filtered_reports.summary()
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Reports", len(filtered_reports))
+                st.metric("Total Reports", summary["total"])
             with col2:
-                available_reports = sum(1 for r in filtered_reports if r["status"] == "available")
-                st.metric("Available Reports", available_reports)
+                st.metric("Available Reports", summary["available"])
             with col3:
-                full_reports = sum(1 for r in filtered_reports if r["status"] == "full")
-                st.metric("Full Reports", full_reports)
+                st.metric("Full Reports", summary["full"])
             with col4:
-                unique_locations = len(set(r["location_id"] for r in filtered_reports))
-                st.metric("Unique Locations", unique_locations)
+                st.metric("Unique Locations", summary["unique_locations"])
         
         else:
             st.info("No reports found matching your filters.")
     else:
         st.info("No community reports yet. Be the first to contribute!")
 
-with tab5:
+with tab4:
+    render_community_reports()
+
+@st.fragment
+@timed("render.tab.system_info")
+def render_system_info():
     st.subheader("🚀 System Information & Data Sources")
     
     st.markdown("### 📊 Data Sources")
@@ -1250,7 +1057,7 @@ with tab5:
             "name": "Community Reports",
             "description": "Real-time crowdsourced parking availability data",
             "status": "Active and functional",
-            "coverage": f"{len(st.session_state.user_reports)} reports submitted",
+            "coverage": f"{api.reports.count():,} reports submitted",
             "update_frequency": "Real-time user submissions"
         }
     ]
@@ -1266,6 +1073,54 @@ with tab5:
         </div>
         """, unsafe_allow_html=True)
     
+    st.markdown("### 🔄 Dataset Version")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Inventory Version", database.inventory_version)
+    with col2:
+        st.metric("Reload Status", reloader.status.title())
+    with col3:
+        if st.button("🔄 Reload Datasets", disabled=reloader.status in ("loading", "building", "diffing")):
+            reloader.reload_async()
+            st.info("Building the next inventory version in the background; searches keep running on this one.")
+    if reloader.last_error:
+        st.error(f"Last reload failed: {reloader.last_error}")
+    if reloader.last_reload:
+        st.caption(f"Last reload: {reloader.last_reload.strftime('%H:%M:%S')}")
+        st.dataframe(pd.DataFrame(reloader.summary()), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 📝 Report Writer")
+    st.dataframe(pd.DataFrame([api.report_buffer.status()]), use_container_width=True, hide_index=True)
+    st.dataframe(pd.DataFrame([api.report_log.stats()]), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🧠 Prediction Cache")
+    st.dataframe(pd.DataFrame([api.predictor.cache.stats()]), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🕒 Availability History")
+    st.dataframe(pd.DataFrame(api.history.stats()), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🔒 Spot Holds")
+    st.dataframe(pd.DataFrame([api.holds.stats()]), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🔲 Nearby-Search Cache")
+    st.dataframe(pd.DataFrame([api.search_cache.stats()]), use_container_width=True, hide_index=True)
+    
+    if database.schedules.unparsed:
+        st.markdown("### ⚠️ Unrecognised Schedules")
+        st.caption("These rules did not parse and are treated as applying all week.")
+        st.dataframe(pd.DataFrame(database.schedules.unparsed), use_container_width=True, hide_index=True)
+    
+    if api.partitions is not None:
+        st.markdown("### 🧩 Inventory Partitions")
+        st.dataframe(pd.DataFrame([api.partitions.stats()]), use_container_width=True, hide_index=True)
+    
+    st.markdown("### 🗺️ Reachability Index")
+    st.dataframe(pd.DataFrame([api.reachability.stats()]), use_container_width=True, hide_index=True)
+    
+    if live_feeds:
+        st.markdown("### 📡 Live Occupancy Feeds")
+        st.dataframe(pd.DataFrame(live_feeds.status()), use_container_width=True, hide_index=True)
+    
     st.markdown("### 🏗️ Technical Architecture")
     
     col1, col2 = st.columns(2)
@@ -1347,18 +1202,37 @@ with tab5:
     
     st.markdown("### 📈 System Performance")
     
+    span_stats = REGISTRY.snapshot()
+    search_stats = span_stats.get("search.find_parking_near_destination", {})
+    
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Database Size", "170+ Records")
+        total_records = len(api.spot_candidates())
+        st.metric("Database Size", f"{total_records:,} Records")
     with col2:
-        st.metric("Response Time", "< 100ms")
+        if search_stats.get("p95_ms") is not None:
+            st.metric("Search Time (p95)", f"{search_stats['p95_ms']:.0f} ms")
+        else:
+            st.metric("Search Time (p95)", "n/a")
     with col3:
         st.metric("Prediction Accuracy", "85%*")
     with col4:
-        st.metric("User Engagement", f"{len(st.session_state.user_reports)} Reports")
+        st.metric("User Engagement", f"{api.reports.count():,} Reports")
     
     st.caption("*Simulated accuracy based on time patterns and community reports")
     
+    if not REGISTRY.enabled:
+        st.info("Instrumentation is disabled (PHILASPOT_METRICS=0).")
+    elif span_stats:
+        timings_df = pd.DataFrame([
+            {"Span": name, "Count": stats["count"], "Mean (ms)": stats["mean_ms"],
+             "p50 (ms)": stats["p50_ms"], "p95 (ms)": stats["p95_ms"], "p99 (ms)": stats["p99_ms"]}
+            for name, stats in span_stats.items()
+        ])
+        st.dataframe(timings_df, use_container_width=True, hide_index=True)
+        if metrics_url:
+            st.caption(f"Prometheus metrics: {metrics_url} • JSON: {metrics_url}.json")
+    
     st.markdown("### 🤝 Contributing & Contact")
     st.markdown("""
     **Want to help improve this system?**
@@ -1375,6 +1249,9 @@ with tab5:
     - UI/UX design improvements
     """)
 
+with tab5:
+    render_system_info()
+
 # Footer
 st.markdown("---")
 st.markdown("""
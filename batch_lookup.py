@@ -0,0 +1,214 @@
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from parking_core import ComprehensiveParkingAPI, ComprehensiveParkingDatabase
+
+CHUNK_SIZE = 32
+# Chunks in flight per worker; bounds memory however long the input is.
+PENDING_PER_WORKER = 4
+
+OUTPUT_FIELDS = [
+    "rank", "id", "category", "label", "distance", "walk_minutes", "estimated_cost", "legal", "free_now",
+    "availability", "confidence", "latitude", "longitude",
+]
+
+# One API per process. Under fork, workers inherit the parent's copy-on-write; under spawn, each builds its own.
+_api: Optional[ComprehensiveParkingAPI] = None
+_settings: Dict = {}
+
+
+def build_api() -> ComprehensiveParkingAPI:
+    return ComprehensiveParkingAPI(ComprehensiveParkingDatabase())
+
+
+def _init_worker(settings: Dict):
+    global _api, _settings
+    _settings = settings
+    if _api is None:
+        _api = build_api()
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """Stream input rows from CSV or JSONL; each needs `lat`/`lon` or a `destination` name."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def chunked(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _label(option: Dict) -> str:
+    if option["category"] == "garage_lot":
+        return option["name"]
+    if option["category"] == "meter":
+        return f"Meter - {option['street']} (Block {option['block']})"
+    return f"Street - {option['street']} ({option['neighborhood']})"
+
+
+def lookup(row: Dict) -> Dict:
+    settings = _settings
+    lat, lon = row.get("lat"), row.get("lon")
+    destination = row.get("destination") or row.get("name")
+    preferences = {"legal_only": settings["legal_only"]}
+    try:
+        arrival = datetime.fromisoformat(row["arrival"]) if row.get("arrival") else settings["arrival"]
+        if lat not in (None, "") and lon not in (None, ""):
+            result = _api.find_parking_near_point(float(lat), float(lon), settings["radius"], preferences,
+                                                  arrival, settings["hours"])
+        elif destination:
+            result = _api.find_parking_near_destination(destination, settings["radius"], preferences,
+                                                        arrival, settings["hours"])
+        else:
+            result = {"error": "Row needs lat/lon or a destination"}
+    except (TypeError, ValueError) as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    if "error" in result:
+        return {"input": row, "error": result["error"], "results": []}
+
+    options = []
+    for category, key in (("garage_lot", "garages_lots"), ("meter", "meters"), ("permit", "permit_zones")):
+        for option in result["parking_options"][key]:
+            option["category"] = category
+            options.append(option)
+    if settings["sort"] == "cost":
+        options.sort(key=lambda option: (option["estimated_cost"], option["distance"]))
+    else:
+        options.sort(key=lambda option: option["distance"])
+
+    return {"input": row, "error": None, "results": [{
+        "rank": rank,
+        "id": option["id"],
+        "category": option["category"],
+        "label": _label(option),
+        "distance": option["distance"],
+        "walk_minutes": option["walk_minutes"],
+        "estimated_cost": option["estimated_cost"] if math.isfinite(option["estimated_cost"]) else None,
+        "legal": option["legal"],
+        "free_now": option["free_now"],
+        "availability": round(option["prediction"]["availability"], 3),
+        "confidence": option["prediction"]["confidence"],
+        "latitude": float(option["coordinates"][0]),
+        "longitude": float(option["coordinates"][1]),
+    } for rank, option in enumerate(options[:settings["limit"]], start=1)]}
+
+
+def lookup_chunk(rows: List[Dict]) -> List[Dict]:
+    return [lookup(row) for row in rows]
+
+
+class ResultWriter:
+    """JSONL: one line per input row. CSV: one line per (input row, result), input columns first."""
+
+    def __init__(self, path: str):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.jsonl = path.endswith((".jsonl", ".ndjson"))
+        self.csv = None
+
+    def write(self, record: Dict):
+        if self.jsonl:
+            self.f.write(json.dumps(record, default=str) + "\n")
+            return
+        if self.csv is None:
+            input_fields = [f"input_{key}" for key in record["input"]]
+            self.csv = csv.DictWriter(self.f, input_fields + OUTPUT_FIELDS + ["error"], extrasaction="ignore")
+            self.csv.writeheader()
+        prefix = {f"input_{key}": value for key, value in record["input"].items()}
+        for result in record["results"] or [{}]:
+            self.csv.writerow({**prefix, **result, "error": record["error"] or ""})
+
+    def close(self):
+        self.f.close()
+
+
+def run(input_path: str, output_path: str, workers: int, settings: Dict, chunk_size: int = CHUNK_SIZE) -> Dict:
+    global _api
+    started = time.perf_counter()
+    _api = build_api()
+    built = time.perf_counter()
+    writer = ResultWriter(output_path)
+    rows = errors = 0
+
+    def emit(records: List[Dict]):
+        nonlocal rows, errors
+        for record in records:
+            writer.write(record)
+            rows += 1
+            errors += record["error"] is not None
+
+    try:
+        if workers <= 1:
+            _init_worker(settings)
+            for chunk in chunked(read_rows(input_path), chunk_size):
+                emit(lookup_chunk(chunk))
+        else:
+            # fork shares the loaded inventory read-only; elsewhere each worker loads its own.
+            method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            context = multiprocessing.get_context(method)
+            with context.Pool(workers, initializer=_init_worker, initargs=(settings,)) as pool:
+                pending = deque()
+                for chunk in chunked(read_rows(input_path), chunk_size):
+                    pending.append(pool.apply_async(lookup_chunk, (chunk,)))
+                    # Results stream out in input order while later chunks are still being worked on.
+                    while len(pending) >= workers * PENDING_PER_WORKER or (pending and pending[0].ready()):
+                        emit(pending.popleft().get())
+                while pending:
+                    emit(pending.popleft().get())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - built
+    return {
+        "rows": rows,
+        "errors": errors,
+        "workers": workers,
+        "load_s": round(built - started, 2),
+        "lookup_s": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parking recommendations for a CSV/JSONL list of places, no UI")
+    parser.add_argument("input", help="CSV or JSONL with lat,lon or destination columns (optional arrival)")
+    parser.add_argument("output", help="results file; .jsonl for one record per row, otherwise CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--radius", type=float, default=0.5, help="search radius, miles")
+    parser.add_argument("--hours", type=float, default=2.0, help="length of stay")
+    parser.add_argument("--arrival", help="ISO arrival time for rows without one (default: now)")
+    parser.add_argument("--limit", type=int, default=5, help="results per row")
+    parser.add_argument("--sort", choices=["distance", "cost"], default="distance")
+    parser.add_argument("--include-illegal", action="store_true", help="keep spots not legal for the stay")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    summary = run(args.input, args.output, args.workers, {
+        "radius": args.radius,
+        "hours": args.hours,
+        "arrival": datetime.fromisoformat(args.arrival) if args.arrival else None,
+        "limit": args.limit,
+        "sort": args.sort,
+        "legal_only": not args.include_illegal,
+    }, args.chunk_size)
+    print(json.dumps(summary), file=sys.stderr)
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from cost_engine import CostEngine
+from spatial import haversine_matrix_miles
+from walking_network import WALK_SPEED_MPH
+
+# Upper bound on one distance block (origins x inventory float64s); fixes memory regardless of M.
+BLOCK_BYTES = 32 * 1024 * 1024
+CATEGORIES = ("garages_lots", "meters", "permit_zones")
+
+
+def origins_frame(points: Sequence[Dict]) -> pd.DataFrame:
+    """Normalise [{"name", "lat", "lon"}, ...] into the frame batch_search expects."""
+    frame = pd.DataFrame(list(points), columns=["name", "lat", "lon"])
+    frame["name"] = frame["name"].fillna(pd.Series([f"point_{i + 1}" for i in range(len(frame))]))
+    return frame.astype({"lat": np.float64, "lon": np.float64})
+
+
+def _nearest_in_block(distance: np.ndarray, eligible: np.ndarray, radius_miles: float, limit: int):
+    """Row-wise top-`limit` candidates by distance within the radius; returns (rows, columns, distances)."""
+    distance = np.where(eligible[None, :] & (distance <= radius_miles), distance, np.inf)
+    k = min(limit, distance.shape[1])
+    if k == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    # argpartition is O(N) per row; only the k survivors get fully sorted.
+    nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+    picked = np.take_along_axis(distance, nearest, axis=1)
+    order = np.argsort(picked, axis=1, kind="stable")
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    picked = np.take_along_axis(picked, order, axis=1)
+    rows, slots = np.nonzero(np.isfinite(picked))
+    return rows, nearest[rows, slots], picked[rows, slots]
+
+
+def batch_search(cost_engine: CostEngine, origins: pd.DataFrame, radius_miles: float = 0.5,
+                 arrival: Optional[datetime] = None, hours: float = 2.0, limit: int = 10,
+                 legal_only: bool = True, workers: int = 1) -> pd.DataFrame:
+    """Nearest `limit` spots around each of M origins, with the stay cost, in one long frame."""
+    rules = cost_engine.quote(arrival or datetime.now(), hours)
+    candidates = cost_engine.candidates
+    cost = np.concatenate([rules[c]["cost"] for c in CATEGORIES])
+    legal = np.concatenate([rules[c]["legal"] for c in CATEGORIES])
+    free = np.concatenate([rules[c]["free"] for c in CATEGORIES])
+    eligible = legal if legal_only else np.ones(len(candidates), dtype=bool)
+    lats = candidates["latitude"].to_numpy(dtype=np.float64)
+    lons = candidates["longitude"].to_numpy(dtype=np.float64)
+
+    origin_lats = origins["lat"].to_numpy(dtype=np.float64)
+    origin_lons = origins["lon"].to_numpy(dtype=np.float64)
+    # The quote is shared by every origin; distances go in row blocks (about 4 temporaries per block).
+    block_rows = max(1, BLOCK_BYTES // max(1, 8 * len(candidates) * 4))
+    starts = range(0, len(origins), block_rows)
+
+    def run_block(start: int):
+        stop = min(start + block_rows, len(origins))
+        distance = haversine_matrix_miles(origin_lats[start:stop], origin_lons[start:stop], lats, lons)
+        rows, columns, distances = _nearest_in_block(distance, eligible, radius_miles, limit)
+        return rows + start, columns, distances
+
+    # NumPy releases the GIL inside its kernels, so blocks genuinely run in parallel on threads.
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="philaspot-batch") as pool:
+            blocks = list(pool.map(run_block, starts))
+    else:
+        blocks = [run_block(start) for start in starts]
+
+    rows = np.concatenate([b[0] for b in blocks]) if blocks else np.empty(0, np.int64)
+    columns = np.concatenate([b[1] for b in blocks]) if blocks else np.empty(0, np.int64)
+    distances = np.concatenate([b[2] for b in blocks]) if blocks else np.empty(0)
+
+    result = candidates.iloc[columns].reset_index(drop=True)
+    result.insert(0, "origin", origins["name"].to_numpy()[rows])
+    result["distance"] = np.round(distances, 2)
+    result["walk_minutes"] = np.round(distances / WALK_SPEED_MPH * 60, 1)
+    result["total_cost"] = cost[columns]
+    result["legal"] = legal[columns]
+    result["free_now"] = free[columns]
+    result["rank"] = pd.Series(rows).groupby(rows).cumcount().to_numpy() + 1
+    return result
+
+
+def default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def coverage_summary(results: pd.DataFrame, origins: pd.DataFrame) -> List[Dict]:
+    """One row per origin: how many candidates were found and the cheapest legal one."""
+    summary = []
+    grouped = dict(tuple(results.groupby("origin", sort=False))) if len(results) else {}
+    for name in origins["name"]:
+        group = grouped.get(name)
+        if group is None or group.empty:
+            summary.append({"origin": name, "found": 0, "nearest_miles": None, "cheapest": None, "cheapest_cost": None})
+            continue
+        cheapest = group.sort_values(["total_cost", "distance"], kind="stable").iloc[0]
+        summary.append({
+            "origin": name,
+            "found": len(group),
+            "nearest_miles": float(group["distance"].min()),
+            "cheapest": cheapest["label"],
+            "cheapest_cost": float(cheapest["total_cost"]) if np.isfinite(cheapest["total_cost"]) else None,
+        })
+    return summary
@@ -0,0 +1,70 @@
+import math
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from schedules import ScheduleBook, SLOT_MINUTES
+from spatial import haversine_miles
+
+
+class CostEngine:
+    """Total cost of a stay for every spot in the inventory, one array pass per category."""
+
+    def __init__(self, garages_lots: pd.DataFrame, parking_meters: pd.DataFrame, permit_zones: pd.DataFrame,
+                 schedules: ScheduleBook):
+        self.schedules = schedules
+        self.garage_rate = garages_lots["hourly_rate"].to_numpy(dtype=np.float64)
+        self.garage_daily_max = garages_lots["daily_max"].to_numpy(dtype=np.float64)
+        self.meter_rate = parking_meters["rate_per_hour"].to_numpy(dtype=np.float64)
+
+        self.candidates = pd.concat([
+            pd.DataFrame({
+                "id": garages_lots["id"], "category": "garage_lot", "label": garages_lots["name"],
+                "latitude": garages_lots["latitude"], "longitude": garages_lots["longitude"],
+            }),
+            pd.DataFrame({
+                "id": parking_meters["id"], "category": "meter",
+                "label": "Meter - " + parking_meters["street_name"] + " (Block " + parking_meters["block_number"] + ")",
+                "latitude": parking_meters["latitude"], "longitude": parking_meters["longitude"],
+            }),
+            pd.DataFrame({
+                "id": permit_zones["id"], "category": "permit",
+                "label": "Street - " + permit_zones["street_name"] + " (" + permit_zones["neighborhood"] + ")",
+                "latitude": permit_zones["latitude"], "longitude": permit_zones["longitude"],
+            }),
+        ], ignore_index=True)
+
+    def quote(self, arrival: datetime, hours: float) -> Dict[str, Dict[str, np.ndarray]]:
+        """Legality flags from the schedule book plus a `cost` array; illegal stays cost inf."""
+        rules = self.schedules.evaluate(arrival, hours)
+
+        # Garages cap each 24h period at the daily max and bill started hours.
+        full_days = math.floor(hours / 24)
+        remainder = math.ceil(hours - full_days * 24)
+        garage_cost = full_days * self.garage_daily_max + np.minimum(remainder * self.garage_rate, self.garage_daily_max)
+
+        # Meters only charge for enforced slots; after-hours time is free.
+        meter_cost = rules["meters"]["paid_slots"] * (SLOT_MINUTES / 60) * self.meter_rate
+
+        permit_cost = np.zeros(len(rules["permit_zones"]["legal"]))
+
+        for category, cost in (("garages_lots", garage_cost), ("meters", meter_cost), ("permit_zones", permit_cost)):
+            rules[category]["cost"] = np.where(rules[category]["legal"], np.round(cost, 2), np.inf)
+        return rules
+
+    def cheapest(self, arrival: datetime, hours: float, lat: Optional[float] = None, lon: Optional[float] = None,
+                 radius_miles: Optional[float] = None, limit: int = 10) -> pd.DataFrame:
+        rules = self.quote(arrival, hours)
+        cost = np.concatenate([rules[c]["cost"] for c in ("garages_lots", "meters", "permit_zones")])
+        result = self.candidates.assign(total_cost=cost)
+        keep = np.isfinite(cost)
+        if lat is not None and lon is not None:
+            distance = haversine_miles(lat, lon, result["latitude"], result["longitude"])
+            result["distance"] = np.round(distance, 2)
+            if radius_miles is not None:
+                keep &= distance <= radius_miles
+        result = result[keep]
+        sort_keys = ["total_cost", "distance"] if "distance" in result else ["total_cost"]
+        return result.sort_values(sort_keys, kind="stable").head(limit).reset_index(drop=True)
@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from report_decay import DecayedReportCounters, blend_with_reports
+from schedules import SLOT_MINUTES
+
+# Each web map tile at zoom z is split into CELLS_PER_TILE x CELLS_PER_TILE bins, so a
+# cell covers the same screen area at every zoom and the payload stays bounded.
+CELLS_PER_TILE = 8
+MIN_ZOOM = 10
+MAX_ZOOM = 16
+CACHE_SIZE = 32
+
+
+def cell_degrees(zoom: int) -> float:
+    zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+    return 360.0 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def bin_points(lats: np.ndarray, lons: np.ndarray, weights: np.ndarray, zoom: int) -> np.ndarray:
+    """Sum weights into square cells; returns rows of (cell-centre lat, cell-centre lon, total weight)."""
+    if len(lats) == 0:
+        return np.zeros((0, 3))
+    size = cell_degrees(zoom)
+    ix = np.floor((lons + 180.0) / size).astype(np.int64)
+    iy = np.floor((lats + 90.0) / size).astype(np.int64)
+    # Pack both indices into one int64 so the grouping is a flat 1-D unique.
+    keys, inverse = np.unique((iy << 32) | ix, return_inverse=True)
+    totals = np.bincount(inverse, weights=weights, minlength=len(keys))
+    return np.column_stack([((keys >> 32) + 0.5) * size - 90.0, ((keys & 0xFFFFFFFF) + 0.5) * size - 180.0, totals])
+
+
+class AvailabilityHeatmap:
+    """Expected open spaces per grid cell for the whole city, cached per zoom level and data version."""
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self._cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expected_open(self, frame: pd.DataFrame, base: np.ndarray,
+                       capacity: np.ndarray, legal: np.ndarray, counters: Optional[DecayedReportCounters]) -> np.ndarray:
+        availability = base.astype(np.float64).copy()
+        if counters is not None:
+            # Only the handful of reported locations need a per-row blend.
+            positions = pd.Index(frame["id"]).get_indexer(counters.locations())
+            for position in positions[positions >= 0]:
+                availability[position], _, _ = blend_with_reports(
+                    availability[position], counters.weights(frame["id"].iat[position])
+                )
+        return np.where(legal, capacity * np.clip(availability, 0.0, 1.0), 0.0)
+
+    def _points(self, database, when: datetime,
+                counters: Optional[DecayedReportCounters]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        legality = database.schedules.evaluate(when, 1.0)
+        lats, lons, weights = [], [], []
+
+        garages = database.garages_lots
+        capacity = garages["total_spots"].to_numpy(dtype=np.float64)
+        live = garages["available_spots"].to_numpy(dtype=np.float64) / np.maximum(capacity, 1)
+        weights.append(self._expected_open(garages, live, capacity,
+                                           legality["garages_lots"]["legal"], counters))
+        lats.append(garages["latitude"].to_numpy())
+        lons.append(garages["longitude"].to_numpy())
+
+        meters = database.parking_meters
+        base = np.full(len(meters), self.predictor.base_availability("meter", when))
+        weights.append(self._expected_open(meters, base, np.ones(len(meters)),
+                                           legality["meters"]["legal"], counters))
+        lats.append(meters["latitude"].to_numpy())
+        lons.append(meters["longitude"].to_numpy())
+
+        permits = database.permit_zones
+        base = np.full(len(permits), self.predictor.base_availability("permit", when))
+        spaces = permits["estimated_spaces"].to_numpy(dtype=np.float64)
+        weights.append(self._expected_open(permits, base, spaces,
+                                           legality["permit_zones"]["legal"], counters))
+        lats.append(permits["latitude"].to_numpy())
+        lons.append(permits["longitude"].to_numpy())
+
+        return np.concatenate(lats), np.concatenate(lons), np.concatenate(weights)
+
+    def layer(self, database, zoom: int, when: Optional[datetime] = None,
+              counters: Optional[DecayedReportCounters] = None, area=None) -> List[List[float]]:
+        """[lat, lon, intensity] rows for a heatmap layer, intensity normalised to the busiest cell.
+
+        `area` is the inventory to draw when it is not `database` itself (partition tiles over the same garages);
+        `database` still versions the cache and guards live garage updates.
+        """
+        when = when or datetime.now()
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+        # Predictions move with the schedule slot and report decay, so the slot is part of the key.
+        slot = (when.date(), when.hour, when.minute // SLOT_MINUTES)
+        key = (zoom, database.inventory_version, database.data_version, id(counters), counters.version_total if counters else 0, slot)
+        with self._lock:
+            cells = self._cache.get(key)
+            if cells is not None:
+                self._cache.move_to_end(key)
+        if cells is None:
+            with database.lock:
+                lats, lons, weights = self._points(area if area is not None else database, when, counters)
+            cells = bin_points(lats, lons, weights, zoom)
+            cells = cells[cells[:, 2] > 0]
+            with self._lock:
+                self._cache[key] = cells
+                while len(self._cache) > CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        if len(cells) == 0:
+            return []
+        peak = cells[:, 2].max()
+        return [[round(lat, 5), round(lon, 5), round(weight / peak, 3)] for lat, lon, weight in cells]
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+HOLDS_DB = os.environ.get("PHILASPOT_HOLDS_DB", os.path.join("data", "holds.db"))
+HOLD_TTL_SECONDS = float(os.environ.get("PHILASPOT_HOLD_TTL", str(15 * 60)))
+# How long a writer waits for another process's transaction before giving up.
+BUSY_TIMEOUT_SECONDS = 10
+# SQLite's default limit on bound parameters is 999.
+QUERY_CHUNK = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS holds (
+    session TEXT PRIMARY KEY,
+    location_id TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS holds_location ON holds (location_id, expires);
+"""
+
+
+class HoldLedger:
+    """Short-lived holds on parking spots, shared by every session and process through SQLite.
+
+    A session holds one spot at a time. Checking a spot's remaining capacity and writing the hold happen in one
+    BEGIN IMMEDIATE transaction, so two selects racing for the last space can't both get it.
+    """
+
+    def __init__(self, path: str = HOLDS_DB, ttl_seconds: float = HOLD_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit mode, so transactions are exactly the BEGIN/COMMIT pairs below.
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT_SECONDS)
+        self._lock = threading.Lock()
+        self.placed = 0
+        self.rejected = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _write(self):
+        with self._lock:
+            # Takes the database write lock before the first read, not at the first write.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def place(self, location_id: str, session: str, capacity: Optional[int] = None,
+              now: Optional[float] = None) -> Optional[float]:
+        """Hold `location_id` for `session`, replacing its previous hold; returns the expiry, or None when
+        other sessions already hold all `capacity` spaces."""
+        now = now or time.time()
+        with self._write() as conn:
+            conn.execute("DELETE FROM holds WHERE expires <= ?", (now,))
+            if capacity is not None:
+                held = conn.execute(
+                    "SELECT COUNT(*) FROM holds WHERE location_id = ? AND session != ?", (location_id, session)
+                ).fetchone()[0]
+                if held >= capacity:
+                    self.rejected += 1
+                    return None
+            expires = now + self.ttl_seconds
+            conn.execute(
+                "INSERT OR REPLACE INTO holds (session, location_id, expires) VALUES (?, ?, ?)",
+                (session, location_id, expires),
+            )
+        self.placed += 1
+        return expires
+
+    def release(self, session: str):
+        with self._write() as conn:
+            conn.execute("DELETE FROM holds WHERE session = ?", (session,))
+
+    def holding(self, session: str) -> Optional[Tuple[str, float]]:
+        """(location_id, expiry) of the session's live hold, if any."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT location_id, expires FROM holds WHERE session = ? AND expires > ?", (session, time.time())
+            ).fetchone()
+
+    def held_counts(self, location_ids: Iterable[str]) -> Dict[str, int]:
+        """Live holds per location, for the locations that have any."""
+        location_ids = list(dict.fromkeys(location_ids))
+        now = time.time()
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(location_ids), QUERY_CHUNK):
+                chunk = location_ids[start:start + QUERY_CHUNK]
+                counts.update(self._conn.execute(
+                    f"SELECT location_id, COUNT(*) FROM holds WHERE expires > ? "
+                    f"AND location_id IN ({', '.join('?' * len(chunk))}) GROUP BY location_id",
+                    [now, *chunk],
+                ).fetchall())
+        return counts
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active, locations = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT location_id) FROM holds WHERE expires > ?", (time.time(),)
+            ).fetchone()
+        return {
+            "active_holds": active,
+            "locations_held": locations,
+            "ttl_min": round(self.ttl_seconds / 60, 1),
+            "placed": self.placed,
+            "rejected_full": self.rejected,
+        }
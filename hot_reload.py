@@ -0,0 +1,180 @@
+import os
+import threading
+import traceback
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from metrics import span
+
+# Drop garages_lots.json / parking_meters.json (pandas "records" JSON) here to override the built-in inventory.
+INVENTORY_DIR = os.environ.get("PHILASPOT_INVENTORY_DIR", os.path.join("data", "inventory"))
+INVENTORY_TABLES = ("garages_lots", "parking_meters", "permit_zones")
+
+# Columns that move on their own (live feeds, load time) and say nothing about the dataset itself.
+VOLATILE_COLUMNS = {"available_spots", "last_updated", "geometry"}
+
+# Live occupancy survives a reload; the next dataset version only knows the static inventory.
+LIVE_COLUMNS = ("available_spots", "last_updated")
+
+DIFF_SAMPLE = 10
+
+
+def inventory_path(table: str) -> str:
+    return os.path.join(INVENTORY_DIR, f"{table}.json")
+
+
+def load_inventory_table(path: str) -> pd.DataFrame:
+    """Read an inventory override; ids must be present and unique, since reloads diff and patch rows by id."""
+    frame = pd.read_json(path, orient="records", convert_dates=["last_updated"])
+    if "id" not in frame.columns:
+        raise ValueError(f"{path}: records have no 'id' field")
+    duplicated = frame["id"][frame["id"].duplicated()].unique()
+    if len(duplicated):
+        sample = ", ".join(map(str, duplicated[:DIFF_SAMPLE]))
+        raise ValueError(f"{path}: {len(duplicated)} duplicate id(s): {sample}")
+    return frame
+
+
+def _comparable(frame: pd.DataFrame) -> pd.DataFrame:
+    columns = [c for c in frame.columns if c not in VOLATILE_COLUMNS]
+    # Lists (features, payment methods) are not hashable; compare their text form instead.
+    return frame[columns].set_index("id").astype(str)
+
+
+def diff_table(old: pd.DataFrame, new: pd.DataFrame) -> Dict:
+    old_ids, new_ids = pd.Index(old["id"]), pd.Index(new["id"])
+    added = new_ids.difference(old_ids)
+    removed = old_ids.difference(new_ids)
+    common = new_ids.intersection(old_ids)
+
+    changed: List[str] = []
+    changed_columns: Dict[str, int] = {}
+    if len(common):
+        before, after = _comparable(old), _comparable(new)
+        shared = before.columns.intersection(after.columns)
+        before, after = before.loc[common, shared], after.loc[common, shared]
+        differs = before.ne(after)
+        changed = list(common[differs.any(axis=1).to_numpy()])
+        changed_columns = {column: int(count) for column, count in differs.sum().items() if count}
+
+    return {
+        "added": len(added),
+        "removed": len(removed),
+        "changed": len(changed),
+        "changed_columns": changed_columns,
+        "sample_added": list(added[:DIFF_SAMPLE]),
+        "sample_removed": list(removed[:DIFF_SAMPLE]),
+        "sample_changed": changed[:DIFF_SAMPLE],
+    }
+
+
+def diff_inventories(old, new) -> Dict[str, Dict]:
+    return {table: diff_table(getattr(old, table), getattr(new, table)) for table in INVENTORY_TABLES}
+
+
+def carry_over_live_columns(old, new):
+    """Copy live garage occupancy from the running version onto the one about to replace it."""
+    if old.data_version == 0:
+        return
+    with old.lock:
+        live = old.garages_lots.set_index("id")[list(LIVE_COLUMNS)]
+    positions = pd.Index(live.index).get_indexer(new.garages_lots["id"])
+    known = positions >= 0
+    for column in LIVE_COLUMNS:
+        values = new.garages_lots[column].to_numpy(copy=True)
+        values[known] = live[column].to_numpy()[positions[known]]
+        new.garages_lots[column] = values
+    new.data_version = old.data_version
+
+
+class DatasetReloader:
+    """Builds the next inventory version off the request path and swaps it in with one reference assignment."""
+
+    def __init__(self, api, build: Callable[[], object]):
+        self.api = api
+        self.build = build
+        self.listeners: List[Callable[[object], None]] = []
+        self.status = "idle"
+        self.last_diff: Optional[Dict[str, Dict]] = None
+        self.last_reload: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def on_swap(self, listener: Callable[[object], None]):
+        self.listeners.append(listener)
+
+    def reload_async(self) -> bool:
+        """Start a background reload; False if one is already running."""
+        with self._lock:
+            if self._pending is not None or (self._thread is not None and self._thread.is_alive()):
+                return False
+            self.status = "building"
+            self._thread = threading.Thread(target=self.reload, name="philaspot-reload", daemon=True)
+            self._thread.start()
+            return True
+
+    def reload(self):
+        try:
+            with span("reload.build"):
+                candidate = self.build()
+        except Exception as e:
+            self._failed(e)
+            return
+        self.adopt(candidate)
+
+    def adopt(self, candidate):
+        """Swap in a database version built elsewhere, e.g. the rest of a startup load."""
+        try:
+            current = self.api.database
+            candidate.inventory_version = current.inventory_version + 1
+            self.status = "diffing"
+            diff = diff_inventories(current, candidate)
+            carry_over_live_columns(current, candidate)
+
+            # Searches already running keep the version they pinned; new ones see the candidate.
+            self.api.swap_database(candidate)
+            for listener in self.listeners:
+                listener(candidate)
+
+            self.last_diff = diff
+            self.last_reload = datetime.now()
+            self.last_error = None
+            self.status = "idle"
+        except Exception as e:
+            self._failed(e)
+
+    def adopt_when_ready(self, pending: Future):
+        """Adopt the version `pending` resolves to; manual reloads wait until it has."""
+        with self._lock:
+            self.status = "loading"
+            self._pending = pending
+        pending.add_done_callback(self._adopt_pending)
+
+    def _adopt_pending(self, pending: Future):
+        try:
+            candidate = pending.result()
+        except Exception as e:
+            self._failed(e)
+        else:
+            self.adopt(candidate)
+        with self._lock:
+            self._pending = None
+
+    def _failed(self, error: Exception):
+        self.last_error = f"{type(error).__name__}: {error}"
+        self.status = "failed"
+        traceback.print_exc()
+
+    def summary(self) -> List[Dict]:
+        if not self.last_diff:
+            return []
+        return [
+            {"table": table, "added": d["added"], "removed": d["removed"], "changed": d["changed"],
+             "changed_columns": ", ".join(f"{c} ({n})" for c, n in d["changed_columns"].items()) or "-"}
+            for table, d in self.last_diff.items()
+        ]
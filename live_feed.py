@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# Either a path to a JSON list of sources or "stub" to poll a local stub server.
+LIVE_FEEDS = os.environ.get("PHILASPOT_LIVE_FEEDS", "")
+
+DEFAULT_MIN_INTERVAL = 30.0
+BACKOFF_BASE = 2.0
+BACKOFF_CAP = 300.0
+REQUEST_TIMEOUT = 5.0
+
+
+class FeedSource:
+    def __init__(self, name: str, url: str, min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.name = name
+        self.url = url
+        self.min_interval = min_interval
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.next_poll = 0.0
+        self.failures = 0
+        self.last_status = "pending"
+        self.last_success: Optional[datetime] = None
+        self.updates_applied = 0
+        self.records_skipped = 0
+
+    def schedule_success(self, now: float):
+        self.failures = 0
+        self.next_poll = now + self.min_interval
+
+    def schedule_failure(self, now: float, retry_after: Optional[float] = None):
+        # Full jitter keeps many PhilaSpot processes from retrying a struggling source in lockstep.
+        self.failures += 1
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** self.failures))
+        self.next_poll = now + max(self.min_interval, delay, retry_after or 0.0)
+
+    def status(self) -> Dict:
+        return {
+            "source": self.name,
+            "status": self.last_status,
+            "last_success": self.last_success.strftime("%H:%M:%S") if self.last_success else "never",
+            "failures": self.failures,
+            "updates_applied": self.updates_applied,
+            "records_skipped": self.records_skipped,
+            "next_poll_in_s": max(0, round(self.next_poll - time.monotonic())),
+        }
+
+
+class LiveFeedManager:
+    """Polls garage occupancy sources in the background and patches the in-memory inventory."""
+
+    def __init__(self, database, sources: List[FeedSource], pool_size: int = 8):
+        self.database = database
+        self.sources = sources
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stub_server: Optional["StubFeedServer"] = None
+
+    @classmethod
+    def from_environment(cls, database, setting: str = LIVE_FEEDS) -> Optional["LiveFeedManager"]:
+        if not setting:
+            return None
+        if setting == "stub":
+            stub = StubFeedServer(database.garages_lots[["id", "total_spots"]])
+            stub.start()
+            manager = cls(database, [FeedSource("Local stub feed", stub.url, min_interval=5.0)])
+            manager.stub_server = stub
+            return manager
+        with open(setting) as f:
+            config = json.load(f)
+        return cls(database, [
+            FeedSource(entry["name"], entry["url"], float(entry.get("min_interval", DEFAULT_MIN_INTERVAL)))
+            for entry in config
+        ])
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="philaspot-live-feeds", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=REQUEST_TIMEOUT + 1)
+        if self.stub_server is not None:
+            self.stub_server.stop()
+        self.session.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [source for source in self.sources if source.next_poll <= now]
+            for source in due:
+                try:
+                    self.poll(source)
+                except Exception as e:
+                    # One broken source must not take down polling for the rest.
+                    source.last_status = f"error: {type(e).__name__}"
+                    source.schedule_failure(time.monotonic())
+            next_due = min((source.next_poll for source in self.sources), default=now + DEFAULT_MIN_INTERVAL)
+            self._stop.wait(max(0.1, next_due - time.monotonic()))
+
+    def poll(self, source: FeedSource):
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+
+        now = time.monotonic()
+        try:
+            response = self.session.get(source.url, headers=headers, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            source.last_status = f"error: {type(e).__name__}"
+            source.schedule_failure(now)
+            return
+
+        if response.status_code == 304:
+            source.last_status = "not modified"
+            source.last_success = datetime.now()
+            source.schedule_success(now)
+            return
+        if response.status_code in (429, 503) or response.status_code >= 500:
+            source.last_status = f"http {response.status_code}"
+            source.schedule_failure(now, _retry_after_seconds(response.headers.get("Retry-After")))
+            return
+        if response.status_code != 200:
+            source.last_status = f"http {response.status_code}"
+            source.schedule_failure(now)
+            return
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict) or not isinstance(payload.get("garages", []), list):
+            source.last_status = "error: bad payload"
+            source.schedule_failure(now)
+            return
+
+        updates, skipped = validate_updates(payload.get("garages", []))
+        source.etag = response.headers.get("ETag")
+        source.last_modified = response.headers.get("Last-Modified")
+        source.records_skipped += skipped
+        source.updates_applied += self.apply(updates)
+        source.last_status = "ok"
+        source.last_success = datetime.now()
+        source.schedule_success(now)
+
+    def apply(self, updates: List[Tuple[str, int, datetime]]) -> int:
+        """Patch garages from (id, available_spots, updated_at) tuples as returned by validate_updates."""
+        if not updates:
+            return 0
+        garages = self.database.garages_lots
+        positions = pd.Index(garages["id"]).get_indexer([u[0] for u in updates])
+        known = positions >= 0
+        if not known.any():
+            return 0
+
+        positions = positions[known]
+        updates = [u for u, ok in zip(updates, known) if ok]
+        capacity = garages["total_spots"].to_numpy()[positions]
+        available = np.clip(np.array([u[1] for u in updates]), 0, capacity)
+        stamps = [u[2] for u in updates]
+
+        with self.database.lock:
+            garages.iloc[positions, garages.columns.get_loc("available_spots")] = available
+            garages.iloc[positions, garages.columns.get_loc("last_updated")] = stamps
+            self.database.data_version += 1
+        return len(positions)
+
+    def status(self) -> List[Dict]:
+        return [source.status() for source in self.sources]
+
+
+def validate_updates(records: List) -> Tuple[List[Tuple[str, int, datetime]], int]:
+    """Well-formed records as (id, available_spots, updated_at), plus how many were skipped. Timestamps with an
+    offset are converted to naive local time, like the rest of the garages' last_updated column."""
+    updates = []
+    for record in records:
+        try:
+            garage_id = record["id"]
+            available = int(record["available_spots"])
+            stamp = record.get("updated_at")
+            stamp = pd.Timestamp(stamp).to_pydatetime() if stamp else datetime.now()
+            if stamp.tzinfo is not None:
+                stamp = stamp.astimezone().replace(tzinfo=None)
+        except (TypeError, KeyError, ValueError, AttributeError, OverflowError):
+            continue
+        if isinstance(garage_id, str) and not pd.isna(stamp):
+            updates.append((garage_id, available, stamp))
+    return updates, len(records) - len(updates)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class StubFeedServer:
+    """Local occupancy feed for offline testing: a random walk per garage, with ETag/304 support."""
+
+    def __init__(self, garages: pd.DataFrame, host: str = "127.0.0.1", port: int = 0, tick_seconds: float = 10.0):
+        self.capacity = dict(zip(garages["id"], garages["total_spots"].astype(int)))
+        self.available = {garage_id: capacity // 2 for garage_id, capacity in self.capacity.items()}
+        self.tick_seconds = tick_seconds
+        self._lock = threading.Lock()
+        self._last_tick = 0.0
+        self._body = b""
+        self._etag = ""
+        self._last_modified = ""
+        self._tick(force=True)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/garages"
+
+    def _tick(self, force: bool = False):
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_tick < self.tick_seconds:
+                return
+            self._last_tick = now
+            for garage_id, capacity in self.capacity.items():
+                step = random.randint(-capacity // 20, capacity // 20)
+                self.available[garage_id] = min(capacity, max(0, self.available[garage_id] + step))
+            stamp = datetime.now().isoformat(timespec="seconds")
+            self._body = json.dumps({"garages": [
+                {"id": garage_id, "available_spots": spots, "updated_at": stamp}
+                for garage_id, spots in self.available.items()
+            ]}).encode()
+            self._etag = '"' + hashlib.sha1(self._body).hexdigest()[:16] + '"'
+            self._last_modified = formatdate(now, usegmt=True)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path != "/garages":
+                    self.send_error(404)
+                    return
+                stub._tick()
+                with stub._lock:
+                    body, etag, last_modified = stub._body, stub._etag, stub._last_modified
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="philaspot-stub-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the local stub garage occupancy feed")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--garages", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=400)
+    parser.add_argument("--tick", type=float, default=10.0)
+    args = parser.parse_args()
+
+    garages = pd.DataFrame({
+        "id": [f"facility_{i+1}" for i in range(args.garages)],
+        "total_spots": [args.capacity] * args.garages,
+    })
+    stub = StubFeedServer(garages, port=args.port, tick_seconds=args.tick)
+    print(f"Serving stub occupancy feed on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PhilaSpot.py")
+WIDGET_TYPES = ("selectbox", "slider", "checkbox", "button", "component_instance")
+COMMUNITY_FORM = "community_report_form"
+MAP_COMPONENT = "streamlit_folium.st_folium"
+DESTINATIONS = [
+    "Independence Hall", "Liberty Bell Center", "Reading Terminal Market", "Citizens Bank Park",
+    "University of Pennsylvania", "Rittenhouse Square", "30th Street Station", "South Street",
+]
+MAP_VIEWS = [
+    {"zoom": 12, "center": {"lat": 39.9526, "lng": -75.1652}},
+    {"zoom": 14, "center": {"lat": 39.9496, "lng": -75.1503}},
+    {"zoom": 15, "center": {"lat": 39.9561, "lng": -75.1810}},
+    {"zoom": 13, "center": {"lat": 39.9060, "lng": -75.1665}},
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, env: Dict[str, str], timeout: float = 120.0) -> subprocess.Popen:
+    """Run the app under a real headless Streamlit server and wait until it answers health checks."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless=true",
+         f"--server.port={port}", "--server.address=127.0.0.1", "--browser.gatherUsageStats=false"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2):
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise TimeoutError("Streamlit did not become healthy in time")
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return None
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+
+def widget_key(kind: str, widget) -> str:
+    """How the script addresses a widget: its label, or a component's name, prefixed with its form
+    so the per-card and community forms' "Current Status:" selects stay apart."""
+    name = getattr(widget, "label", "") or getattr(widget, "component_name", "") or kind
+    return f"{widget.form_id}/{name}" if widget.form_id else name
+
+
+class SimulatedSession:
+    """One browser tab speaking Streamlit's websocket protocol, driven by a seeded random script."""
+
+    def __init__(self, url: str, number: int, seed: int, think_seconds: float):
+        self.url = url
+        self.random = random.Random(seed * 1000 + number)
+        self.think_seconds = think_seconds
+        self.widgets: Dict[str, tuple] = {}
+        self.states: Dict[str, WidgetState] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: List[str] = []
+        self.ws = None
+
+    async def rerun(self, action: str, triggers: Optional[List[WidgetState]] = None, fragment_id: str = ""):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.widget_states.widgets.extend(list(self.states.values()) + (triggers or []))
+
+        start = time.perf_counter()
+        await self.ws.send(message.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                self._record(forward.delta)
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.latencies.setdefault(action, []).append(time.perf_counter() - start)
+
+    def _record(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{element.exception.type}: {element.exception.message}")
+        elif kind in WIDGET_TYPES:
+            widget = getattr(element, kind)
+            self.widgets[widget_key(kind, widget)] = (widget.id, delta.fragment_id, widget)
+
+    def _state(self, label: str) -> WidgetState:
+        state = WidgetState()
+        state.id = self.widgets[label][0]
+        return state
+
+    def select(self, label: str, option: str):
+        state = self._state(label)
+        state.string_value = option
+        self.states[state.id] = state
+
+    def slide(self, label: str, value: float):
+        state = self._state(label)
+        state.double_array_value.data[:] = [value]
+        self.states[state.id] = state
+
+    def check(self, label: str, value: bool):
+        state = self._state(label)
+        state.bool_value = value
+        self.states[state.id] = state
+
+    def click(self, label: str) -> WidgetState:
+        # Buttons are one-shot triggers: sent with a single rerun, never remembered.
+        state = self._state(label)
+        state.trigger_value = True
+        return state
+
+    async def pick_destination(self):
+        self.select("Select destination:", self.random.choice(DESTINATIONS))
+        await self.rerun("pick_destination")
+
+    async def change_sliders(self):
+        self.slide("How long? (hours):", self.random.choice([0.5, 1.0, 2.0, 4.0, 8.0]))
+        self.slide("Max walking distance (miles):", self.random.choice([0.3, 0.5, 0.8, 1.2]))
+        await self.rerun("change_sliders")
+
+    async def submit_report(self):
+        location, status = f"{COMMUNITY_FORM}/Select Location:", f"{COMMUNITY_FORM}/Current Status:"
+        locations = [option for option in self.widgets[location][2].options if option]
+        self.select(location, self.random.choice(locations))
+        self.select(status, self.random.choice(list(self.widgets[status][2].options)))
+        await self.rerun("submit_report", [self.click(f"{COMMUNITY_FORM}/📤 Submit Report")])
+
+    async def pan_map(self):
+        # The map lives in a fragment, so a pan only reruns that fragment, as in a browser.
+        self.check("🔥 Citywide availability heatmap", True)
+        state = self._state(MAP_COMPONENT)
+        state.json_value = json.dumps(dict(self.random.choice(MAP_VIEWS), last_clicked=None, bounds=None))
+        self.states[state.id] = state
+        await self.rerun("pan_map", fragment_id=self.widgets[MAP_COMPONENT][1])
+
+    async def open(self):
+        self.ws = await connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self.rerun("open")
+
+    async def run(self, iterations: int, opened: asyncio.Barrier):
+        await self.open()
+        await opened.wait()
+        actions = [self.pick_destination, self.change_sliders, self.submit_report, self.pan_map]
+        try:
+            for _ in range(iterations):
+                if self.think_seconds:
+                    await asyncio.sleep(self.random.uniform(0, 2 * self.think_seconds))
+                action = self.random.choice(actions)
+                try:
+                    await action()
+                except KeyError as e:
+                    self.errors.append(f"{action.__name__}: widget {e} not on the page")
+        finally:
+            await self.ws.close()
+
+
+def summarise(values: List[float]) -> Dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 1) if values else None,
+        "p95_ms": round(percentile(values, 0.95) * 1000, 1) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 1) if values else None,
+    }
+
+
+async def run_load_test(url: str, sessions: int, iterations: int, seed: int = 0, think_seconds: float = 0.0,
+                        server_pid: Optional[int] = None) -> Dict:
+    # One throwaway session warms the process-wide caches so they are not billed per session.
+    warmup = SimulatedSession(url, -1, seed, 0.0)
+    await warmup.open()
+    await warmup.ws.close()
+    baseline = rss_mb(server_pid) if server_pid else None
+
+    simulated = [SimulatedSession(url, i, seed, think_seconds) for i in range(sessions)]
+    opened = asyncio.Barrier(sessions + 1)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(session.run(iterations, opened)) for session in simulated]
+    await opened.wait()
+    resident = rss_mb(server_pid) if server_pid else None
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    by_action: Dict[str, List[float]] = {}
+    for session in simulated:
+        for action, values in session.latencies.items():
+            by_action.setdefault(action, []).extend(values)
+    everything = [value for values in by_action.values() for value in values]
+    errors = [error for session in simulated for error in session.errors]
+
+    memory = None
+    if baseline is not None and resident is not None:
+        memory = {
+            "baseline_mb": round(baseline, 1),
+            "with_sessions_mb": round(resident, 1),
+            "per_session_mb": round((resident - baseline) / sessions, 2),
+            "final_mb": round(rss_mb(server_pid) or 0.0, 1),
+        }
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 2),
+        "reruns_per_s": round(len(everything) / elapsed, 2) if elapsed else None,
+        "reruns": summarise(everything),
+        "by_action": {action: summarise(values) for action, values in sorted(by_action.items())},
+        "memory": memory,
+        "errors": len(errors),
+        "first_errors": errors[:5],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a PhilaSpot server with concurrent simulated sessions")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=10, help="actions per session after the first page load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a session's actions, seconds")
+    parser.add_argument("--url", help="websocket of a running server, e.g. ws://127.0.0.1:8501/_stcore/stream "
+                                      "(default: start a private server)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        # Keep simulated reports and the metrics port away from a real deployment.
+        scratch = tempfile.mkdtemp(prefix="philaspot-load-")
+        env = dict(os.environ, PHILASPOT_REPORTS_DB=os.path.join(scratch, "reports.db"))
+        env.setdefault("PHILASPOT_METRICS", "0")
+        port = free_port()
+        server = start_server(port, env)
+        url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    try:
+        results = asyncio.run(run_load_test(url, args.sessions, args.iterations, args.seed, args.think,
+                                            server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+METRICS_ENABLED = os.environ.get("PHILASPOT_METRICS", "1").lower() not in ("0", "false", "off", "no")
+METRICS_HOST = os.environ.get("PHILASPOT_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("PHILASPOT_METRICS_PORT", "9108"))
+
+BUCKET_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("name", "counts", "total", "count", "_lock")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        bucket = bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.total += seconds
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if count == 0:
+            return None
+        # Same linear interpolation inside a bucket that Prometheus' histogram_quantile uses.
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else BUCKET_BOUNDS[-1]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return BUCKET_BOUNDS[-1]
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "p50_ms": _ms(self.quantile(0.5)),
+            "p95_ms": _ms(self.quantile(0.95)),
+            "p99_ms": _ms(self.quantile(0.99)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class _Span:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram(name))
+        return histogram
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self.histogram(name))
+
+    def timed(self, name: str) -> Callable:
+        def decorator(func):
+            # Disabled instrumentation hands back the original function: zero cost per call.
+            if not self.enabled:
+                return func
+            histogram = self.histogram(name)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = [
+            "# HELP philaspot_span_seconds Time spent in instrumented PhilaSpot code paths.",
+            "# TYPE philaspot_span_seconds histogram",
+        ]
+        for name, histogram in sorted(self.histograms.items()):
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.total, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, counts):
+                cumulative += bucket_count
+                lines.append(f'philaspot_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'philaspot_span_seconds_bucket{{span="{name}",le="+Inf"}} {count}')
+            lines.append(f'philaspot_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'philaspot_span_seconds_count{{span="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[str]:
+        """Start the local /metrics (Prometheus) and /metrics.json endpoint once per process."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._server is None:
+                registry = self
+
+                class Handler(BaseHTTPRequestHandler):
+                    def do_GET(self):
+                        if self.path.startswith("/metrics.json"):
+                            body, content_type = json.dumps(registry.snapshot()).encode(), "application/json"
+                        elif self.path.startswith("/metrics"):
+                            body, content_type = registry.prometheus_text().encode(), "text/plain; version=0.0.4"
+                        else:
+                            self.send_error(404)
+                            return
+                        self.send_response(200)
+                        self.send_header("Content-Type", content_type)
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+
+                    def log_message(self, *args):
+                        pass
+
+                try:
+                    self._server = ThreadingHTTPServer((host, port), Handler)
+                except OSError:
+                    # Another PhilaSpot process on this host already owns the port.
+                    return None
+                threading.Thread(target=self._server.serve_forever, name="philaspot-metrics", daemon=True).start()
+        return f"http://{self._server.server_address[0]}:{self._server.server_address[1]}/metrics"
+
+
+REGISTRY = MetricsRegistry(METRICS_ENABLED)
+span = REGISTRY.span
+timed = REGISTRY.timed
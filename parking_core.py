@@ -0,0 +1,984 @@
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+
+from batch_search import batch_search, coverage_summary, default_workers, origins_frame
+from cost_engine import CostEngine
+from heatmap import AvailabilityHeatmap
+from hold_ledger import HoldLedger
+from hot_reload import inventory_path, load_inventory_table
+from metrics import span, timed
+from partitions import tile_indices, tile_name
+from permit_polygons import (
+    PermitZoneIndex, PERMIT_BLOCKS_GEOJSON, PERMIT_ZONES_GEOJSON, load_permit_blocks_geojson,
+    load_permit_zone_polygons, synthetic_block_geometry
+)
+from prediction_cache import PredictionCache, is_missing
+from reachability import ReachabilityIndex, spot_points
+from report_buffer import ReportWriteBuffer
+from report_log import ReportLog
+from report_decay import (
+    DecayedReportCounters, MIN_EVIDENCE, REPLAY_HALF_LIVES, blend_with_reports, evidence_confidence
+)
+from report_io import import_reports
+from report_store import ReportRow, ReportStore
+from schedules import ScheduleBook, start_slot
+from search_cache import SearchCellCache
+from timeseries import STATUS_AVAILABILITY, TIERS, TimeSeriesStore, record_report_rows
+from walking_network import load_walk_time_index, straight_line_minutes, WALK_SPEED_MPH
+
+SOURCES = ("garages_lots", "parking_meters", "permit_zones")
+# Sources load on threads; inventory and GeoJSON files big enough to be worth a process start (spawn
+# re-imports pandas, about a second) are parsed in worker processes instead. 0 keeps all parsing on threads,
+# which is the default on a single core where a second process only adds the transfer.
+PARSE_PROCESSES = int(os.environ.get("PHILASPOT_PARSE_PROCESSES", str(min(2, (os.cpu_count() or 1) - 1))))
+PARSE_IN_PROCESS_BYTES = 8 * 1024 * 1024
+
+# Shape of a source that has not arrived yet, so searches run against it as if it were empty.
+METER_COLUMNS = [
+    "id", "meter_number", "street_name", "block_number", "side", "latitude", "longitude", "rate_per_hour",
+    "time_limit_hours", "enforcement_days", "enforcement_start", "enforcement_end", "meter_type",
+    "payment_methods", "operational_status", "zone", "zone_description", "mobile_zone_number",
+]
+# Report trends compare the last hour of reports with the rest of the summary window.
+TREND_RECENT_SECONDS = 3600
+
+# Recommended ranking: how quickly a spot's pull fades with distance from the destination, in miles.
+RANK_DISTANCE_MILES = 0.25
+
+# (south, west, north, east) of the map's opening view, before it reports its own bounds.
+DEFAULT_VIEW = (39.92, -75.22, 39.99, -75.11)
+
+PERMIT_COLUMNS = [
+    "id", "neighborhood", "permit_zone", "street_name", "block_number", "block_side", "latitude", "longitude",
+    "permit_required", "permit_type", "permit_cost_annual", "time_restrictions", "visitor_parking_allowed",
+    "max_visitor_hours", "estimated_spaces", "last_updated", "geometry",
+]
+
+
+class ComprehensiveParkingDatabase:
+    def __init__(self, sources: Optional[Dict] = None):
+        """Load every inventory source, or assemble a version from sources already loaded by `start_loading`.
+
+        Sources missing from `sources` come up empty and are listed in `pending_sources`.
+        """
+        if sources is None:
+            sources = {name: future.result() for name, future in start_loading().items()}
+        self.pending_sources = [name for name in SOURCES if name not in sources]
+        self.garages_lots = sources["garages_lots"]
+        self.parking_meters = sources.get("parking_meters", pd.DataFrame(columns=METER_COLUMNS))
+        self.permit_zones, self.permit_index = sources.get("permit_zones", (None, None))
+        if self.permit_zones is None:
+            self.permit_zones = pd.DataFrame(columns=PERMIT_COLUMNS)
+            self.permit_index = PermitZoneIndex(self.permit_zones)
+        with span("load.destinations"):
+            self.destinations = self._load_destinations()
+        with span("load.schedules"):
+            self.schedules = ScheduleBook(self.garages_lots, self.parking_meters, self.permit_zones)
+            self.cost_engine = CostEngine(self.garages_lots, self.parking_meters, self.permit_zones, self.schedules)
+        with span("load.walk_times"):
+            # Routing covers every spot, so a partial version makes do with straight-line walk times.
+            if "walk_times" in sources:
+                self.walk_times = sources["walk_times"]
+            else:
+                self.walk_times = None if self.pending_sources else self._load_walk_times()
+        self.lock = threading.Lock()
+        self.data_version = 0
+        self.inventory_version = 1
+        
+    @staticmethod
+    def _load_garages_lots():
+        if os.path.exists(inventory_path("garages_lots")):
+            return load_inventory_table(inventory_path("garages_lots"))
+        
+        real_ppa_facilities = [
+            {"name": "8th & Race Garage", "lat": 39.9565, "lon": -75.1525, "operator": "PPA", "type": "garage"},
+            {"name": "2nd & Lombard Garage", "lat": 39.9387, "lon": -75.1436, "operator": "PPA", "type": "garage"},
+            {"name": "11th & Vine Garage", "lat": 39.9587, "lon": -75.1578, "operator": "PPA", "type": "garage"},
+            {"name": "AutoPark at the Bell", "lat": 39.9496, "lon": -75.1503, "operator": "PPA", "type": "garage"},
+            {"name": "Convention Center Garage", "lat": 39.9553, "lon": -75.1596, "operator": "PPA", "type": "garage"},
+            {"name": "Independence Mall Garage", "lat": 39.9496, "lon": -75.1470, "operator": "PPA", "type": "garage"},
+            {"name": "University City Garage", "lat": 39.9522, "lon": -75.1932, "operator": "UPHS", "type": "garage"},
+            {"name": "Temple University Garage", "lat": 39.9812, "lon": -75.1567, "operator": "Temple", "type": "garage"},
+            {"name": "Art Museum Garage", "lat": 39.9656, "lon": -75.1810, "operator": "PMA", "type": "garage"},
+            {"name": "Fashion District Garage", "lat": 39.9520, "lon": -75.1598, "operator": "Private", "type": "garage"},
+        ]
+        
+        garages_data = []
+        for i, facility in enumerate(real_ppa_facilities):
+            # Assign actual rates
+            if facility["name"] == "8th & Race Garage":
+                hourly_rate = 12
+                daily_max = 17
+            elif facility["name"] == "2nd & Lombard Garage":
+                hourly_rate = 6  # approx $3/30min
+                daily_max = 25
+            elif facility["name"] == "11th & Vine Garage":
+                hourly_rate = 12
+                daily_max = 18
+            elif facility["name"] == "AutoPark at the Bell":
+                hourly_rate = 14
+                daily_max = 32
+            elif facility["name"] == "Convention Center Garage":
+                hourly_rate = 17
+                daily_max = 40
+            elif facility["name"] == "Independence Mall Garage":
+                hourly_rate = 14
+                daily_max = 32
+            elif facility["name"] == "University City Garage":
+                hourly_rate = 15.95
+                daily_max = 30  # approximate
+            elif facility["name"] == "Temple University Garage":
+                hourly_rate = 7
+                daily_max = 22
+            elif facility["name"] == "Art Museum Garage":
+                hourly_rate = 10  # evening flat rate
+                daily_max = 39
+            elif facility["name"] == "Fashion District Garage":
+                hourly_rate = 10
+                daily_max = 35
+            else:
+                hourly_rate = 5
+                daily_max = 20
+            
+            base_capacity = 400 if facility["operator"] == "PPA" else 200
+            available_spots = max(1, int(base_capacity * 0.5))  # just placeholder
+            
+            garages_data.append({
+                "id": f"facility_{i+1}",
+                "name": facility["name"],
+                "type": facility["type"],
+                "operator": facility["operator"],
+                "latitude": facility["lat"],
+                "longitude": facility["lon"],
+                "total_spots": base_capacity,
+                "available_spots": available_spots,
+                "hourly_rate": round(hourly_rate, 2),
+                "daily_max": round(daily_max, 2),
+                "hours_operation": "24/7" if facility["operator"] == "PPA" else "6AM-11PM",
+                "features": ["covered", "24_hour_access", "security", "handicap_accessible"],
+                "payment_methods": ["cash", "credit_card", "mobile_app"],
+                "phone": f"215-683-{1000 + i}",
+                "address": f"{facility['name'].split()[0]} Street, Philadelphia, PA",
+                "last_updated": datetime.now()
+            })
+        
+        return pd.DataFrame(garages_data)
+
+    @staticmethod
+    def _load_parking_meters():
+        if os.path.exists(inventory_path("parking_meters")):
+            return load_inventory_table(inventory_path("parking_meters"))
+        
+        rng = np.random.RandomState(43)
+        
+        metered_streets = [
+            {"street": "Market St", "from_block": 400, "to_block": 2000, "base_lat": 39.9526, "base_lon": -75.1652, "zone": "Center City Core", "rate": 4.00},
+            {"street": "Chestnut St", "from_block": 400, "to_block": 2000, "base_lat": 39.9489, "base_lon": -75.1634, "zone": "Center City Core", "rate": 4.00},
+            {"street": "Walnut St", "from_block": 400, "to_block": 2000, "base_lat": 39.9467, "base_lon": -75.1632, "zone": "Center City Core", "rate": 4.00},
+            {"street": "Spring Garden St", "from_block": 200, "to_block": 2400, "base_lat": 39.9611, "base_lon": -75.1580, "zone": "Center City Area", "rate": 3.50},
+            {"street": "Delaware Ave", "from_block": 100, "to_block": 1200, "base_lat": 39.9530, "base_lon": -75.1403, "zone": "Long-term", "rate": 2.50},
+            {"street": "2nd St", "from_block": 2100, "to_block": 2800, "base_lat": 39.9676, "base_lon": -75.1427, "zone": "Northern Liberties", "rate": 2.00},
+        ]
+        
+        meters_data = []
+        meter_id_counter = 1000000
+        
+        for street_info in metered_streets:
+            num_meters = rng.randint(8, 15)
+            
+            for i in range(num_meters):
+                block = rng.randint(street_info["from_block"], street_info["to_block"])
+                block_offset = (block - street_info["from_block"]) / (street_info["to_block"] - street_info["from_block"])
+                lat_variation = rng.uniform(-0.008, 0.008) * block_offset
+                lon_variation = rng.uniform(-0.008, 0.008) * block_offset
+                
+                zone_description = {
+                    "Center City Core": "Arch to Locust St, 4th to 20th St",
+                    "Center City Area": "Spring Garden to Bainbridge St, River to River",
+                    "Long-term": "4-hour and 12-hour time limits",
+                    "Northern Liberties": "Northern Liberties neighborhood",
+                }.get(street_info["zone"], street_info["zone"])
+                
+                meters_data.append({
+                    "id": f"meter_{meter_id_counter}",
+                    "meter_number": str(meter_id_counter),
+                    "street_name": street_info["street"],
+                    "block_number": str(block),
+                    "side": rng.choice(["North", "South", "East", "West"]),
+                    "latitude": street_info["base_lat"] + lat_variation,
+                    "longitude": street_info["base_lon"] + lon_variation,
+                    "rate_per_hour": street_info["rate"],
+                    "time_limit_hours": rng.choice([1, 2, 4]),
+                    "enforcement_days": "MON-SAT",
+                    "enforcement_start": "08:00",
+                    "enforcement_end": "20:00",
+                    "meter_type": rng.choice(["single_space", "multi_space"]),
+                    "payment_methods": ["coin", "credit_card", "mobile_app"],
+                    "operational_status": rng.choice(["active", "out_of_order"], p=[0.95, 0.05]),
+                    "zone": street_info["zone"],
+                    "zone_description": zone_description,
+                    "mobile_zone_number": f"91{rng.randint(1000, 9999)}"
+                })
+                
+                meter_id_counter += 1
+        
+        return pd.DataFrame(meters_data)
+    
+    @staticmethod
+    def _load_permit_zones():
+        if os.path.exists(PERMIT_BLOCKS_GEOJSON):
+            return load_permit_blocks_geojson(PERMIT_BLOCKS_GEOJSON)
+        
+        rng = np.random.RandomState(44)
+        
+        neighborhoods = [
+            {"name": "Center City East", "zone": "A", "base_lat": 39.9500, "base_lon": -75.1500, "permit_cost": 35},
+            {"name": "Center City West", "zone": "B", "base_lat": 39.9500, "base_lon": -75.1700, "permit_cost": 35},
+            {"name": "Northern Liberties", "zone": "C", "base_lat": 39.9676, "base_lon": -75.1427, "permit_cost": 35},
+            {"name": "South Philadelphia", "zone": "D", "base_lat": 39.9200, "base_lon": -75.1600, "permit_cost": 35},
+            {"name": "University City", "zone": "E", "base_lat": 39.9522, "base_lon": -75.1932, "permit_cost": 35},
+            {"name": "Fishtown", "zone": "F", "base_lat": 39.9676, "base_lon": -75.1300, "permit_cost": 35},
+        ]
+        
+        permit_data = []
+        
+        for neighborhood in neighborhoods:
+            num_blocks = rng.randint(15, 25)
+            
+            for i in range(num_blocks):
+                street_name = f"{rng.choice(['N', 'S'])} {rng.randint(2, 25)}th St"
+                block_number = str(rng.randint(100, 2800))
+                
+                lat_offset = rng.uniform(-0.015, 0.015)
+                lon_offset = rng.uniform(-0.015, 0.015)
+                
+                permit_required = rng.choice([True, False], p=[0.8, 0.2])
+                
+                time_restrictions = rng.choice([
+                    "8AM-6PM Mon-Fri",
+                    "8AM-8PM Mon-Sat",
+                    "6PM-8AM Daily (Overnight Only)"
+                ], p=[0.5, 0.3, 0.2])
+                
+                if permit_required:
+                    visitor_allowed = rng.choice([True, False], p=[0.7, 0.3])
+                    max_visitor_hours = rng.choice([2, 3, 4]) if visitor_allowed else 0
+                else:
+                    visitor_allowed = True
+                    max_visitor_hours = 999
+                
+                permit_data.append({
+                    "id": f"permit_{neighborhood['zone']}_{i+1}",
+                    "neighborhood": neighborhood["name"],
+                    "permit_zone": f"Zone {neighborhood['zone']}",
+                    "street_name": street_name,
+                    "block_number": block_number,
+                    "block_side": rng.choice(["Both", "North", "South", "East", "West"]),
+                    "latitude": neighborhood["base_lat"] + lat_offset,
+                    "longitude": neighborhood["base_lon"] + lon_offset,
+                    "permit_required": permit_required,
+                    "permit_type": f"Residential Zone {neighborhood['zone']}" if permit_required else "No Permit Required",
+                    "permit_cost_annual": neighborhood["permit_cost"] if permit_required else 0,
+                    "time_restrictions": time_restrictions,
+                    "visitor_parking_allowed": visitor_allowed,
+                    "max_visitor_hours": max_visitor_hours,
+                    "estimated_spaces": rng.randint(12, 28),
+                    "last_updated": datetime.now() - timedelta(days=rng.randint(1, 30)),
+                    "geometry": synthetic_block_geometry(neighborhood["base_lat"] + lat_offset, neighborhood["base_lon"] + lon_offset)
+                })
+        
+        return pd.DataFrame(permit_data)
+
+    @staticmethod
+    def _load_destinations():
+        return {
+            "Independence Hall": {
+                "lat": 39.9496, "lon": -75.1503, "parking": "none", 
+                "category": "historic", "description": "Birthplace of America - no on-site parking"
+            },
+            "Liberty Bell Center": {
+                "lat": 39.9496, "lon": -75.1503, "parking": "none",
+                "category": "historic", "description": "Iconic symbol - no on-site parking"
+            },
+            "Philadelphia Art Museum": {
+                "lat": 39.9656, "lon": -75.1810, "parking": "limited_paid",
+                "category": "museum", "description": "World-class art museum - limited paid parking"
+            },
+            "Reading Terminal Market": {
+                "lat": 39.9526, "lon": -75.1596, "parking": "garage_nearby",
+                "category": "food", "description": "Historic food market - nearby parking garages"
+            },
+            "Citizens Bank Park": {
+                "lat": 39.9061, "lon": -75.1665, "parking": "stadium_lots",
+                "category": "sports", "description": "Phillies stadium - large parking lots available"
+            },
+            "Lincoln Financial Field": {
+                "lat": 39.9008, "lon": -75.1675, "parking": "stadium_lots", 
+                "category": "sports", "description": "Eagles stadium - extensive parking"
+            },
+            "Wells Fargo Center": {
+                "lat": 39.9012, "lon": -75.1720, "parking": "stadium_lots",
+                "category": "sports", "description": "76ers/Flyers arena - ample parking"
+            },
+            "University of Pennsylvania": {
+                "lat": 39.9522, "lon": -75.1932, "parking": "garage_available",
+                "category": "university", "description": "Ivy League university - parking garages available"
+            },
+            "Temple University": {
+                "lat": 39.9812, "lon": -75.1567, "parking": "garage_available",
+                "category": "university", "description": "Major university - multiple parking options"
+            },
+            "Hospital of the University of Pennsylvania": {
+                "lat": 39.9496, "lon": -75.1924, "parking": "garage_available",
+                "category": "hospital", "description": "Major hospital - patient/visitor parking"
+            },
+            "Rittenhouse Square": {
+                "lat": 39.9496, "lon": -75.1719, "parking": "meter_street",
+                "category": "shopping", "description": "Upscale shopping district - metered street parking"
+            },
+            "Fashion District Philadelphia": {
+                "lat": 39.9520, "lon": -75.1598, "parking": "mall_garage",
+                "category": "shopping", "description": "Major shopping center - parking garage included"
+            },
+            "30th Street Station": {
+                "lat": 39.9558, "lon": -75.1819, "parking": "limited_expensive",
+                "category": "transportation", "description": "Major train station - limited expensive parking"
+            },
+            "South Street": {
+                "lat": 39.9413, "lon": -75.1582, "parking": "meter_street",
+                "category": "entertainment", "description": "Entertainment district - metered parking"
+            },
+            "Old City": {
+                "lat": 39.9500, "lon": -75.1450, "parking": "meter_limited",
+                "category": "historic", "description": "Historic district - limited metered parking"
+            },
+            "Northern Liberties": {
+                "lat": 39.9676, "lon": -75.1427, "parking": "street_some_permit",
+                "category": "neighborhood", "description": "Trendy neighborhood - mix of street parking"
+            }
+        }
+
+    def _load_walk_times(self):
+        spots = {}
+        for frame in (self.garages_lots, self.parking_meters, self.permit_zones):
+            for spot_id, lat, lon in zip(frame["id"], frame["latitude"], frame["longitude"]):
+                spots[spot_id] = (float(lat), float(lon))
+        return load_walk_time_index(self.destinations, spots)
+
+def _parse_heavy(path: str) -> bool:
+    return os.path.exists(path) and os.path.getsize(path) >= PARSE_IN_PROCESS_BYTES
+
+
+def _parse_file(parsers: Optional[ProcessPoolExecutor], parse, path: str):
+    if parsers is None or not _parse_heavy(path):
+        return parse(path)
+    return parsers.submit(parse, path).result()
+
+
+def _timed_source(name: str, load):
+    with span(f"load.{name}"):
+        return load()
+
+
+def start_loading() -> Dict[str, Future]:
+    """Start loading garages, meters and permit blocks side by side; one future per source."""
+    files = [inventory_path("garages_lots"), inventory_path("parking_meters"), PERMIT_BLOCKS_GEOJSON,
+             PERMIT_ZONES_GEOJSON]
+    parsers = None
+    if PARSE_PROCESSES > 0 and any(_parse_heavy(path) for path in files):
+        parsers = ProcessPoolExecutor(PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+    def inventory(name: str, synthetic):
+        path = inventory_path(name)
+        return _parse_file(parsers, load_inventory_table, path) if os.path.exists(path) else synthetic()
+
+    def permit_zones():
+        if os.path.exists(PERMIT_BLOCKS_GEOJSON):
+            blocks = _parse_file(parsers, load_permit_blocks_geojson, PERMIT_BLOCKS_GEOJSON)
+        else:
+            blocks = ComprehensiveParkingDatabase._load_permit_zones()
+        zones = _parse_file(parsers, load_permit_zone_polygons, PERMIT_ZONES_GEOJSON)
+        # The polygon index is built here, as soon as its blocks arrive, not after every source is in.
+        return blocks, PermitZoneIndex(blocks, zones)
+
+    loaders = ThreadPoolExecutor(len(SOURCES), thread_name_prefix="philaspot-load")
+    futures = {
+        "garages_lots": loaders.submit(_timed_source, "garages_lots", lambda: inventory(
+            "garages_lots", ComprehensiveParkingDatabase._load_garages_lots)),
+        "parking_meters": loaders.submit(_timed_source, "parking_meters", lambda: inventory(
+            "parking_meters", ComprehensiveParkingDatabase._load_parking_meters)),
+        "permit_zones": loaders.submit(_timed_source, "permit_zones", permit_zones),
+    }
+    # Queued work still runs; the pools just wind down once it has.
+    loaders.shutdown(wait=False)
+    if parsers is not None:
+        threading.Thread(target=lambda: (loaders.shutdown(wait=True), parsers.shutdown(wait=True)),
+                         name="philaspot-load-cleanup", daemon=True).start()
+    return futures
+
+
+def load_database_progressively() -> Tuple[ComprehensiveParkingDatabase, Future]:
+    """A garages-only version as soon as garages are in, plus a future for the complete version."""
+    futures = start_loading()
+    partial = ComprehensiveParkingDatabase({"garages_lots": futures["garages_lots"].result()})
+    complete: Future = Future()
+
+    def assemble():
+        try:
+            sources = {name: future.result() for name, future in futures.items()}
+            # The partial version's garage frame takes live updates; the complete one starts from its own copy.
+            sources["garages_lots"] = sources["garages_lots"].copy()
+            complete.set_result(ComprehensiveParkingDatabase(sources))
+        except Exception as e:
+            complete.set_exception(e)
+
+    threading.Thread(target=assemble, name="philaspot-load-assemble", daemon=True).start()
+    return partial, complete
+
+
+def load_resident_database() -> ComprehensiveParkingDatabase:
+    """Garages and permit zone outlines only, for when meters and permit blocks live in on-disk partitions."""
+    blocks = pd.DataFrame(columns=PERMIT_COLUMNS)
+    return ComprehensiveParkingDatabase({
+        "garages_lots": ComprehensiveParkingDatabase._load_garages_lots(),
+        "parking_meters": pd.DataFrame(columns=METER_COLUMNS),
+        "permit_zones": (blocks, PermitZoneIndex(blocks, load_permit_zone_polygons())),
+        "walk_times": None,
+    })
+
+
+class AdvancedParkingPredictor:
+    BASE_PATTERNS = {
+        "garage": {
+            "weekday": {7: 0.2, 8: 0.1, 9: 0.15, 10: 0.3, 11: 0.25, 12: 0.2, 13: 0.2, 14: 0.25, 15: 0.3, 16: 0.25, 17: 0.1, 18: 0.15, 19: 0.4, 20: 0.6, 21: 0.7, 22: 0.8},
+            "weekend": {8: 0.6, 9: 0.5, 10: 0.4, 11: 0.3, 12: 0.2, 13: 0.2, 14: 0.25, 15: 0.3, 16: 0.4, 17: 0.5, 18: 0.6, 19: 0.7, 20: 0.8, 21: 0.8, 22: 0.9}
+        },
+        "meter": {
+            "weekday": {8: 0.2, 9: 0.1, 10: 0.15, 11: 0.1, 12: 0.05, 13: 0.1, 14: 0.15, 15: 0.2, 16: 0.3, 17: 0.1, 18: 0.2, 19: 0.4, 20: 0.8},
+            "weekend": {9: 0.7, 10: 0.6, 11: 0.5, 12: 0.3, 13: 0.2, 14: 0.25, 15: 0.4, 16: 0.5, 17: 0.6, 18: 0.7, 19: 0.8, 20: 0.9}
+        }
+    }
+    
+    def __init__(self, database):
+        self.database = database
+        self.cache = PredictionCache()
+    
+    def base_availability(self, location_type: str, target_datetime: datetime) -> float:
+        pattern_type = "weekend" if target_datetime.weekday() >= 5 else "weekday"
+        return self.BASE_PATTERNS.get(location_type, {}).get(pattern_type, {}).get(target_datetime.hour, 0.5)
+        
+    @timed("predict.availability")
+    def predict_availability(self, location_type: str, location_id: str, target_datetime: datetime,
+                             report_counters: DecayedReportCounters = None) -> Dict:
+        # Same location, same 15-minute slot of the week, no new reports: same answer.
+        bucket = (location_type, start_slot(target_datetime), report_counters is not None)
+        version = report_counters.version(location_id) if report_counters else 0
+        cached = self.cache.get(location_id, bucket, version)
+        if not is_missing(cached):
+            return cached
+        
+        weights = report_counters.weights(location_id) if report_counters else None
+        availability, confidence, report_weight = blend_with_reports(
+            self.base_availability(location_type, target_datetime), weights
+        )
+        
+        prediction = {
+            "availability": max(0.05, min(0.95, availability)),
+            "confidence": confidence,
+            "factors": {
+                "time_of_day": target_datetime.hour,
+                "day_type": "weekend" if target_datetime.weekday() >= 5 else "weekday",
+                "user_reports": round(report_weight, 2)
+            }
+        }
+        self.cache.put(location_id, bucket, version, prediction)
+        return prediction
+
+# Report categories from the UI and imports, mapped to the location types the predictor patterns use.
+REPORT_PREDICTOR_TYPES = {"meter": "meter", "permit_zone": "permit", "permit": "permit"}
+
+
+class ComprehensiveParkingAPI:
+    def __init__(self, database, partitions=None):
+        self.database = database
+        self.partitions = partitions
+        self.predictor = AdvancedParkingPredictor(database)
+        self.reports = ReportStore()
+        self.report_buffer = ReportWriteBuffer(self.reports)
+        self.report_counters = DecayedReportCounters.from_store(self.reports)
+        self.report_log = ReportLog.from_store(self.reports)
+        with span("load.history"):
+            self.history = TimeSeriesStore()
+            # The in-memory history starts from what the report store still holds for the hourly tier.
+            record_report_rows(self.history, self.reports.status_rows(time.time() - TIERS[1][1] * TIERS[1][2]))
+        self.heatmap = AvailabilityHeatmap(self.predictor)
+        self.search_cache = SearchCellCache()
+        self.holds = HoldLedger()
+        with span("load.reachability"):
+            self.reachability = ReachabilityIndex.build(
+                spot_points(database, partitions), database.destinations, database.walk_times
+            )
+    
+    @timed("search.find_parking_near_destination")
+    def find_parking_near_destination(self, destination: str, radius_miles: float = 1.0, user_preferences: Dict = None,
+                                      target_datetime: datetime = None, stay_hours: float = 2.0) -> Dict:
+        # Pin one inventory version for the whole search; a reload swapping in the next one can't split it.
+        database = self.database
+        if destination not in database.destinations:
+            return {"error": "Destination not found"}
+        
+        dest_info = database.destinations[destination]
+        database = self._area(database, dest_info["lat"], dest_info["lon"], radius_miles)
+        network_minutes = database.walk_times.lookup(destination) if database.walk_times else None
+        return {
+            "destination": destination,
+            "destination_info": dest_info,
+            **self._search_near(database, dest_info["lat"], dest_info["lon"], radius_miles, user_preferences,
+                                target_datetime, stay_hours, network_minutes)
+        }
+    
+    @timed("search.find_parking_near_point")
+    def find_parking_near_point(self, lat: float, lon: float, radius_miles: float = 1.0, user_preferences: Dict = None,
+                                target_datetime: datetime = None, stay_hours: float = 2.0) -> Dict:
+        database = self._area(self.database, lat, lon, radius_miles)
+        target_datetime = target_datetime or datetime.now()
+        legality = database.cost_engine.quote(target_datetime, stay_hours)
+        # Nearby points share a cell's candidate set; the search below refines it with exact distances.
+        # A partitioned region is already just the surrounding tiles, and its row positions are its own.
+        candidates = None if database is not self.database else self.search_cache.candidates(
+            database, legality, lat, lon, radius_miles, user_preferences, target_datetime, stay_hours
+        )
+        return {
+            "destination": f"{lat:.5f}, {lon:.5f}",
+            "destination_info": {"lat": lat, "lon": lon},
+            **self._search_near(database, lat, lon, radius_miles, user_preferences, target_datetime, stay_hours,
+                                legality=legality, candidates=candidates)
+        }
+    
+    def _region(self, database, tiles: List[str]):
+        """A database over the resident garages plus the meters and permit blocks in `tiles`."""
+        
+        def build(frames: Dict[str, pd.DataFrame]):
+            blocks = frames["permit_zones"]
+            return ComprehensiveParkingDatabase({
+                "garages_lots": database.garages_lots,
+                "parking_meters": frames["parking_meters"],
+                "permit_zones": (blocks, PermitZoneIndex(blocks, database.permit_index.zones)),
+                "walk_times": None,
+            })
+        
+        return self.partitions.region(tiles, build)
+    
+    def _area(self, database, lat: float, lon: float, radius_miles: float):
+        """The database a search around a point runs on: the whole city, or the partition tiles it touches."""
+        if self.partitions is None:
+            return database
+        return self._region(database, self.partitions.tiles_around(lat, lon, radius_miles))
+    
+    def spot_candidates(self) -> pd.DataFrame:
+        """id, category, label and position of every spot, whether resident or in partitions."""
+        candidates = self.database.cost_engine.candidates
+        if self.partitions is None:
+            return candidates
+        return pd.concat([candidates, self.partitions.spots], ignore_index=True)
+    
+    def get_meters_in_view(self, bounds: Tuple[float, float, float, float] = None) -> pd.DataFrame:
+        """Meters for the map; with partitions, only those inside (south, west, north, east), loading their tiles."""
+        if self.partitions is None:
+            return self.database.parking_meters
+        south, west, north, east = bounds or DEFAULT_VIEW
+        meters = self.partitions.frames(self.partitions.tiles_in_bounds(south, west, north, east))["parking_meters"]
+        return meters[meters["latitude"].between(south, north) & meters["longitude"].between(west, east)]
+    
+    def _search_near(self, database, dest_lat: float, dest_lon: float, radius_miles: float, user_preferences: Dict,
+                     target_datetime: datetime, stay_hours: float, network_minutes: Dict[str, float] = None,
+                     legality: Dict = None, candidates: Dict[str, np.ndarray] = None) -> Dict:
+        target_datetime = target_datetime or datetime.now()
+        legality = legality or database.cost_engine.quote(target_datetime, stay_hours)
+        legal_only = bool(user_preferences and user_preferences.get('legal_only'))
+        
+        def walk_minutes(location_id: str, distance: float):
+            # With a walking network, a spot is only in range if the walk itself is.
+            if network_minutes is None:
+                return round(straight_line_minutes(distance), 1)
+            minutes = network_minutes.get(location_id)
+            if minutes is None or minutes * WALK_SPEED_MPH / 60 > radius_miles:
+                return None
+            return round(minutes, 1)
+        
+        nearby_options = {
+            "garages_lots": [],
+            "meters": [],
+            "permit_zones": []
+        }
+        
+        # Find nearby garages and lots
+        garage_rules = legality["garages_lots"]
+        garages = database.garages_lots if candidates is None else database.garages_lots.iloc[candidates["garages_lots"]]
+        for position, location in garages.iterrows():
+            distance = geodesic((dest_lat, dest_lon), (location.latitude, location.longitude)).miles
+            walk_time = walk_minutes(location.id, distance) if distance <= radius_miles else None
+            if walk_time is not None:
+                
+                if legal_only and not garage_rules["legal"][position]:
+                    continue
+                
+                if user_preferences:
+                    if user_preferences.get('needs_ev_charging') and 'ev_charging' not in location.features:
+                        continue
+                    if user_preferences.get('needs_handicap') and 'handicap_accessible' not in location.features:
+                        continue
+                
+                prediction = self.predictor.predict_availability(
+                    location.type, location.id, target_datetime, self.report_counters
+                )
+                
+                nearby_options["garages_lots"].append({
+                    "id": location.id,
+                    "name": location['name'],
+                    "type": location.type,
+                    "operator": location.operator,
+                    "distance": round(distance, 2),
+                    "walk_minutes": walk_time,
+                    "total_spots": location.total_spots,
+                    "available_spots": location.available_spots,
+                    "hourly_rate": location.hourly_rate,
+                    "daily_max": location.daily_max,
+                    "hours": location.hours_operation,
+                    "features": location.features,
+                    "payment_methods": location.payment_methods,
+                    "phone": location.phone,
+                    "coordinates": [location.latitude, location.longitude],
+                    "prediction": prediction,
+                    "legal": bool(garage_rules["legal"][position]),
+                    "estimated_cost": float(garage_rules["cost"][position]),
+                    "free_now": False,
+                    "enforced": True
+                })
+        
+        # Find nearby meters
+        meter_rules = legality["meters"]
+        meters = database.parking_meters if candidates is None else database.parking_meters.iloc[candidates["meters"]]
+        for position, meter in meters.iterrows():
+            distance = geodesic((dest_lat, dest_lon), (meter.latitude, meter.longitude)).miles
+            walk_time = walk_minutes(meter.id, distance) if distance <= radius_miles else None
+            if walk_time is not None and meter.operational_status == "active":
+                
+                if legal_only and not meter_rules["legal"][position]:
+                    continue
+                
+                prediction = self.predictor.predict_availability(
+                    "meter", meter.id, target_datetime, self.report_counters
+                )
+                
+                nearby_options["meters"].append({
+                    "id": meter.id,
+                    "street": meter.street_name,
+                    "block": meter.block_number,
+                    "side": meter.side,
+                    "distance": round(distance, 2),
+                    "walk_minutes": walk_time,
+                    "rate": meter.rate_per_hour,
+                    "time_limit": meter.time_limit_hours,
+                    "enforcement_days": meter.enforcement_days,
+                    "enforcement_hours": f"{meter.enforcement_start}-{meter.enforcement_end}",
+                    "payment_methods": meter.payment_methods,
+                    "coordinates": [meter.latitude, meter.longitude],
+                    "prediction": prediction,
+                    "zone": meter.zone,
+                    "zone_description": meter.zone_description,
+                    "mobile_zone_number": meter.mobile_zone_number,
+                    "legal": bool(meter_rules["legal"][position]),
+                    "estimated_cost": float(meter_rules["cost"][position]),
+                    "free_now": bool(meter_rules["free"][position]),
+                    "enforced": bool(meter_rules["enforced"][position])
+                })
+        
+        # Find nearby permit zones by distance to the block polygon, not its centroid
+        permit_rules = legality["permit_zones"]
+        permit_distances = database.permit_index.distances_miles(dest_lat, dest_lon, radius_miles)
+        for position, distance in permit_distances.items():
+            zone = database.permit_zones.iloc[position]
+            walk_time = walk_minutes(zone.id, distance)
+            if walk_time is not None:
+                
+                if legal_only and not permit_rules["legal"][position]:
+                    continue
+                
+                prediction = self.predictor.predict_availability(
+                    "permit", zone.id, target_datetime, self.report_counters
+                )
+                
+                nearby_options["permit_zones"].append({
+                    "id": zone.id,
+                    "neighborhood": zone.neighborhood,
+                    "street": zone.street_name,
+                    "block": zone.block_number,
+                    "distance": round(distance, 2),
+                    "walk_minutes": walk_time,
+                    "permit_required": zone.permit_required,
+                    "permit_zone": zone.permit_zone,
+                    "restrictions": zone.time_restrictions,
+                    "visitor_allowed": zone.visitor_parking_allowed,
+                    "max_visitor_hours": zone.max_visitor_hours,
+                    "estimated_spaces": zone.estimated_spaces,
+                    "coordinates": [zone.latitude, zone.longitude],
+                    "prediction": prediction,
+                    "legal": bool(permit_rules["legal"][position]),
+                    "estimated_cost": float(permit_rules["cost"][position]),
+                    "free_now": True,
+                    "enforced": bool(permit_rules["enforced"][position])
+                })
+        
+        for category in nearby_options:
+            nearby_options[category].sort(key=lambda x: x["distance"])
+        
+        return {
+            "search_radius": radius_miles,
+            "target_datetime": target_datetime,
+            "stay_hours": stay_hours,
+            "walk_source": "network" if network_minutes is not None else "straight_line",
+            "parking_options": nearby_options,
+            "total_found": sum(len(options) for options in nearby_options.values())
+        }
+    
+    @timed("search.find_cheapest_parking")
+    def find_cheapest_parking(self, destination: str, stay_hours: float, arrival: datetime = None,
+                              radius_miles: float = 1.0, limit: int = 10) -> pd.DataFrame:
+        dest_info = self.database.destinations[destination]
+        return self.find_cheapest_parking_at(dest_info["lat"], dest_info["lon"], stay_hours, arrival, radius_miles, limit)
+    
+    def find_cheapest_parking_at(self, lat: float, lon: float, stay_hours: float, arrival: datetime = None,
+                                 radius_miles: float = 1.0, limit: int = 10) -> pd.DataFrame:
+        database = self._area(self.database, lat, lon, radius_miles)
+        return database.cost_engine.cheapest(arrival or datetime.now(), stay_hours, lat, lon, radius_miles, limit)
+    
+    @timed("search.batch")
+    def find_parking_batch(self, points: List[Dict], radius_miles: float = 0.5, stay_hours: float = 2.0,
+                           arrival: datetime = None, limit: int = 10, legal_only: bool = True,
+                           workers: int = None) -> Tuple[pd.DataFrame, List[Dict]]:
+        origins = origins_frame(points)
+        workers = workers or default_workers()
+        if self.partitions is None:
+            results = batch_search(
+                self.database.cost_engine, origins, radius_miles, arrival, stay_hours, limit, legal_only, workers
+            )
+            return results, coverage_summary(results, origins)
+        
+        # Origins are grouped by tile and each group searched over the tiles within reach of it. Groups run
+        # under their row positions as names, so the pieces can be put back in input order.
+        arrival = arrival or datetime.now()
+        database = self.database
+        lats, lons = origins["lat"].to_numpy(), origins["lon"].to_numpy()
+        cells = [tile_name(iy, ix) for iy, ix in zip(*tile_indices(lats, lons, self.partitions.tile_miles))]
+        pieces = []
+        for positions in pd.Series(range(len(origins))).groupby(cells, sort=False).groups.values():
+            positions = np.asarray(positions)
+            tiles = self.partitions.tiles_around_points(lats[positions], lons[positions], radius_miles)
+            group = origins.iloc[positions].assign(name=positions)
+            pieces.append(batch_search(
+                self._region(database, tiles).cost_engine, group, radius_miles, arrival, stay_hours, limit,
+                legal_only, workers
+            ))
+        results = pd.concat(pieces, ignore_index=True) if pieces else batch_search(
+            database.cost_engine, origins, radius_miles, arrival, stay_hours, limit, legal_only, workers
+        )
+        results = results.sort_values(["origin", "rank"], kind="stable").reset_index(drop=True)
+        results["origin"] = origins["name"].to_numpy()[results["origin"].to_numpy(dtype=np.int64)]
+        return results, coverage_summary(results, origins)
+    
+    def hold_spot(self, location_id: str, session: str) -> Optional[float]:
+        """Hold a spot for a session until the returned expiry; None if a garage's free spaces are all held."""
+        garages = self.database.garages_lots
+        match = np.flatnonzero((garages["id"] == location_id).to_numpy())
+        capacity = int(garages["available_spots"].iat[match[0]]) if len(match) else None
+        return self.holds.place(location_id, session, capacity)
+    
+    def rank_for_session(self, options: List[Dict], session: str, context: str = "") -> List[Dict]:
+        """Order options so sessions spread over them in proportion to the space each has left.
+        
+        Every option's weight is its expected open spaces (garage spaces net of other sessions' holds, or predicted
+        availability times spaces on the street), faded by distance. Each session draws its own weighted order
+        (Efraimidis-Spirakis keys), seeded by session and `context` so it stays put across reruns.
+        """
+        held = self.holds.held_counts(option["id"] for option in options)
+        own = self.holds.holding(session)
+        weights = np.empty(len(options))
+        for i, option in enumerate(options):
+            availability = option["prediction"]["availability"]
+            if option["category"] == "garage_lot":
+                others = held.get(option["id"], 0) - (1 if own and own[0] == option["id"] else 0)
+                option["held"] = others
+                spaces = max(0, option["available_spots"] - others)
+            elif option["category"] == "permit":
+                spaces = availability * option["estimated_spaces"]
+            else:
+                spaces = availability
+            weights[i] = spaces * np.exp(-option["distance"] / RANK_DISTANCE_MILES) if option.get("legal", True) else 0.0
+        
+        rng = np.random.RandomState(zlib.crc32(f"{session}|{context}".encode()))
+        draws = rng.random_sample(len(options))
+        with np.errstate(divide="ignore"):
+            keys = np.where(weights > 0, np.log(draws) / weights, -np.inf)
+        # Options with no space left (or not legal for the stay) trail the rest, nearest first.
+        order = sorted(range(len(options)), key=lambda i: (-keys[i], options[i]["distance"]))
+        return [options[i] for i in order]
+    
+    @timed("heatmap.layer")
+    def get_availability_heatmap(self, zoom: int, target_datetime: datetime = None) -> List[List[float]]:
+        database = self.database
+        # Citywide: with partitions, every tile's meters and permit blocks feed the layer.
+        area = self._region(database, list(self.partitions.tiles)) if self.partitions is not None else None
+        return self.heatmap.layer(database, zoom, target_datetime, self.report_counters, area)
+    
+    def swap_database(self, database):
+        self.database = database
+        self.predictor.database = database
+        self.predictor.cache.clear()
+        self.search_cache.clear()
+        if self.partitions is not None:
+            self.partitions.clear_regions()
+        self.reachability.sync_spots(spot_points(database, self.partitions), database.walk_times)
+        for name, info in database.destinations.items():
+            if self.reachability.points.get(name) != (info["lat"], info["lon"]):
+                self.reachability.add_point(name, info["lat"], info["lon"])
+    
+    def get_reachable_destinations(self, location_id: str, max_minutes: float = None) -> List[Dict]:
+        return self.reachability.reachable(location_id, max_minutes)
+    
+    def add_point_of_interest(self, name: str, lat: float, lon: float):
+        self.reachability.add_point(name, lat, lon)
+    
+    def get_permit_rules_at(self, lat: float, lon: float) -> Dict:
+        rules = self._area(self.database, lat, lon, 0).permit_index.rules_at(lat, lon)
+        if rules is None:
+            return {"match": "none", "permit_required": False}
+        return rules
+    
+    def _predictor_type(self, location_type: str, location_id: str) -> str:
+        """The type searches predict `location_id` under, so report-time predictions share their patterns."""
+        if location_type in REPORT_PREDICTOR_TYPES:
+            return REPORT_PREDICTOR_TYPES[location_type]
+        garages = self.database.garages_lots
+        match = garages.loc[garages["id"] == location_id, "type"]
+        return match.iloc[0] if len(match) else "garage"
+    
+    def import_reports(self, stream, fmt: str, valid_location_ids=None, defer_indexes: bool = False) -> Dict:
+        """Bulk import into the store, folding each committed chunk into the live counters and report log as it
+        lands; reports still queued in the write buffer and those other sessions add meanwhile are untouched."""
+        stats = import_reports(self.reports, stream, fmt, valid_location_ids=valid_location_ids,
+                               defer_indexes=defer_indexes, on_rows=self._apply_imported)
+        self.predictor.cache.clear()
+        return stats
+    
+    def _apply_imported(self, rows: List[ReportRow]):
+        now = time.time()
+        counted_since = now - REPLAY_HALF_LIVES * self.report_counters.half_life_seconds
+        self.report_counters.add_many((row[1], row[3], row[5]) for row in rows if row[5] > counted_since)
+        logged_since = now - self.report_log.window_seconds
+        self.report_log.extend(row for row in rows if row[5] > logged_since)
+    
+    def add_user_report(self, location_id: str, location_type: str, status: str, notes: str = "",
+                        user_session: str = "") -> bool:
+        report = {
+            "location_id": location_id,
+            "location_type": location_type,
+            "status": status,
+            "notes": notes,
+            "timestamp": datetime.now(),
+            "user_session": user_session
+        }
+        
+        # Returns as soon as the report is queued; the writer thread persists it in the next batch.
+        if not self.report_buffer.submit(report):
+            return False
+        self.report_log.append(report)
+        self.report_counters.add(location_id, status, report["timestamp"].timestamp())
+        self.predictor.cache.invalidate(location_id)
+        if status in STATUS_AVAILABILITY:
+            # What the model expected without any reports, next to what the user saw.
+            predicted = self.predictor.predict_availability(
+                self._predictor_type(location_type, location_id), location_id, report["timestamp"]
+            )
+            stamp = report["timestamp"].timestamp()
+            self.history.record("predicted", [location_id], [predicted["availability"]], stamp)
+            self.history.record("reported", [location_id], [STATUS_AVAILABILITY[status]], stamp)
+        return True
+    
+    def get_occupancy_history(self, hours_back: float = 24, tier: str = None) -> pd.DataFrame:
+        """Mean garage occupancy across all garages per bucket over the last `hours_back` hours."""
+        garage_ids = self.database.garages_lots["id"].tolist()
+        history = self.history.frame("occupancy", garage_ids, time.time() - hours_back * 3600, tier=tier)
+        return history.mean(axis=1).dropna().rename("occupancy").reset_index()
+    
+    def get_reports_summary(self, location_id: str, hours_back: int = 6) -> Dict:
+        return self.get_reports_summaries([location_id], hours_back)[location_id]
+    
+    @timed("reports.summaries")
+    def get_reports_summaries(self, location_ids: List[str], hours_back: int = 6) -> Dict[str, Dict]:
+        """Report summaries for many locations: decayed counters per id plus grouped passes over the report log
+        for counts and trends."""
+        location_ids = list(dict.fromkeys(location_ids))
+        now = time.time()
+        cutoff_time = datetime.fromtimestamp(now - hours_back * 3600)
+        # Trend: reports from the last hour (or the later half of a shorter window) against the rest.
+        split = now - min(TREND_RECENT_SECONDS, hours_back * 3600 / 2)
+        trends = self.report_log.trends(location_ids, cutoff_time.timestamp(), split)
+        counts = self.report_log.counts(location_ids, cutoff_time.timestamp())
+        
+        summaries = {}
+        for location_id in location_ids:
+            last_report = self.report_counters.last_report(location_id)
+            weights = self.report_counters.weights(location_id, now)
+            total_weight = sum(weights.values()) if weights else 0.0
+            
+            if last_report is None or last_report <= cutoff_time or total_weight < MIN_EVIDENCE:
+                summaries[location_id] = {"status": "unknown", "confidence": "none",
+                                          "report_count": counts[location_id], "trend": "stable"}
+                continue
+            
+            summaries[location_id] = {
+                "status": max(weights.items(), key=lambda x: x[1])[0],
+                "confidence": evidence_confidence(total_weight),
+                # Reports actually received in the window; the decayed weight behind status and confidence
+                # is reported separately.
+                "report_count": counts[location_id],
+                "evidence_weight": round(total_weight, 2),
+                "status_breakdown": {status: round(weight, 2) for status, weight in weights.items() if weight >= 0.01},
+                "trend": trends[location_id]
+            }
+        return summaries
+    
+    def get_parking_analytics(self) -> Dict:
+        database = self.database
+        total_garage_spots = database.garages_lots['total_spots'].sum()
+        available_garage_spots = database.garages_lots['available_spots'].sum()
+        on_disk = self.partitions.row_counts() if self.partitions is not None else {}
+        
+        return {
+            "total_locations": {
+                "garages_lots": len(database.garages_lots),
+                "meters": on_disk.get("parking_meters", len(database.parking_meters)),
+                "permit_zones": on_disk.get("permit_zones", len(database.permit_zones))
+            },
+            "garage_occupancy": {
+                "total_spots": int(total_garage_spots),
+                "available_spots": int(available_garage_spots),
+                "occupancy_rate": round((1 - available_garage_spots/total_garage_spots) * 100, 1)
+            },
+            "user_engagement": {
+                "total_reports": self.reports.count(),
+                "reports_last_hour": self.reports.count(datetime.now() - timedelta(hours=1))
+            },
+            "popular_destinations": list(database.destinations.keys())[:10]
+        }
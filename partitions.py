@@ -0,0 +1,252 @@
+import argparse
+import json
+import math
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Build with `python partitions.py`; the app switches to partitioned meters and permit blocks when the
+# directory file exists. Garages stay resident: there are few of them and live feeds update them in place.
+PARTITION_DIR = os.environ.get("PHILASPOT_PARTITION_DIR", os.path.join("data", "partitions"))
+PARTITION_MEMORY_MB = float(os.environ.get("PHILASPOT_PARTITION_MEMORY_MB", "64"))
+TILE_MILES = float(os.environ.get("PHILASPOT_TILE_MILES", "1.0"))
+PARTITIONED_TABLES = ("parking_meters", "permit_zones")
+DIRECTORY_FILE = "directory.json"
+# id, category, label and position of every partitioned row; small enough to stay resident for id checks,
+# location pickers and the reachability index.
+SPOTS_FILE = "spots.pkl"
+SPOT_COLUMNS = ["id", "category", "label", "latitude", "longitude"]
+
+# Tiles are a fixed lat/lon grid scaled at the city's latitude, so a viewport maps straight onto tile numbers.
+REFERENCE_LAT = 39.95
+MILES_PER_DEGREE_LAT = 69.0
+# Region databases assembled from tiles, kept for repeat searches over the same area.
+REGION_CACHE = 4
+
+
+def tile_steps(tile_miles: float) -> Tuple[float, float]:
+    lat_step = tile_miles / MILES_PER_DEGREE_LAT
+    return lat_step, lat_step / math.cos(math.radians(REFERENCE_LAT))
+
+
+def tile_indices(lats: np.ndarray, lons: np.ndarray, tile_miles: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Grid (row, column) of each point."""
+    lat_step, lon_step = tile_steps(tile_miles)
+    return (np.floor(np.asarray(lats, dtype=np.float64) / lat_step).astype(np.int64),
+            np.floor(np.asarray(lons, dtype=np.float64) / lon_step).astype(np.int64))
+
+
+def tile_name(iy: int, ix: int) -> str:
+    return f"{iy}_{ix}"
+
+
+def tile_extent(names) -> Tuple[int, int, int, int]:
+    """(min row, min column, max row, max column) covered by the named tiles."""
+    cells = [tuple(map(int, name.split("_"))) for name in names] or [(0, 0)]
+    rows, columns = zip(*cells)
+    return min(rows), min(columns), max(rows), max(columns)
+
+
+def tiles_in_bounds(south: float, west: float, north: float, east: float, tile_miles: float,
+                    extent: Optional[Tuple[int, int, int, int]] = None) -> List[str]:
+    """Grid tiles overlapping the box, clipped to `extent` so a zoomed-out view can't name millions of
+    empty tiles."""
+    lat_step, lon_step = tile_steps(tile_miles)
+    first_row, last_row = math.floor(south / lat_step), math.floor(north / lat_step)
+    first_column, last_column = math.floor(west / lon_step), math.floor(east / lon_step)
+    if extent is not None:
+        first_row, first_column = max(first_row, extent[0]), max(first_column, extent[1])
+        last_row, last_column = min(last_row, extent[2]), min(last_column, extent[3])
+    return [tile_name(iy, ix) for iy in range(first_row, last_row + 1) for ix in range(first_column, last_column + 1)]
+
+
+def tiles_around(lat: float, lon: float, radius_miles: float, tile_miles: float,
+                 extent: Optional[Tuple[int, int, int, int]] = None) -> List[str]:
+    lat_reach = radius_miles / MILES_PER_DEGREE_LAT
+    lon_reach = lat_reach / max(math.cos(math.radians(lat)), 1e-6)
+    return tiles_in_bounds(lat - lat_reach, lon - lon_reach, lat + lat_reach, lon + lon_reach, tile_miles, extent)
+
+
+def write_partitions(tables: Dict[str, pd.DataFrame], directory: str = PARTITION_DIR,
+                     tile_miles: float = TILE_MILES, spots: Optional[pd.DataFrame] = None) -> Dict:
+    """Split each table into one pickle per grid tile plus a small directory of what each tile holds,
+    and write `spots` (SPOT_COLUMNS for every partitioned row) alongside."""
+    os.makedirs(directory, exist_ok=True)
+    if spots is not None:
+        spots[SPOT_COLUMNS].reset_index(drop=True).to_pickle(os.path.join(directory, SPOTS_FILE))
+    tiles: Dict[str, Dict[str, pd.DataFrame]] = {}
+    for table, frame in tables.items():
+        rows, columns = tile_indices(frame["latitude"], frame["longitude"], tile_miles)
+        for (iy, ix), positions in pd.Series(range(len(frame))).groupby([rows, columns]).groups.items():
+            tiles.setdefault(tile_name(iy, ix), {})[table] = frame.iloc[np.asarray(positions)].reset_index(drop=True)
+
+    listing = {}
+    for name, frames in tiles.items():
+        path = os.path.join(directory, f"{name}.pkl")
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        listing[name] = {"rows": {table: len(frame) for table, frame in frames.items()},
+                         "bytes": os.path.getsize(path)}
+    for stale in os.listdir(directory):
+        if stale.endswith(".pkl") and stale[:-4] not in tiles and stale != SPOTS_FILE:
+            os.remove(os.path.join(directory, stale))
+
+    index = {
+        "tile_miles": tile_miles,
+        "columns": {table: list(frame.columns) for table, frame in tables.items()},
+        "dtypes": {table: {column: str(dtype) for column, dtype in frame.dtypes.items()} for table, frame in tables.items()},
+        "tiles": listing,
+    }
+    with open(os.path.join(directory, DIRECTORY_FILE + ".tmp"), "w") as f:
+        json.dump(index, f)
+    os.replace(os.path.join(directory, DIRECTORY_FILE + ".tmp"), os.path.join(directory, DIRECTORY_FILE))
+    return index
+
+
+def _frame_bytes(frames: Dict[str, pd.DataFrame]) -> int:
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in frames.values()))
+
+
+class PartitionedInventory:
+    """Inventory tiles on disk behind an in-memory directory; tiles load when a search or map viewport
+    touches them, and the least recently used are dropped once resident frames pass the memory budget.
+    """
+
+    def __init__(self, directory: str = PARTITION_DIR, memory_budget_mb: float = PARTITION_MEMORY_MB):
+        self.directory = directory
+        with open(os.path.join(directory, DIRECTORY_FILE)) as f:
+            index = json.load(f)
+        self.tile_miles = index["tile_miles"]
+        self.columns: Dict[str, List[str]] = index["columns"]
+        # Empty results keep the tables' dtypes, so they concatenate with resident frames like real rows do.
+        self.dtypes: Dict[str, Dict[str, str]] = index.get("dtypes", {})
+        self.tiles: Dict[str, Dict] = index["tiles"]
+        self.extent = tile_extent(self.tiles)
+        spots_path = os.path.join(directory, SPOTS_FILE)
+        self.spots = pd.read_pickle(spots_path) if os.path.exists(spots_path) else pd.DataFrame(columns=SPOT_COLUMNS)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._resident: "OrderedDict[str, Tuple[int, Dict[str, pd.DataFrame]]]" = OrderedDict()
+        self._regions: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_environment(cls) -> Optional["PartitionedInventory"]:
+        if not os.path.exists(os.path.join(PARTITION_DIR, DIRECTORY_FILE)):
+            return None
+        return cls()
+
+    def tiles_in_bounds(self, south: float, west: float, north: float, east: float) -> List[str]:
+        return tiles_in_bounds(south, west, north, east, self.tile_miles, self.extent)
+
+    def tiles_around(self, lat: float, lon: float, radius_miles: float) -> List[str]:
+        return tiles_around(lat, lon, radius_miles, self.tile_miles, self.extent)
+
+    def tiles_around_points(self, lats: np.ndarray, lons: np.ndarray, radius_miles: float) -> List[str]:
+        """Tiles within `radius_miles` of the box around a group of points."""
+        lat_reach = radius_miles / MILES_PER_DEGREE_LAT
+        lon_reach = lat_reach / max(math.cos(math.radians(float(np.max(np.abs(lats))))), 1e-6)
+        return tiles_in_bounds(float(np.min(lats)) - lat_reach, float(np.min(lons)) - lon_reach,
+                               float(np.max(lats)) + lat_reach, float(np.max(lons)) + lon_reach,
+                               self.tile_miles, self.extent)
+
+    def row_counts(self) -> Dict[str, int]:
+        counts = {table: 0 for table in self.columns}
+        for meta in self.tiles.values():
+            for table, rows in meta["rows"].items():
+                counts[table] += rows
+        return counts
+
+    def _tile(self, name: str) -> Dict[str, pd.DataFrame]:
+        entry = self._resident.get(name)
+        if entry is not None:
+            self._resident.move_to_end(name)
+            return entry[1]
+        with open(os.path.join(self.directory, f"{name}.pkl"), "rb") as f:
+            frames = pickle.load(f)
+        self._resident[name] = (_frame_bytes(frames), frames)
+        self.loads += 1
+        return frames
+
+    def _evict(self, keep: set):
+        resident = sum(size for size, _ in self._resident.values())
+        for name in list(self._resident):
+            if resident <= self.memory_budget:
+                break
+            if name in keep:
+                continue
+            resident -= self._resident.pop(name)[0]
+            self.evictions += 1
+            # A cached region still referencing the tile would keep its rows alive.
+            for key in [key for key in self._regions if name in key]:
+                del self._regions[key]
+
+    def frames(self, tiles: List[str]) -> Dict[str, pd.DataFrame]:
+        """Rows of every partitioned table that fall in `tiles`, loading tiles from disk as needed."""
+        present = [name for name in tiles if name in self.tiles]
+        with self._lock:
+            loaded = [self._tile(name) for name in present]
+            self._evict(set(present))
+        frames = {}
+        for table, columns in self.columns.items():
+            parts = [tile[table] for tile in loaded if table in tile]
+            frames[table] = (pd.concat(parts, ignore_index=True) if parts
+                             else pd.DataFrame(columns=columns).astype(self.dtypes.get(table, {})))
+        return frames
+
+    def region(self, tiles: List[str], build: Callable[[Dict[str, pd.DataFrame]], object]) -> object:
+        """`build(frames)` for the given tiles, reused while the same tiles stay resident."""
+        key = tuple(sorted(name for name in tiles if name in self.tiles))
+        with self._lock:
+            region = self._regions.get(key)
+            if region is not None:
+                self._regions.move_to_end(key)
+                for name in key:
+                    if name in self._resident:
+                        self._resident.move_to_end(name)
+                return region
+        region = build(self.frames(list(key)))
+        with self._lock:
+            self._regions[key] = region
+            while len(self._regions) > REGION_CACHE:
+                self._regions.popitem(last=False)
+        return region
+
+    def clear_regions(self):
+        with self._lock:
+            self._regions.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            resident_bytes = sum(size for size, _ in self._resident.values())
+            return {
+                "tiles_on_disk": len(self.tiles),
+                "spots_indexed": len(self.spots),
+                "tiles_resident": len(self._resident),
+                "resident_mb": round(resident_bytes / 1024 / 1024, 2),
+                "budget_mb": round(self.memory_budget / 1024 / 1024, 1),
+                "tile_loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+
+if __name__ == "__main__":
+    from parking_core import ComprehensiveParkingDatabase
+
+    parser = argparse.ArgumentParser(description="Split meters and permit blocks into on-disk grid tiles")
+    parser.add_argument("--directory", default=PARTITION_DIR)
+    parser.add_argument("--tile-miles", type=float, default=TILE_MILES)
+    args = parser.parse_args()
+
+    database = ComprehensiveParkingDatabase()
+    candidates = database.cost_engine.candidates
+    index = write_partitions({table: getattr(database, table) for table in PARTITIONED_TABLES},
+                             args.directory, args.tile_miles, candidates[candidates["category"] != "garage_lot"])
+    print(json.dumps({"tiles": len(index["tiles"]), "directory": args.directory}))
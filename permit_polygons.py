@@ -0,0 +1,326 @@
+import json
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PERMIT_BLOCKS_GEOJSON = os.environ.get("PHILASPOT_PERMIT_BLOCKS", os.path.join("data", "permit_blocks.geojson"))
+PERMIT_ZONES_GEOJSON = os.environ.get("PHILASPOT_PERMIT_ZONES", os.path.join("data", "permit_zones.geojson"))
+
+METERS_PER_DEGREE = 111320.0
+METERS_PER_MILE = 1609.344
+RTREE_NODE_CAPACITY = 16
+
+# Roughly one block face when the dataset only gives us a point.
+SYNTHETIC_BLOCK_HALF_LON = 0.0006
+SYNTHETIC_BLOCK_HALF_LAT = 0.00015
+
+# The OpenDataPhilly permit layers have changed column names between releases.
+PROPERTY_ALIASES = {
+    "permit_zone": ("permit_zone", "zone", "district", "rpp_district", "rppdistrict"),
+    "neighborhood": ("neighborhood", "neighborhood_name", "name"),
+    "street_name": ("street_name", "street", "st_name", "stname"),
+    "block_number": ("block_number", "block", "hundred_block", "hundred"),
+    "block_side": ("block_side", "side"),
+    "time_restrictions": ("time_restrictions", "restrictions", "hours"),
+    "max_visitor_hours": ("max_visitor_hours", "visitor_hours"),
+}
+
+
+class PackedRTree:
+    """Static Sort-Tile-Recursive R-tree over bounding boxes (minx, miny, maxx, maxy)."""
+
+    def __init__(self, boxes: np.ndarray, capacity: int = RTREE_NODE_CAPACITY):
+        self.capacity = capacity
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.item_order = self._str_order(boxes, np.arange(len(boxes)))
+        # levels[0] holds the leaf boxes in packed order; each higher level groups `capacity` children.
+        self.levels: List[np.ndarray] = [boxes[self.item_order]]
+        while len(self.levels[-1]) > capacity:
+            child = self.levels[-1]
+            groups = np.arange(0, len(child), capacity)
+            parent = np.stack([
+                np.minimum.reduceat(child[:, 0], groups),
+                np.minimum.reduceat(child[:, 1], groups),
+                np.maximum.reduceat(child[:, 2], groups),
+                np.maximum.reduceat(child[:, 3], groups),
+            ], axis=1)
+            self.levels.append(parent)
+        self._levels_py = None
+        self._item_order_py = None
+
+    def _str_order(self, boxes: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        if len(ids) == 0:
+            return ids
+        cx = (boxes[ids, 0] + boxes[ids, 2]) / 2
+        cy = (boxes[ids, 1] + boxes[ids, 3]) / 2
+        leaves = math.ceil(len(ids) / self.capacity)
+        slice_size = math.ceil(math.sqrt(leaves)) * self.capacity
+        x_order = np.argsort(cx, kind="stable")
+        by_x, cy_by_x = ids[x_order], cy[x_order]
+        ordered = []
+        for start in range(0, len(by_x), slice_size):
+            chunk = by_x[start:start + slice_size]
+            ordered.append(chunk[np.argsort(cy_by_x[start:start + slice_size], kind="stable")])
+        return np.concatenate(ordered)
+
+    def query(self, minx: float, miny: float, maxx: float, maxy: float) -> np.ndarray:
+        top = self.levels[-1]
+        nodes = np.flatnonzero((top[:, 0] <= maxx) & (top[:, 2] >= minx) & (top[:, 1] <= maxy) & (top[:, 3] >= miny))
+        for level in reversed(self.levels[:-1]):
+            if len(nodes) == 0:
+                break
+            children = (nodes[:, None] * self.capacity + np.arange(self.capacity)).ravel()
+            children = children[children < len(level)]
+            boxes = level[children]
+            hit = (boxes[:, 0] <= maxx) & (boxes[:, 2] >= minx) & (boxes[:, 1] <= maxy) & (boxes[:, 3] >= miny)
+            nodes = children[hit]
+        return self.item_order[nodes]
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        # A point touches only a handful of nodes, so walk the tree in plain Python
+        # instead of paying NumPy call overhead at every level.
+        if self._levels_py is None:
+            self._levels_py = [level.tolist() for level in self.levels]
+            self._item_order_py = self.item_order.tolist()
+        levels, capacity = self._levels_py, self.capacity
+        depth = len(levels) - 1
+        nodes = [i for i, (x0, y0, x1, y1) in enumerate(levels[depth]) if x0 <= x <= x1 and y0 <= y <= y1]
+        for d in range(depth - 1, -1, -1):
+            level = levels[d]
+            found = []
+            for node in nodes:
+                for child in range(node * capacity, min((node + 1) * capacity, len(level))):
+                    x0, y0, x1, y1 = level[child]
+                    if x0 <= x <= x1 and y0 <= y <= y1:
+                        found.append(child)
+            nodes = found
+        return [self._item_order_py[n] for n in nodes]
+
+
+
+def _point_in_rings(x: float, y: float, rings: Sequence[Sequence[Tuple[float, float]]]) -> bool:
+    # Even-odd rule across exterior and holes; plain floats beat NumPy on block-sized rings.
+    inside = False
+    for ring in rings:
+        xj, yj = ring[-1]
+        for xi, yi in ring:
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            xj, yj = xi, yi
+    return inside
+
+
+class PolygonIndex:
+    """Polygons (possibly multi-part) keyed by row position, with R-tree lookup and edge distances."""
+
+    def __init__(self, geometries: Sequence[List]):
+        self.part_rows: List[int] = []
+        self.part_rings: List[List[np.ndarray]] = []
+        for row, geometry in enumerate(geometries):
+            for polygon in geometry or []:
+                rings = [np.asarray(ring, dtype=np.float64) for ring in polygon if len(ring) >= 3]
+                if rings:
+                    self.part_rows.append(row)
+                    self.part_rings.append(rings)
+        self.part_rings_py = [[[tuple(p) for p in ring.tolist()] for ring in rings] for rings in self.part_rings]
+
+        boxes = np.array([
+            [ring[:, 0].min(), ring[:, 1].min(), ring[:, 0].max(), ring[:, 1].max()]
+            for ring in (rings[0] for rings in self.part_rings)
+        ], dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        self.tree = PackedRTree(boxes)
+
+        # All edges of all rings, flattened so distance queries are one array pass.
+        starts, ends, owners = [], [], []
+        for part, rings in enumerate(self.part_rings):
+            for ring in rings:
+                starts.append(ring)
+                ends.append(np.roll(ring, -1, axis=0))
+                owners.append(np.full(len(ring), part, dtype=np.int64))
+        self.edge_start = np.concatenate(starts) if starts else np.zeros((0, 2))
+        self.edge_end = np.concatenate(ends) if ends else np.zeros((0, 2))
+        self.edge_part = np.concatenate(owners) if owners else np.zeros(0, dtype=np.int64)
+        self.part_edge_offsets = np.searchsorted(self.edge_part, np.arange(len(self.part_rings) + 1))
+
+    def locate(self, lat: float, lon: float) -> Optional[int]:
+        for part in self.tree.query_point(lon, lat):
+            if _point_in_rings(lon, lat, self.part_rings_py[part]):
+                return self.part_rows[part]
+        return None
+
+    def distances_miles(self, lat: float, lon: float, radius_miles: float) -> Dict[int, float]:
+        radius_deg_lat = radius_miles * METERS_PER_MILE / METERS_PER_DEGREE
+        radius_deg_lon = radius_deg_lat / max(math.cos(math.radians(lat)), 1e-6)
+        parts = self.tree.query(lon - radius_deg_lon, lat - radius_deg_lat, lon + radius_deg_lon, lat + radius_deg_lat)
+        if len(parts) == 0:
+            return {}
+
+        edge_idx = np.concatenate([np.arange(self.part_edge_offsets[p], self.part_edge_offsets[p + 1]) for p in parts])
+        kx = METERS_PER_DEGREE * math.cos(math.radians(lat))
+        ky = METERS_PER_DEGREE
+        ax = (self.edge_start[edge_idx, 0] - lon) * kx
+        ay = (self.edge_start[edge_idx, 1] - lat) * ky
+        bx = (self.edge_end[edge_idx, 0] - lon) * kx
+        by = (self.edge_end[edge_idx, 1] - lat) * ky
+        dx, dy = bx - ax, by - ay
+        seg_len2 = dx * dx + dy * dy
+        t = np.clip(-(ax * dx + ay * dy) / np.where(seg_len2 == 0, 1.0, seg_len2), 0.0, 1.0)
+        edge_dist = np.hypot(ax + t * dx, ay + t * dy)
+
+        owner = self.edge_part[edge_idx]
+        order = np.argsort(owner, kind="stable")
+        owner, edge_dist = owner[order], edge_dist[order]
+        boundaries = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        part_ids = owner[boundaries]
+        part_dist = np.minimum.reduceat(edge_dist, boundaries) / METERS_PER_MILE
+
+        result: Dict[int, float] = {}
+        for part, dist in zip(part_ids.tolist(), part_dist.tolist()):
+            box = self.boxes[part]
+            if box[0] <= lon <= box[2] and box[1] <= lat <= box[3] and _point_in_rings(lon, lat, self.part_rings_py[part]):
+                dist = 0.0
+            if dist <= radius_miles:
+                row = self.part_rows[part]
+                result[row] = min(dist, result.get(row, math.inf))
+        return result
+
+    def rings_latlon(self, row: int) -> List[List[List[float]]]:
+        return [
+            [[float(y), float(x)] for x, y in rings[0]]
+            for part_row, rings in zip(self.part_rows, self.part_rings) if part_row == row
+        ]
+
+
+class PermitZoneIndex:
+    def __init__(self, blocks: pd.DataFrame, zones: Optional[pd.DataFrame] = None):
+        self.blocks = blocks
+        self.block_index = PolygonIndex(blocks["geometry"].tolist())
+        self.zones = zones
+        self.zone_index = PolygonIndex(zones["geometry"].tolist()) if zones is not None else None
+
+    def rules_at(self, lat: float, lon: float) -> Optional[Dict]:
+        row = self.block_index.locate(lat, lon)
+        if row is not None:
+            block = self.blocks.iloc[row]
+            return {
+                "match": "block",
+                "id": block["id"],
+                "permit_zone": block["permit_zone"],
+                "neighborhood": block["neighborhood"],
+                "street": block["street_name"],
+                "block": block["block_number"],
+                "permit_required": bool(block["permit_required"]),
+                "restrictions": block["time_restrictions"],
+                "visitor_allowed": bool(block["visitor_parking_allowed"]),
+                "max_visitor_hours": int(block["max_visitor_hours"]),
+            }
+        if self.zone_index is not None:
+            row = self.zone_index.locate(lat, lon)
+            if row is not None:
+                zone = self.zones.iloc[row]
+                return {"match": "zone", "permit_zone": zone["permit_zone"], "neighborhood": zone.get("neighborhood", "")}
+        return None
+
+    def distances_miles(self, lat: float, lon: float, radius_miles: float) -> Dict[int, float]:
+        return self.block_index.distances_miles(lat, lon, radius_miles)
+
+
+def synthetic_block_geometry(lat: float, lon: float) -> List[List[List[float]]]:
+    ring = [
+        [lon - SYNTHETIC_BLOCK_HALF_LON, lat - SYNTHETIC_BLOCK_HALF_LAT],
+        [lon + SYNTHETIC_BLOCK_HALF_LON, lat - SYNTHETIC_BLOCK_HALF_LAT],
+        [lon + SYNTHETIC_BLOCK_HALF_LON, lat + SYNTHETIC_BLOCK_HALF_LAT],
+        [lon - SYNTHETIC_BLOCK_HALF_LON, lat + SYNTHETIC_BLOCK_HALF_LAT],
+    ]
+    return [[ring]]
+
+
+def _geojson_polygons(geometry: Dict) -> List[List[List[List[float]]]]:
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _property(props: Dict, field: str, default=None):
+    lowered = {k.lower(): v for k, v in props.items()}
+    for alias in PROPERTY_ALIASES.get(field, (field,)):
+        if lowered.get(alias) not in (None, ""):
+            return lowered[alias]
+    return default
+
+
+def _int_property(props: Dict, field: str, default: int) -> int:
+    """Like _property, but a count: null, non-numeric or non-finite values fall back to the default."""
+    try:
+        return int(float(_property(props, field, default)))
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def _centroid(polygons: List) -> Tuple[float, float]:
+    ring = np.asarray(polygons[0][0], dtype=np.float64)
+    return float(ring[:, 1].mean()), float(ring[:, 0].mean())
+
+
+def load_permit_blocks_geojson(path: str) -> pd.DataFrame:
+    with open(path) as f:
+        features = json.load(f)["features"]
+
+    rows = []
+    for i, feature in enumerate(features):
+        polygons = _geojson_polygons(feature.get("geometry"))
+        if not polygons:
+            continue
+        props = feature.get("properties") or {}
+        zone = str(_property(props, "permit_zone", "Unknown"))
+        if not zone.lower().startswith("zone"):
+            zone = f"Zone {zone}"
+        max_visitor_hours = _int_property(props, "max_visitor_hours", 2)
+        lat, lon = _centroid(polygons)
+        rows.append({
+            "id": f"permit_{zone.split()[-1]}_{i+1}",
+            "neighborhood": str(_property(props, "neighborhood", zone)),
+            "permit_zone": zone,
+            "street_name": str(_property(props, "street_name", "")),
+            "block_number": str(_property(props, "block_number", "")),
+            "block_side": str(_property(props, "block_side", "Both")),
+            "latitude": lat,
+            "longitude": lon,
+            "permit_required": True,
+            "permit_type": f"Residential {zone}",
+            "permit_cost_annual": 35,
+            "time_restrictions": str(_property(props, "time_restrictions", "8AM-6PM Mon-Fri")),
+            "visitor_parking_allowed": max_visitor_hours > 0,
+            "max_visitor_hours": max_visitor_hours,
+            "estimated_spaces": _int_property(props, "estimated_spaces", 20),
+            "last_updated": pd.Timestamp.now(),
+            "geometry": polygons,
+        })
+    return pd.DataFrame(rows)
+
+
+def load_permit_zone_polygons(path: str = PERMIT_ZONES_GEOJSON) -> Optional[pd.DataFrame]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        features = json.load(f)["features"]
+    rows = []
+    for feature in features:
+        polygons = _geojson_polygons(feature.get("geometry"))
+        if polygons:
+            props = feature.get("properties") or {}
+            zone = str(_property(props, "permit_zone", "Unknown"))
+            rows.append({
+                "permit_zone": zone if zone.lower().startswith("zone") else f"Zone {zone}",
+                "neighborhood": str(_property(props, "neighborhood", "")),
+                "geometry": polygons,
+            })
+    return pd.DataFrame(rows)
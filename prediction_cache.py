@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Set, Tuple
+
+PREDICTION_CACHE_MB = float(os.environ.get("PHILASPOT_PREDICTION_CACHE_MB", "16"))
+PREDICTION_TTL_SECONDS = 15 * 60
+
+_MISSING = object()
+
+
+def _approx_bytes(value) -> int:
+    """Shallow size of a prediction dict plus its nested dicts; good enough to enforce a cap."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for item in value.values():
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                size += sum(sys.getsizeof(v) for v in item.values())
+    return size
+
+
+class PredictionCache:
+    """LRU of predictions with a TTL and a byte cap, invalidated one location at a time."""
+
+    def __init__(self, max_mb: float = PREDICTION_CACHE_MB, ttl_seconds: float = PREDICTION_TTL_SECONDS):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, object]]" = OrderedDict()
+        self._by_location: Dict[Hashable, Set[Tuple]] = {}
+        self._versions: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, location_id: Hashable, bucket: Hashable, version: int):
+        key = (location_id, bucket, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, location_id: Hashable, bucket: Hashable, version: int, value):
+        key = (location_id, bucket, version)
+        size = _approx_bytes(value) + sys.getsizeof(key)
+        with self._lock:
+            if self._versions.get(location_id, version) != version:
+                # A newer report arrived for this location: its older entries are dead.
+                self._invalidate(location_id)
+            self._versions[location_id] = version
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._by_location.setdefault(location_id, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._by_location.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_location[key[0]]
+
+    def _invalidate(self, location_id: Hashable):
+        for key in list(self._by_location.get(location_id, ())):
+            self._remove(key)
+
+    def invalidate(self, location_id: Hashable):
+        with self._lock:
+            self._invalidate(location_id)
+            self._versions.pop(location_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_location.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_kb": round(self._bytes / 1024, 1),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+def is_missing(value) -> bool:
+    return value is _MISSING
@@ -0,0 +1,148 @@
+import bisect
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from spatial import haversine_matrix_miles
+from walking_network import WALK_SPEED_MPH
+
+# Walk bands in minutes, e.g. PHILASPOT_WALK_BANDS=5,10,15; the largest one bounds the index.
+WALK_BANDS_MINUTES = tuple(sorted(int(b) for b in os.environ.get("PHILASPOT_WALK_BANDS", "5,10,15").split(",")))
+
+# Points per distance block when pairing spots with destinations; keeps each block around 16 MB.
+BLOCK_CELLS = 2_000_000
+
+
+def spot_points(database, partitions=None) -> Dict[str, Tuple[float, float]]:
+    """Every garage, meter and permit block in a database version as {id: (lat, lon)}, including the ones
+    kept in on-disk partitions."""
+    spots = {}
+    frames = [database.garages_lots, database.parking_meters, database.permit_zones]
+    if partitions is not None:
+        frames.append(partitions.spots)
+    for frame in frames:
+        for spot_id, lat, lon in zip(frame["id"], frame["latitude"], frame["longitude"]):
+            spots[spot_id] = (float(lat), float(lon))
+    return spots
+
+
+def band_of(minutes: float) -> Optional[int]:
+    position = bisect.bisect_left(WALK_BANDS_MINUTES, minutes)
+    return WALK_BANDS_MINUTES[position] if position < len(WALK_BANDS_MINUTES) else None
+
+
+class ReachabilityIndex:
+    """Inverted index from parking spot to the destinations within walking range, kept sorted by walk time."""
+
+    def __init__(self, walk_times=None):
+        self.walk_times = walk_times
+        self.spots: Dict[str, Tuple[float, float]] = {}
+        self.points: Dict[str, Tuple[float, float]] = {}
+        # spot id -> [(minutes, miles, destination)], ascending; destination -> spot ids it appears under.
+        self._by_spot: Dict[str, List[Tuple[float, float, str]]] = {}
+        self._by_point: Dict[str, set] = {}
+        self._network_spots = set(walk_times.spot_ids) if walk_times is not None else set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, spots: Dict[str, Tuple[float, float]], points: Dict[str, Dict], walk_times=None) -> "ReachabilityIndex":
+        index = cls(walk_times)
+        index.spots = dict(spots)
+        index._pair(list(index.spots), {name: (info["lat"], info["lon"]) for name, info in points.items()})
+        return index
+
+    def _minutes(self, name: str, spot_ids: List[str], miles: np.ndarray) -> np.ndarray:
+        minutes = miles * 60 / WALK_SPEED_MPH
+        if self.walk_times is None or name not in self.walk_times.minutes:
+            return minutes
+        # Network times where the spot was routed; a NaN there means out of reach, not unknown.
+        network = self.walk_times.walk_minutes(name, spot_ids).astype(np.float64)
+        routed = np.fromiter((spot_id in self._network_spots for spot_id in spot_ids), dtype=bool, count=len(spot_ids))
+        return np.where(routed, np.where(np.isnan(network), np.inf, network), minutes)
+
+    def _pair(self, spot_ids: List[str], points: Dict[str, Tuple[float, float]]):
+        """Add (spot, destination) entries for every pair within the largest band."""
+        if not spot_ids or not points:
+            self.points.update(points)
+            return
+        lats = np.fromiter((self.spots[s][0] for s in spot_ids), dtype=np.float64, count=len(spot_ids))
+        lons = np.fromiter((self.spots[s][1] for s in spot_ids), dtype=np.float64, count=len(spot_ids))
+        limit = WALK_BANDS_MINUTES[-1]
+        step = max(1, BLOCK_CELLS // len(points))
+        names = list(points)
+        point_lats = np.array([points[n][0] for n in names])
+        point_lons = np.array([points[n][1] for n in names])
+
+        for start in range(0, len(spot_ids), step):
+            block = spot_ids[start:start + step]
+            miles = haversine_matrix_miles(point_lats, point_lons, lats[start:start + step], lons[start:start + step])
+            for row, name in enumerate(names):
+                minutes = self._minutes(name, block, miles[row])
+                for column in np.flatnonzero(minutes <= limit):
+                    spot_id = block[column]
+                    bisect.insort(self._by_spot.setdefault(spot_id, []),
+                                  (round(float(minutes[column]), 1), round(float(miles[row, column]), 2), name))
+                    self._by_point.setdefault(name, set()).add(spot_id)
+        self.points.update(points)
+
+    def _unpair_point(self, name: str):
+        for spot_id in self._by_point.pop(name, ()):
+            entries = [entry for entry in self._by_spot.get(spot_id, ()) if entry[2] != name]
+            if entries:
+                self._by_spot[spot_id] = entries
+            else:
+                self._by_spot.pop(spot_id, None)
+        self.points.pop(name, None)
+
+    def _unpair_spot(self, spot_id: str):
+        for _, _, name in self._by_spot.pop(spot_id, ()):
+            self._by_point.get(name, set()).discard(spot_id)
+        self.spots.pop(spot_id, None)
+
+    def add_point(self, name: str, lat: float, lon: float):
+        """Index a destination or geocoded point of interest; replaces an existing point of the same name."""
+        with self._lock:
+            self._unpair_point(name)
+            self._pair(list(self.spots), {name: (float(lat), float(lon))})
+
+    def remove_point(self, name: str):
+        with self._lock:
+            self._unpair_point(name)
+
+    def sync_spots(self, spots: Dict[str, Tuple[float, float]], walk_times=None) -> Dict[str, int]:
+        """Bring the spot side up to date with a new inventory, touching only spots that appeared, moved or left;
+        new walk times re-pair every spot, since unmoved spots' times and bands change too."""
+        with self._lock:
+            retimed = walk_times is not self.walk_times
+            if retimed:
+                self.walk_times = walk_times
+                self._network_spots = set(walk_times.spot_ids) if walk_times is not None else set()
+            removed = [spot_id for spot_id in self.spots if spot_id not in spots]
+            changed = [spot_id for spot_id, point in spots.items() if retimed or self.spots.get(spot_id) != point]
+            for spot_id in removed + changed:
+                self._unpair_spot(spot_id)
+            for spot_id in changed:
+                self.spots[spot_id] = spots[spot_id]
+            self._pair(changed, dict(self.points))
+        return {"removed": len(removed), "updated": len(changed)}
+
+    def reachable(self, spot_id: str, max_minutes: Optional[float] = None) -> List[Dict]:
+        """Destinations within `max_minutes` (default: the largest band) of a spot, nearest first."""
+        entries = self._by_spot.get(spot_id, ())
+        if max_minutes is not None:
+            entries = entries[:bisect.bisect_right(entries, max_minutes, key=lambda entry: entry[0])]
+        return [
+            {"destination": name, "walk_minutes": minutes, "distance": miles, "band": band_of(minutes)}
+            for minutes, miles, name in entries
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            "spots": len(self.spots),
+            "points": len(self.points),
+            "spots_reaching_any": len(self._by_spot),
+            "pairs": sum(len(entries) for entries in self._by_spot.values()),
+            "bands": ", ".join(f"{b} min" for b in WALK_BANDS_MINUTES),
+        }
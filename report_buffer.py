@@ -0,0 +1,132 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from metrics import span
+from report_store import ReportStore, report_to_row
+
+MAX_PENDING = 10_000
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+SUBMIT_TIMEOUT = 2.0
+RETRY_DELAY = 1.0
+
+
+class ReportWriteBuffer:
+    """Accepts reports without touching the database; a background thread writes them in batches."""
+
+    def __init__(self, store: ReportStore, max_pending: int = MAX_PENDING, batch_size: int = FLUSH_BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._written = threading.Condition()
+        self.accepted = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="philaspot-report-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, report: Dict, timeout: float = SUBMIT_TIMEOUT) -> bool:
+        """Queue a report; False if the buffer stayed full for `timeout` seconds.
+
+        Rows go in without an id and SQLite assigns one, so several server processes can share the store.
+        """
+        if self._stop.is_set():
+            return False
+        with self._written:
+            self.accepted += 1
+        try:
+            # A full queue blocks the caller briefly rather than growing without bound.
+            self._queue.put(report_to_row(dict(report, id=None)), timeout=timeout)
+        except queue.Full:
+            with self._written:
+                self.accepted -= 1
+                self.rejected += 1
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self.accepted - self.flushed
+
+    def _drain(self, first: tuple) -> List[tuple]:
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_rows(self, batch: List[tuple]):
+        """Insert a batch that failed on a constraint one row at a time, dropping only the rows that violate it."""
+        for row in batch:
+            try:
+                self.store.add_many([row])
+            except sqlite3.IntegrityError as e:
+                self.dropped += 1
+                self.last_error = f"dropped report for {row[1]}: {e}"
+
+    def _write(self, batch: List[tuple]):
+        attempts = 0
+        while True:
+            try:
+                with span("reports.flush"):
+                    self.store.add_many(batch)
+                self.last_error = None
+                break
+            except sqlite3.IntegrityError:
+                # Retrying cannot fix a constraint violation; write the rows that are fine and drop the rest.
+                self._write_rows(batch)
+                break
+            except Exception as e:
+                # Keep the batch and retry; dropping acknowledged reports is worse than a delay.
+                # Once shutting down, give up after a few tries so exit is not held hostage.
+                self.last_error = f"{type(e).__name__}: {e}"
+                attempts += 1
+                if self._stop.is_set() and attempts >= 3:
+                    break
+                time.sleep(RETRY_DELAY)
+        with self._written:
+            self.flushed += len(batch)
+            self._written.notify_all()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            self._write(self._drain(first))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything submitted so far has been written."""
+        with self._written:
+            target = self.accepted
+            return self._written.wait_for(lambda: self.flushed >= target, timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting reports, write out what is queued and stop the writer thread."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def status(self) -> Dict:
+        return {
+            "pending": self.pending(),
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "last_error": self.last_error or "none",
+        }
@@ -0,0 +1,123 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from report_store import REPORT_STATUSES, ReportStore
+
+# A report loses half its weight every HALF_LIFE_MINUTES.
+HALF_LIFE_MINUTES = float(os.environ.get("PHILASPOT_REPORT_HALF_LIFE", "30"))
+
+# Weights below this are treated as no evidence at all.
+MIN_EVIDENCE = 0.1
+MEDIUM_EVIDENCE = 1.0
+HIGH_EVIDENCE = 3.0
+
+# Reports older than this many half-lives contribute < 0.1% and are not replayed at startup.
+REPLAY_HALF_LIVES = 10
+
+_STATUS_INDEX = {status: i for i, status in enumerate(REPORT_STATUSES)}
+
+
+class _Evidence:
+    __slots__ = ("weights", "updated", "last_report", "version")
+
+    def __init__(self):
+        self.weights = [0.0] * len(REPORT_STATUSES)
+        self.updated = 0.0
+        self.last_report = 0.0
+        self.version = 0
+
+
+class DecayedReportCounters:
+    """Per-location, per-status report weights that decay exponentially; O(1) to update and to read."""
+
+    def __init__(self, half_life_minutes: float = HALF_LIFE_MINUTES):
+        self.half_life_seconds = half_life_minutes * 60
+        self._rate = math.log(2) / self.half_life_seconds
+        self._locations: Dict[str, _Evidence] = {}
+        self.version_total = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store: ReportStore, half_life_minutes: float = HALF_LIFE_MINUTES) -> "DecayedReportCounters":
+        counters = cls(half_life_minutes)
+        counters.replay(store)
+        return counters
+
+    def replay(self, store: ReportStore):
+        since = time.time() - REPLAY_HALF_LIVES * self.half_life_seconds
+        self.add_many(store.status_rows(since))
+
+    def add(self, location_id: str, status: str, timestamp: float):
+        index = _STATUS_INDEX.get(status)
+        if index is None:
+            return
+        with self._lock:
+            self._add(location_id, index, timestamp)
+
+    def add_many(self, rows: Iterable[Tuple[str, str, float]]):
+        with self._lock:
+            for location_id, status, timestamp in rows:
+                index = _STATUS_INDEX.get(status)
+                if index is not None:
+                    self._add(location_id, index, timestamp)
+
+    def _add(self, location_id: str, index: int, timestamp: float):
+        evidence = self._locations.get(location_id)
+        if evidence is None:
+            evidence = self._locations[location_id] = _Evidence()
+            evidence.updated = timestamp
+        if timestamp >= evidence.updated:
+            # Bring the existing weights forward to this report's time, then count it in full.
+            factor = math.exp(-self._rate * (timestamp - evidence.updated))
+            evidence.weights = [w * factor for w in evidence.weights]
+            evidence.weights[index] += 1.0
+            evidence.updated = timestamp
+        else:
+            # Back-filled report: it has already decayed by the time the counters are at.
+            evidence.weights[index] += math.exp(-self._rate * (evidence.updated - timestamp))
+        evidence.last_report = max(evidence.last_report, timestamp)
+        evidence.version += 1
+        self.version_total += 1
+
+    def weights(self, location_id: str, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Decayed weight per status as of now, or None when nothing has been reported."""
+        evidence = self._locations.get(location_id)
+        if evidence is None:
+            return None
+        now = time.time() if now is None else now
+        factor = math.exp(-self._rate * max(0.0, now - evidence.updated))
+        return {status: weight * factor for status, weight in zip(REPORT_STATUSES, evidence.weights)}
+
+    def locations(self):
+        return list(self._locations)
+
+    def last_report(self, location_id: str) -> Optional[datetime]:
+        evidence = self._locations.get(location_id)
+        return datetime.fromtimestamp(evidence.last_report) if evidence else None
+
+    def version(self, location_id: str) -> int:
+        evidence = self._locations.get(location_id)
+        return evidence.version if evidence else 0
+
+
+def blend_with_reports(base_availability: float, weights: Optional[Dict[str, float]]) -> Tuple[float, str, float]:
+    """Blend a model availability with decayed report evidence: (availability, confidence, evidence weight)."""
+    total_weight = sum(weights.values()) if weights else 0.0
+    if total_weight < MIN_EVIDENCE:
+        return base_availability, "low", total_weight
+    # Fresh reports pull harder than stale ones; the model never gives up more than 70%.
+    user_availability = (weights["available"] + weights["limited"]) / total_weight
+    blend = min(0.7, total_weight / (total_weight + 1.5))
+    return (1 - blend) * base_availability + blend * user_availability, evidence_confidence(total_weight), total_weight
+
+
+def evidence_confidence(total_weight: float) -> str:
+    if total_weight >= HIGH_EVIDENCE:
+        return "high"
+    if total_weight >= MEDIUM_EVIDENCE:
+        return "medium"
+    return "low"
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from report_store import REPORT_COLUMNS, REPORT_STATUSES, ReportRow, ReportStore
+
+IMPORT_BATCH_SIZE = 50_000
+# How often a blocked prefetch thread checks whether the import was abandoned.
+PREFETCH_POLL_SECONDS = 0.5
+
+
+def detect_format(name: str) -> str:
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+def iter_chunks(stream: IO[str], fmt: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    # pandas' C parsers read one chunk at a time, so memory is bounded by batch_size.
+    if fmt == "csv":
+        return pd.read_csv(stream, chunksize=batch_size, dtype=str, keep_default_na=False)
+    return pd.read_json(stream, lines=True, chunksize=batch_size, dtype=False, convert_dates=False)
+
+
+def _epoch_seconds(values: pd.Series) -> pd.Series:
+    """Epoch numbers pass through; ISO strings are parsed, with naive times taken as UTC."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    text = numeric.isna() & values.notna()
+    if text.any():
+        parsed = pd.to_datetime(values[text].astype(str), errors="coerce", format="ISO8601", utc=True)
+        numeric[text] = (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+    return numeric
+
+
+def _column(chunk: pd.DataFrame, name: str, default: str) -> pd.Series:
+    if name not in chunk:
+        return pd.Series(default, index=chunk.index, dtype=object)
+    return chunk[name].fillna(default).astype(str).replace("", default)
+
+
+def _flush(store: ReportStore, chunk: pd.DataFrame, valid_ids: Optional[pd.Index], stats: Dict,
+           on_rows: Optional[Callable[[List[ReportRow]], None]] = None):
+    if "location_id" not in chunk or "status" not in chunk or "timestamp" not in chunk:
+        stats["rejected"] += len(chunk)
+        return
+
+    timestamps = _epoch_seconds(chunk["timestamp"])
+    keep = chunk["status"].isin(REPORT_STATUSES) & timestamps.notna()
+    if valid_ids is not None:
+        # One hashed membership test per chunk instead of a lookup per row.
+        keep &= chunk["location_id"].isin(valid_ids)
+
+    rows = pd.DataFrame({
+        "id": None,
+        "location_id": chunk["location_id"].astype(str),
+        "location_type": _column(chunk, "location_type", "unknown"),
+        "status": chunk["status"],
+        "notes": _column(chunk, "notes", ""),
+        "timestamp": timestamps.astype(float),
+        "user_session": _column(chunk, "user_session", "import"),
+    })[keep.to_numpy()]
+    stats["rejected"] += len(chunk) - len(rows)
+    if len(rows):
+        rows = list(rows.itertuples(index=False, name=None))
+        stats["imported"] += store.add_many(rows)
+        if on_rows is not None:
+            on_rows(rows)
+
+
+def _prefetch(chunks: Iterator[pd.DataFrame], depth: int = 2) -> Iterator[pd.DataFrame]:
+    """Parse the next chunk on a worker thread while the current one is being written."""
+    buffer: "queue.Queue" = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Bounded waits, so the thread exits once the consumer stops reading instead of blocking forever.
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=PREFETCH_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+
+    threading.Thread(target=produce, name="philaspot-report-import", daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def import_reports(store: ReportStore, stream: IO[str], fmt: str, valid_location_ids: Optional[Iterable[str]] = None,
+                   batch_size: int = IMPORT_BATCH_SIZE, defer_indexes: bool = False,
+                   on_rows: Optional[Callable[[List[ReportRow]], None]] = None) -> Dict:
+    """Stream-parse reports and insert each chunk in one transaction; memory stays at a few chunks.
+    `on_rows` sees each chunk's rows once they are committed.
+
+    A file that can't be parsed (empty, malformed, not UTF-8) stops the import with `error` set; chunks written
+    before the bad part stay imported.
+    """
+    valid_ids = pd.Index(list(valid_location_ids)) if valid_location_ids is not None else None
+    stats = {"imported": 0, "rejected": 0, "error": None}
+    try:
+        chunks = _prefetch(iter_chunks(stream, fmt, batch_size))
+        try:
+            if defer_indexes:
+                with store.deferred_indexes():
+                    for chunk in chunks:
+                        _flush(store, chunk, valid_ids, stats, on_rows)
+            else:
+                for chunk in chunks:
+                    _flush(store, chunk, valid_ids, stats, on_rows)
+        finally:
+            chunks.close()
+    except ValueError as e:
+        # pandas' EmptyDataError and ParserError, JSON decode errors and UnicodeDecodeError are all ValueErrors.
+        stats["error"] = f"file unreadable ({type(e).__name__}: {e})"
+    return stats
+
+
+def export_reports(store: ReportStore, stream: IO[str], fmt: str) -> int:
+    count = 0
+    ts_index = REPORT_COLUMNS.index("timestamp")
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(REPORT_COLUMNS)
+        for row in store.iter_rows():
+            row = list(row)
+            row[ts_index] = datetime.fromtimestamp(row[ts_index], timezone.utc).isoformat()
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in store.iter_rows():
+            record = dict(zip(REPORT_COLUMNS, row))
+            record["timestamp"] = datetime.fromtimestamp(record["timestamp"], timezone.utc).isoformat()
+            stream.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def export_to_tempfile(store: ReportStore, fmt: str) -> IO[bytes]:
+    """Export into a spooled temp file so large stores never sit in memory as one string."""
+    import tempfile
+
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    export_reports(store, text, fmt)
+    text.flush()
+    text.detach()
+    spool.seek(0)
+    return spool
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Bulk import or export PhilaSpot community reports")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", help="JSONL or CSV file ('-' for stdin/stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"])
+    parser.add_argument("--db", default=None, help="report database (defaults to PHILASPOT_REPORTS_DB)")
+    parser.add_argument("--valid-ids", help="file with one known location id per line; rows for other ids are rejected")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="drop and rebuild indexes around the import (fastest for large offline backfills)")
+    args = parser.parse_args()
+
+    store = ReportStore(args.db) if args.db else ReportStore()
+    fmt = args.format or detect_format(args.path)
+
+    if args.action == "import":
+        valid = None
+        if args.valid_ids:
+            with open(args.valid_ids) as f:
+                valid = [line.strip() for line in f if line.strip()]
+        source = sys.stdin if args.path == "-" else open(args.path, newline="")
+        with source:
+            print(import_reports(store, source, fmt, valid, defer_indexes=args.defer_indexes))
+    else:
+        target = sys.stdout if args.path == "-" else open(args.path, "w", newline="")
+        with target:
+            count = export_reports(store, target, fmt)
+        if args.path != "-":
+            print(f"Exported {count} reports to {os.path.abspath(args.path)}")
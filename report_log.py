@@ -0,0 +1,203 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from report_store import REPORT_STATUSES, ReportRow, ReportStore, report_to_row
+from timeseries import STATUS_AVAILABILITY
+
+# The Community Reports tab looks back at most a day; older rows are compacted away.
+REPORT_LOG_HOURS = 24
+INITIAL_CAPACITY = 1024
+
+STATUS_CODES = {status: code for code, status in enumerate(REPORT_STATUSES)}
+STATUS_EMOJI = np.array(["🟢", "🟡", "🔴", "⚫"], dtype=object)
+STATUS_LABELS = np.array([f"{emoji} {status.title()}"
+                          for emoji, status in zip(STATUS_EMOJI, REPORT_STATUSES)], dtype=object)
+# Availability each status code stands for; out-of-order (NaN) says nothing about space.
+CODE_AVAILABILITY = np.array([STATUS_AVAILABILITY.get(status, np.nan) for status in REPORT_STATUSES])
+# Mean availability has to move by this much between the earlier and recent reports to count as a trend.
+TREND_THRESHOLD = 0.25
+NOTES_SHOWN = 30
+REPORTS_PER_PAGE = 50
+COLUMNS = ("timestamps", "status", "location", "location_type")
+
+
+class _Dictionary:
+    """Interns strings to small integer codes; the column then stores only the codes."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.values, dtype=object)[codes]
+
+
+class ReportLog:
+    """Append-only columns of the last day's reports: timestamp, status, location and type as NumPy arrays,
+    with notes and reporter kept alongside and only touched for rows that are actually shown.
+    """
+
+    def __init__(self, window_hours: float = REPORT_LOG_HOURS, capacity: int = INITIAL_CAPACITY):
+        self.window_seconds = window_hours * 3600
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.status = np.empty(capacity, dtype=np.int8)
+        self.location = np.empty(capacity, dtype=np.int32)
+        self.location_type = np.empty(capacity, dtype=np.int32)
+        self.notes: List[str] = []
+        self.sessions: List[str] = []
+        self.size = 0
+        self.locations = _Dictionary()
+        self.types = _Dictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store: ReportStore, window_hours: float = REPORT_LOG_HOURS) -> "ReportLog":
+        log = cls(window_hours)
+        log.extend(store.rows_since(time.time() - log.window_seconds))
+        return log
+
+    def _make_room(self, extra: int):
+        if self.size + extra <= len(self.timestamps):
+            return
+        # Compact first and only grow if the window itself has outgrown the arrays. Both build new arrays and
+        # lists, so a selection taken earlier keeps indexing the ones it was taken from.
+        keep = np.flatnonzero(self.timestamps[:self.size] > time.time() - self.window_seconds)
+        capacity = len(self.timestamps)
+        while len(keep) + extra > capacity:
+            capacity *= 2
+        for column in COLUMNS:
+            array = getattr(self, column)
+            moved = np.empty(capacity, dtype=array.dtype)
+            moved[:len(keep)] = array[keep]
+            setattr(self, column, moved)
+        self.notes = [self.notes[i] for i in keep]
+        self.sessions = [self.sessions[i] for i in keep]
+        self.size = len(keep)
+
+    def extend(self, rows: Iterable[ReportRow]):
+        rows = [row for row in rows if row[3] in STATUS_CODES]
+        with self._lock:
+            self._make_room(len(rows))
+            start, stop = self.size, self.size + len(rows)
+            self.timestamps[start:stop] = [row[5] for row in rows]
+            self.status[start:stop] = [STATUS_CODES[row[3]] for row in rows]
+            self.location[start:stop] = [self.locations.code(row[1]) for row in rows]
+            self.location_type[start:stop] = [self.types.code(row[2]) for row in rows]
+            self.notes.extend(row[4] for row in rows)
+            self.sessions.extend(row[6] for row in rows)
+            self.size = stop
+
+    def append(self, report: Dict):
+        self.extend([report_to_row(report)])
+
+    def select(self, since: float, statuses: Sequence[str]) -> "ReportSelection":
+        """Reports after `since` with one of `statuses`, newest first."""
+        codes = [STATUS_CODES[status] for status in statuses if status in STATUS_CODES]
+        with self._lock:
+            timestamps = self.timestamps[:self.size]
+            positions = np.flatnonzero((timestamps > since) & np.isin(self.status[:self.size], codes))
+            positions = positions[np.argsort(-timestamps[positions], kind="stable")]
+            return ReportSelection(self, positions)
+
+    def _grouped(self, location_ids: Sequence[str], since: float):
+        """For reports after `since` at one of `location_ids`: the index into location_ids, status code and
+        timestamp of each."""
+        with self._lock:
+            group = np.full(len(self.locations.values), -1, dtype=np.int64)
+            for i, location_id in enumerate(location_ids):
+                code = self.locations.codes.get(location_id)
+                if code is not None:
+                    group[code] = i
+            timestamps = self.timestamps[:self.size]
+            rows = np.flatnonzero(timestamps > since)
+            groups = group[self.location[rows]]
+            status = self.status[rows]
+            timestamps = timestamps[rows]
+        keep = groups >= 0
+        return groups[keep], status[keep], timestamps[keep]
+
+    def counts(self, location_ids: Sequence[str], since: float) -> Dict[str, int]:
+        """Number of reports after `since` per location (bounded by the log's window)."""
+        groups, _, _ = self._grouped(location_ids, since)
+        counts = np.bincount(groups, minlength=len(location_ids))
+        return {location_id: int(count) for location_id, count in zip(location_ids, counts)}
+
+    def trends(self, location_ids: Sequence[str], since: float, split: float) -> Dict[str, str]:
+        """Per location, whether reports after `split` read as more or less space than those between `since`
+        and `split`: "freeing_up", "filling_up" or "stable". One grouped pass over the window for all ids."""
+        trends = {location_id: "stable" for location_id in location_ids}
+        groups, status, timestamps = self._grouped(location_ids, since)
+        values = CODE_AVAILABILITY[status]
+        keep = ~np.isnan(values)
+        # Bin 2i holds location i's earlier reports, 2i + 1 its recent ones.
+        bins = groups[keep] * 2 + (timestamps[keep] > split)
+        sums = np.bincount(bins, weights=values[keep], minlength=2 * len(location_ids)).reshape(-1, 2)
+        counts = np.bincount(bins, minlength=2 * len(location_ids)).reshape(-1, 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = sums[:, 1] / counts[:, 1] - sums[:, 0] / counts[:, 0]
+        for i in np.flatnonzero(change > TREND_THRESHOLD):
+            trends[location_ids[i]] = "freeing_up"
+        for i in np.flatnonzero(change < -TREND_THRESHOLD):
+            trends[location_ids[i]] = "filling_up"
+        return trends
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "rows": self.size,
+                "capacity": len(self.timestamps),
+                "locations": len(self.locations.values),
+                "window_hours": round(self.window_seconds / 3600, 1),
+            }
+
+
+class ReportSelection:
+    """Filtered, sorted report rows; numeric columns are gathered up front, text only for the page shown."""
+
+    def __init__(self, log: ReportLog, positions: np.ndarray):
+        self.timestamps = log.timestamps[positions]
+        self.status = log.status[positions]
+        self.location = log.location[positions]
+        self.location_type = log.location_type[positions]
+        self.positions = positions
+        self._log = log
+        self._notes = log.notes
+        self._sessions = log.sessions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def summary(self) -> Dict[str, int]:
+        counts = np.bincount(self.status, minlength=len(REPORT_STATUSES))
+        return {
+            "total": len(self.positions),
+            **{status: int(counts[code]) for status, code in STATUS_CODES.items()},
+            "unique_locations": len(np.unique(self.location)),
+        }
+
+    def page(self, start: int, stop: int, now: Optional[float] = None) -> pd.DataFrame:
+        """Display rows start..stop of the selection."""
+        ages = (now or time.time()) - self.timestamps[start:stop]
+        positions = self.positions[start:stop]
+        notes = [self._notes[i] for i in positions]
+        types = self._log.types.decode(self.location_type[start:stop])
+        return pd.DataFrame({
+            "Time": np.where(ages < 3600, [f"{int(age // 60)} min ago" for age in ages],
+                             [f"{int(age // 3600)} hr ago" for age in ages]),
+            "Location": self._log.locations.decode(self.location[start:stop]),
+            "Type": [t.replace("_", "/").title() for t in types],
+            "Status": STATUS_LABELS[self.status[start:stop]],
+            "Notes": [n[:NOTES_SHOWN] + "..." if len(n) > NOTES_SHOWN else n for n in notes],
+            "Reporter": [f"User {self._sessions[i]}" for i in positions],
+        })
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+REPORTS_DB = os.environ.get("PHILASPOT_REPORTS_DB", os.path.join("data", "reports.db"))
+
+REPORT_COLUMNS = ("id", "location_id", "location_type", "status", "notes", "timestamp", "user_session")
+REPORT_STATUSES = ("available", "limited", "full", "out_of_order")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    location_id TEXT NOT NULL,
+    location_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    user_session TEXT NOT NULL DEFAULT ''
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS reports_location_time ON reports (location_id, timestamp);
+CREATE INDEX IF NOT EXISTS reports_time ON reports (timestamp);
+"""
+
+ReportRow = Tuple[Optional[int], str, str, str, str, float, str]
+
+
+def _row_to_report(row: Sequence) -> Dict:
+    report = dict(zip(REPORT_COLUMNS, row))
+    report["timestamp"] = datetime.fromtimestamp(report["timestamp"])
+    return report
+
+
+def report_to_row(report: Dict) -> ReportRow:
+    timestamp = report["timestamp"]
+    return (
+        report.get("id"),
+        report["location_id"],
+        report["location_type"],
+        report["status"],
+        report.get("notes") or "",
+        timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp),
+        report.get("user_session") or "",
+    )
+
+
+class ReportStore:
+    """Community reports shared by every session, persisted in SQLite."""
+
+    def __init__(self, path: str = REPORTS_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.executescript(INDEXES)
+
+    def add(self, report: Dict) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO reports (id, location_id, location_type, status, notes, timestamp, user_session) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                report_to_row(report),
+            )
+            return cursor.lastrowid
+
+    def add_many(self, rows: Iterable[ReportRow]) -> int:
+        """Insert pre-built rows in a single transaction."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT INTO reports (id, location_id, location_type, status, notes, timestamp, user_session) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return cursor.rowcount
+
+    def recent(self, since: datetime, location_id: Optional[str] = None) -> List[Dict]:
+        query = f"SELECT {', '.join(REPORT_COLUMNS)} FROM reports WHERE timestamp > ?"
+        params: List = [since.timestamp()]
+        if location_id is not None:
+            query += " AND location_id = ?"
+            params.append(location_id)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY timestamp", params).fetchall()
+        return [_row_to_report(row) for row in rows]
+
+    def count(self, since: Optional[datetime] = None) -> int:
+        with self._lock:
+            if since is None:
+                return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM reports WHERE timestamp > ?", (since.timestamp(),)).fetchone()[0]
+
+    def status_rows(self, since: float) -> List[Tuple[str, str, float]]:
+        """(location_id, status, epoch) for every report after `since`, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT location_id, status, timestamp FROM reports WHERE timestamp > ? ORDER BY timestamp", (since,)
+            ).fetchall()
+
+    def rows_since(self, since: float) -> List[ReportRow]:
+        """Raw rows newer than `since`, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {', '.join(REPORT_COLUMNS)} FROM reports WHERE timestamp > ? ORDER BY timestamp", (since,)
+            ).fetchall()
+
+    def max_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM reports").fetchone()[0]
+
+    def iter_rows(self, batch_size: int = 10_000) -> Iterator[Tuple]:
+        """Stream raw rows in id order on a separate read connection, never holding the whole table."""
+        conn = sqlite3.connect(self.path) if self.path != ":memory:" else self._conn
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(REPORT_COLUMNS)} FROM reports ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    @contextmanager
+    def deferred_indexes(self):
+        """Drop secondary indexes for a bulk load and rebuild them once at the end."""
+        with self._lock:
+            self._conn.execute("DROP INDEX IF EXISTS reports_location_time")
+            self._conn.execute("DROP INDEX IF EXISTS reports_time")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._conn.executescript(INDEXES)
@@ -0,0 +1,222 @@
+import math
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+PACKED_BYTES = SLOTS_PER_WEEK // 8
+
+DAY_INDEX = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+DAY_GROUPS = {
+    "daily": range(7), "everyday": range(7), "24/7": range(7),
+    "weekdays": range(5), "weekday": range(5),
+    "weekends": (5, 6), "weekend": (5, 6),
+}
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+_TIME_RE = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$")
+_RANGE_RE = re.compile(r"(\d{1,2}(?::\d{2})?\s*(?:am|pm)?|noon|midnight)\s*-\s*(\d{1,2}(?::\d{2})?\s*(?:am|pm)?|noon|midnight)")
+
+
+def parse_time_of_day(text: str) -> int:
+    text = text.strip().lower()
+    if text == "noon":
+        return 12 * 60
+    if text == "midnight":
+        return 0
+    match = _TIME_RE.match(text)
+    if not match:
+        raise ValueError(f"Unrecognised time: {text!r}")
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem == "am" and hour == 12:
+        hour = 0
+    elif meridiem == "pm" and hour != 12:
+        hour += 12
+    return hour * 60 + minute
+
+
+def parse_days(text: str) -> List[int]:
+    text = text.strip().lower()
+    if not text:
+        return list(range(7))
+    days = set()
+    for part in re.split(r"[,/&]|\band\b", text):
+        part = part.strip()
+        if not part:
+            continue
+        if part in DAY_GROUPS:
+            days.update(DAY_GROUPS[part])
+            continue
+        bounds = [b.strip()[:3] for b in part.split("-")]
+        if len(bounds) == 2 and bounds[0] in DAY_INDEX and bounds[1] in DAY_INDEX:
+            start, end = DAY_INDEX[bounds[0]], DAY_INDEX[bounds[1]]
+            day = start
+            while True:
+                days.add(day)
+                if day == end:
+                    break
+                day = (day + 1) % 7
+        elif bounds[0] in DAY_INDEX and len(bounds) == 1:
+            days.add(DAY_INDEX[bounds[0]])
+        else:
+            raise ValueError(f"Unrecognised days: {part!r}")
+    return sorted(days)
+
+
+def window_bits(days: Iterable[int], start_minute: int, end_minute: int) -> np.ndarray:
+    bits = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    start_slot = start_minute // SLOT_MINUTES
+    end_slot = math.ceil(end_minute / SLOT_MINUTES)
+    # An end at or before the start (6PM-8AM) runs past midnight into the next day.
+    length = (end_slot - start_slot) % SLOTS_PER_DAY or SLOTS_PER_DAY
+    for day in days:
+        first = day * SLOTS_PER_DAY + start_slot
+        bits[np.arange(first, first + length) % SLOTS_PER_WEEK] = True
+    return bits
+
+
+def compile_rule(text: str) -> np.ndarray:
+    """Compile a posted-sign style rule ("8AM-6PM Mon-Fri", "24/7", "6PM-8AM Daily") to 672 slots."""
+    bits = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    for clause in str(text).split(";"):
+        clause = re.sub(r"\(.*?\)", "", clause).strip().lower()
+        if not clause:
+            continue
+        if clause in ("24/7", "24 hours", "always"):
+            bits[:] = True
+            continue
+        match = _RANGE_RE.search(clause)
+        if not match:
+            raise ValueError(f"Unrecognised schedule: {text!r}")
+        days = parse_days((clause[:match.start()] + " " + clause[match.end():]).strip())
+        bits |= window_bits(days, parse_time_of_day(match.group(1)), parse_time_of_day(match.group(2)))
+    return bits
+
+
+def compile_column(values: pd.Series, unparsed: Optional[List[Dict]] = None, table: str = "",
+                   ids: Optional[pd.Series] = None) -> np.ndarray:
+    """Compile each distinct rule once and broadcast it to every row that shares it.
+
+    A rule that doesn't parse becomes the whole week (always open / always enforced) instead of failing the
+    load; it is recorded in `unparsed` with the rows that carry it.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    compiled = np.zeros((len(uniques), PACKED_BYTES), np.uint8)
+    for position, rule in enumerate(uniques):
+        try:
+            compiled[position] = np.packbits(compile_rule(rule))
+        except ValueError as e:
+            compiled[position] = 0xFF
+            if unparsed is not None:
+                rows = np.flatnonzero(codes == position)
+                unparsed.append({"table": table, "rule": str(rule), "rows": len(rows),
+                                 "first_id": str(ids.iat[rows[0]] if ids is not None else rows[0]),
+                                 "error": str(e)})
+    return compiled[codes] if len(codes) else np.zeros((0, PACKED_BYTES), np.uint8)
+
+
+def start_slot(when: datetime) -> int:
+    return when.weekday() * SLOTS_PER_DAY + (when.hour * 60 + when.minute) // SLOT_MINUTES
+
+
+def stay_mask(when: datetime, hours: float) -> np.ndarray:
+    slots = max(1, math.ceil(hours * 60 / SLOT_MINUTES))
+    bits = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    if slots >= SLOTS_PER_WEEK:
+        bits[:] = True
+    else:
+        bits[(start_slot(when) + np.arange(slots)) % SLOTS_PER_WEEK] = True
+    return np.packbits(bits)
+
+
+class WeekBitmaps:
+    """One packed 672-slot week per row; every query is a bitwise op across all rows at once."""
+
+    def __init__(self, bits: np.ndarray):
+        self.bits = bits
+
+    def __len__(self):
+        return len(self.bits)
+
+    def overlaps(self, mask: np.ndarray) -> np.ndarray:
+        return np.any(self.bits & mask, axis=1)
+
+    def covers(self, mask: np.ndarray) -> np.ndarray:
+        return np.all((self.bits & mask) == mask, axis=1)
+
+    def slots_in(self, mask: np.ndarray) -> np.ndarray:
+        return POPCOUNT[self.bits & mask].sum(axis=1)
+
+    def at(self, when: datetime) -> np.ndarray:
+        slot = start_slot(when)
+        return (self.bits[:, slot // 8] >> (7 - slot % 8)) & 1 == 1
+
+
+class ScheduleBook:
+    """Week bitmaps for the whole inventory, compiled once when the database loads."""
+
+    def __init__(self, garages_lots: pd.DataFrame, parking_meters: pd.DataFrame, permit_zones: pd.DataFrame):
+        # Rules that fell back to the whole week: garages count as open, meters and permit rules as enforced.
+        self.unparsed: List[Dict] = []
+        self.garage_open = WeekBitmaps(compile_column(
+            garages_lots["hours_operation"], self.unparsed, "garages_lots", garages_lots.get("id")
+        ))
+
+        # Meter columns hold 24h times, which read the same as a sign: "08:00-20:00 MON-SAT".
+        meter_rules = (
+            parking_meters["enforcement_start"].astype(str) + "-" + parking_meters["enforcement_end"].astype(str)
+            + " " + parking_meters["enforcement_days"].astype(str)
+        )
+        self.meter_enforced = WeekBitmaps(compile_column(
+            meter_rules, self.unparsed, "parking_meters", parking_meters.get("id")
+        ))
+        self.meter_active = (parking_meters["operational_status"] == "active").to_numpy()
+        self.meter_limit_slots = (parking_meters["time_limit_hours"].to_numpy(dtype=np.float64) * 60 / SLOT_MINUTES)
+
+        self.permit_restricted = WeekBitmaps(
+            compile_column(permit_zones["time_restrictions"], self.unparsed, "permit_zones", permit_zones.get("id"))
+        )
+        self.permit_required = permit_zones["permit_required"].to_numpy(dtype=bool)
+        self.visitor_allowed = permit_zones["visitor_parking_allowed"].to_numpy(dtype=bool)
+        self.visitor_limit_slots = permit_zones["max_visitor_hours"].to_numpy(dtype=np.float64) * 60 / SLOT_MINUTES
+
+    def evaluate(self, target_datetime: datetime, hours: float) -> Dict[str, Dict[str, np.ndarray]]:
+        mask = stay_mask(target_datetime, hours)
+
+        garage_legal = self.garage_open.covers(mask)
+
+        meter_slots = self.meter_enforced.slots_in(mask)
+        meter_enforced = meter_slots > 0
+        meter_legal = self.meter_active & (meter_slots <= self.meter_limit_slots)
+
+        permit_slots = self.permit_restricted.slots_in(mask)
+        permit_enforced = self.permit_required & (permit_slots > 0)
+        permit_legal = ~permit_enforced | (self.visitor_allowed & (permit_slots <= self.visitor_limit_slots))
+
+        return {
+            "garages_lots": {
+                "legal": garage_legal,
+                "free": np.zeros(len(garage_legal), dtype=bool),
+                "enforced": np.ones(len(garage_legal), dtype=bool),
+                "paid_slots": np.full(len(garage_legal), POPCOUNT[mask].sum()),
+            },
+            "meters": {
+                "legal": meter_legal,
+                "free": ~meter_enforced,
+                "enforced": meter_enforced,
+                "paid_slots": meter_slots,
+            },
+            "permit_zones": {
+                "legal": permit_legal,
+                "free": np.ones(len(permit_legal), dtype=bool),
+                "enforced": permit_enforced,
+                "paid_slots": np.zeros(len(permit_legal), dtype=np.int64),
+            },
+        }
+
@@ -0,0 +1,125 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from spatial import haversine_miles
+
+# Searches whose points fall in the same ~80 m cell share one candidate set.
+CELL_MILES = 0.05
+MILES_PER_DEGREE_LAT = 69.0
+RADIUS_STEP_MILES = 0.1
+TIME_BUCKET_SECONDS = 15 * 60
+
+SEARCH_CACHE_ENTRIES = int(os.environ.get("PHILASPOT_SEARCH_CACHE_ENTRIES", "4096"))
+SEARCH_CACHE_TTL_SECONDS = 15 * 60
+
+# Half the cell diagonal: a spot within r of any point in the cell is within r + this of its centre.
+CELL_MARGIN_MILES = CELL_MILES * math.sqrt(2) / 2
+# Candidates are picked with haversine but refined with geodesic distances, which differ by well under 1%.
+ELLIPSOID_SLACK = 0.01
+
+
+def cell_of(lat: float, lon: float) -> Tuple[int, int, float, float]:
+    """Grid cell (iy, ix) of a point plus the cell's centre."""
+    lat_step = CELL_MILES / MILES_PER_DEGREE_LAT
+    iy = math.floor(lat / lat_step)
+    center_lat = (iy + 0.5) * lat_step
+    lon_step = lat_step / max(math.cos(math.radians(center_lat)), 1e-6)
+    ix = math.floor(lon / lon_step)
+    return iy, ix, center_lat, (ix + 0.5) * lon_step
+
+
+def radius_bucket(radius_miles: float) -> float:
+    return round(math.ceil(radius_miles / RADIUS_STEP_MILES - 1e-9) * RADIUS_STEP_MILES, 2)
+
+
+def time_bucket(when: datetime) -> int:
+    return int(when.timestamp() // TIME_BUCKET_SECONDS)
+
+
+def filter_signature(user_preferences: Optional[Dict]) -> Tuple:
+    preferences = user_preferences or {}
+    return (
+        bool(preferences.get("legal_only")),
+        bool(preferences.get("needs_ev_charging")),
+        bool(preferences.get("needs_handicap")),
+    )
+
+
+def select_candidates(database, legality: Dict, lat: float, lon: float, radius_miles: float,
+                      user_preferences: Optional[Dict]) -> Dict[str, np.ndarray]:
+    """Row positions of garages and meters around a cell centre that pass the search filters."""
+    legal_only, needs_ev, needs_handicap = filter_signature(user_preferences)
+    reach = radius_miles + CELL_MARGIN_MILES + radius_miles * ELLIPSOID_SLACK
+
+    garages = database.garages_lots
+    keep = haversine_miles(lat, lon, garages["latitude"], garages["longitude"]) <= reach
+    if legal_only:
+        keep &= legality["garages_lots"]["legal"]
+    if needs_ev:
+        keep &= np.fromiter(("ev_charging" in f for f in garages["features"]), dtype=bool, count=len(garages))
+    if needs_handicap:
+        keep &= np.fromiter(("handicap_accessible" in f for f in garages["features"]), dtype=bool, count=len(garages))
+
+    meters = database.parking_meters
+    meter_keep = haversine_miles(lat, lon, meters["latitude"], meters["longitude"]) <= reach
+    meter_keep &= (meters["operational_status"] == "active").to_numpy()
+    if legal_only:
+        meter_keep &= legality["meters"]["legal"]
+
+    return {"garages_lots": np.flatnonzero(keep), "meters": np.flatnonzero(meter_keep)}
+
+
+class SearchCellCache:
+    """Shared LRU of candidate sets keyed by grid cell, radius bucket, filters and time bucket, with a TTL."""
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_ENTRIES, ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, np.ndarray]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def candidates(self, database, legality: Dict, lat: float, lon: float, radius_miles: float,
+                   user_preferences: Optional[Dict], when: datetime, stay_hours: float) -> Dict[str, np.ndarray]:
+        iy, ix, center_lat, center_lon = cell_of(lat, lon)
+        bucket = radius_bucket(radius_miles)
+        key = (database.inventory_version, iy, ix, bucket, filter_signature(user_preferences),
+               time_bucket(when), stay_hours)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        found = select_candidates(database, legality, center_lat, center_lon, bucket, user_preferences)
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, found)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
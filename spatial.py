@@ -0,0 +1,21 @@
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.7613
+
+
+def haversine_miles(lat: float, lon: float, lats, lons) -> np.ndarray:
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def haversine_matrix_miles(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """len(lats1) x len(lats2) great-circle distances, one broadcast pass."""
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
@@ -0,0 +1,195 @@
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (name, seconds per bucket, buckets kept): 5-minute for 7 days, hourly for 90 days, daily for 2 years.
+TIERS = (("5min", 300, 7 * 24 * 12), ("hourly", 3600, 90 * 24), ("daily", 86400, 2 * 365))
+CHANNELS = ("occupancy", "predicted", "reported")
+
+# How a community report reads as availability; out-of-order says nothing about space.
+STATUS_AVAILABILITY = {"available": 1.0, "limited": 0.5, "full": 0.0}
+
+SAMPLE_INTERVAL = 300
+INITIAL_CAPACITY = 64
+
+
+class _Tier:
+    """One resolution: per-(channel, location, bucket) sums and counts in ring buffers sharing a bucket clock."""
+
+    def __init__(self, name: str, resolution: int, slots: int, capacity: int):
+        self.name = name
+        self.resolution = resolution
+        self.slots = slots
+        self.sums = np.zeros((len(CHANNELS), capacity, slots), dtype=np.float32)
+        self.counts = np.zeros((len(CHANNELS), capacity, slots), dtype=np.uint32)
+        # Absolute bucket number each ring column currently holds; -1 = never written.
+        self.buckets = np.full(slots, -1, dtype=np.int64)
+
+    def grow(self, capacity: int):
+        extra = capacity - self.sums.shape[1]
+        self.sums = np.concatenate([self.sums, np.zeros((len(CHANNELS), extra, self.slots), np.float32)], axis=1)
+        self.counts = np.concatenate([self.counts, np.zeros((len(CHANNELS), extra, self.slots), np.uint32)], axis=1)
+
+    def add(self, channel: int, rows: np.ndarray, values: np.ndarray, timestamps: np.ndarray):
+        bucket = (timestamps // self.resolution).astype(np.int64)
+        column = bucket % self.slots
+        latest = self.buckets.copy()
+        np.maximum.at(latest, column, bucket)
+        # A column moving on to a newer bucket drops what it held; samples older than the ring are ignored.
+        recycled = latest != self.buckets
+        if recycled.any():
+            self.sums[:, :, recycled] = 0
+            self.counts[:, :, recycled] = 0
+            self.buckets = latest
+        keep = bucket == latest[column]
+        np.add.at(self.sums[channel], (rows[keep], column[keep]), values[keep])
+        np.add.at(self.counts[channel], (rows[keep], column[keep]), 1)
+
+    def span_seconds(self) -> int:
+        return self.resolution * self.slots
+
+    def range(self, channel: int, rows: np.ndarray, start: float, end: float) -> Tuple[np.ndarray, np.ndarray]:
+        first, last = int(start // self.resolution), int(end // self.resolution)
+        first = max(first, last - self.slots + 1)
+        wanted = np.arange(first, last + 1, dtype=np.int64)
+        columns = wanted % self.slots
+        held = self.buckets[columns] == wanted
+        sums = self.sums[channel][rows][:, columns]
+        counts = self.counts[channel][rows][:, columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(held[None, :] & (counts > 0), sums / counts, np.nan)
+        return wanted * self.resolution, means
+
+
+class TimeSeriesStore:
+    """Fixed-size availability history per location, downsampled into 5-minute, hourly and daily tiers.
+
+    Every sample is folded into all tiers at once, so coarser tiers are running means of the finer ones and
+    memory stays at (channels x locations x buckets) no matter how long the app runs.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.tiers = [_Tier(name, resolution, slots, capacity) for name, resolution, slots in TIERS]
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.samples = 0
+
+    def _row_indices(self, location_ids: Sequence[str], create: bool) -> np.ndarray:
+        rows = np.empty(len(location_ids), dtype=np.int64)
+        for i, location_id in enumerate(location_ids):
+            row = self._rows.get(location_id)
+            if row is None:
+                if not create:
+                    row = -1
+                else:
+                    row = self._rows[location_id] = len(self._rows)
+            rows[i] = row
+        capacity = self.tiers[0].sums.shape[1]
+        if len(self._rows) > capacity:
+            capacity = max(len(self._rows), capacity * 2)
+            for tier in self.tiers:
+                tier.grow(capacity)
+        return rows
+
+    def record(self, channel: str, location_ids: Sequence[str], values: Iterable[float], timestamps):
+        """Add samples for many locations; `timestamps` is one epoch-seconds value or one per sample."""
+        values = np.asarray(values, dtype=np.float32)
+        keep = ~np.isnan(values)
+        if not keep.any():
+            return
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.float64), values.shape)[keep]
+        location_ids = [location_id for location_id, ok in zip(location_ids, keep) if ok]
+        with self._lock:
+            rows = self._row_indices(location_ids, create=True)
+            for tier in self.tiers:
+                tier.add(CHANNELS.index(channel), rows, values[keep], timestamps)
+            self.samples += len(rows)
+
+    def pick_tier(self, start: float, now: Optional[float] = None) -> "_Tier":
+        """Finest tier that still reaches back to `start`."""
+        age = (now or time.time()) - start
+        for tier in self.tiers:
+            if age <= tier.span_seconds():
+                return tier
+        return self.tiers[-1]
+
+    def query(self, channel: str, location_ids: Sequence[str], start: float, end: Optional[float] = None,
+              tier: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(bucket start times, len(location_ids) x buckets matrix of means); NaN where nothing was recorded."""
+        end = end or time.time()
+        chosen = next((t for t in self.tiers if t.name == tier), None) if tier else self.pick_tier(start)
+        if chosen is None:
+            raise ValueError(f"Unknown tier {tier!r}; expected one of {[t.name for t in self.tiers]}")
+        with self._lock:
+            rows = self._row_indices(location_ids, create=False)
+            known = rows >= 0
+            times, means = chosen.range(CHANNELS.index(channel), np.where(known, rows, 0), start, end)
+        means[~known] = np.nan
+        return times.astype("datetime64[s]"), means
+
+    def frame(self, channel: str, location_ids: Sequence[str], start: float, end: Optional[float] = None,
+              tier: Optional[str] = None) -> pd.DataFrame:
+        times, means = self.query(channel, location_ids, start, end, tier)
+        return pd.DataFrame(means.T, index=pd.DatetimeIndex(times, name="time"), columns=list(location_ids))
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [{
+                "tier": tier.name,
+                "resolution_s": tier.resolution,
+                "retention_days": round(tier.span_seconds() / 86400, 1),
+                "buckets_filled": int((tier.buckets >= 0).sum()),
+                "locations": len(self._rows),
+                "memory_mb": round((tier.sums.nbytes + tier.counts.nbytes) / 1024 / 1024, 2),
+            } for tier in self.tiers]
+
+
+def record_report_rows(history: TimeSeriesStore, rows: Iterable[Tuple[str, str, float]]):
+    """Fold (location_id, status, epoch seconds) report rows into the `reported` channel."""
+    rows = [(location_id, STATUS_AVAILABILITY[status], ts) for location_id, status, ts in rows
+            if status in STATUS_AVAILABILITY]
+    if rows:
+        ids, values, stamps = zip(*rows)
+        history.record("reported", ids, values, stamps)
+
+
+class OccupancySampler:
+    """Records garage occupancy into the history every `interval` seconds, off the request path."""
+
+    def __init__(self, history: TimeSeriesStore, source: Callable[[], object], interval: float = SAMPLE_INTERVAL):
+        self.history = history
+        self.source = source
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self):
+        database = self.source()
+        with database.lock:
+            garages = database.garages_lots
+            ids = garages["id"].tolist()
+            available = garages["available_spots"].to_numpy(dtype=np.float64)
+            total = garages["total_spots"].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            occupancy = np.where(total > 0, 1 - available / total, np.nan)
+        self.history.record("occupancy", ids, occupancy, time.time())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                traceback.print_exc()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="philaspot-history", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
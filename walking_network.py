@@ -0,0 +1,438 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+OSM_EXTRACT_PATH = os.environ.get("PHILASPOT_OSM_EXTRACT", os.path.join("data", "philadelphia.osm"))
+CACHE_DIR = os.environ.get("PHILASPOT_CACHE_DIR", os.path.join("data", "cache"))
+
+WALK_SPEED_MPH = 3.0
+METERS_PER_MILE = 1609.344
+WALK_SPEED_M_PER_MIN = WALK_SPEED_MPH * METERS_PER_MILE / 60
+EARTH_RADIUS_M = 6371008.8
+
+ISOCHRONE_BANDS = (5, 10, 15)
+# Isochrones are drawn as the union of grid cells this size around the walked streets.
+ISOCHRONE_CELL_M = 60.0
+CUTOFF_MINUTES = 45
+
+# Ways pedestrians can use. Motorways (I-676, I-76, I-95) and anything tagged
+# foot=no are left out, which is what makes river and rail-yard detours show up.
+WALKABLE_HIGHWAYS = {
+    "footway", "pedestrian", "path", "steps", "living_street", "residential",
+    "service", "unclassified", "tertiary", "tertiary_link", "secondary",
+    "secondary_link", "primary", "primary_link", "trunk", "trunk_link",
+    "track", "cycleway", "corridor", "crossing", "road",
+}
+BLOCKED_ACCESS = {"no", "private"}
+
+
+def _local_xy(lats, lons, ref_lat: float) -> Tuple[np.ndarray, np.ndarray]:
+    lat_r = np.radians(np.asarray(lats, dtype=np.float64))
+    lon_r = np.radians(np.asarray(lons, dtype=np.float64))
+    x = EARTH_RADIUS_M * lon_r * math.cos(math.radians(ref_lat))
+    y = EARTH_RADIUS_M * lat_r
+    return x, y
+
+
+def _haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def _walked_points(network: "WalkingNetwork", times: np.ndarray, band: float, spacing_m: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Points every `spacing_m` along the stretch of each edge walkable within `band` minutes."""
+    src = np.repeat(np.arange(network.node_count), np.diff(network.indptr))
+    start = times[src]
+    use = start <= band
+    src, dst, length = src[use], network.indices[use], network.lengths_m[use]
+    covered = np.minimum(length, (band - start[use]) * WALK_SPEED_M_PER_MIN)
+    steps = np.ceil(covered / spacing_m).astype(np.int64) + 1
+    edge = np.repeat(np.arange(len(src)), steps)
+    k = np.arange(len(edge)) - np.repeat(np.cumsum(steps) - steps, steps)
+    frac = k / np.maximum(steps - 1, 1)[edge] * (covered / np.maximum(length, 1e-9))[edge]
+    u, v = src[edge], dst[edge]
+    reached = np.flatnonzero(times <= band)
+    lats = np.concatenate([network.lats[u] + frac * (network.lats[v] - network.lats[u]), network.lats[reached]])
+    lons = np.concatenate([network.lons[u] + frac * (network.lons[v] - network.lons[u]), network.lons[reached]])
+    return lats, lons
+
+
+def _cell_outline(lats: np.ndarray, lons: np.ndarray, cell_m: float = ISOCHRONE_CELL_M) -> List[List[List[float]]]:
+    """Outer rings, as [lat, lon] lists, of the union of the grid cells holding the points and their neighbours.
+
+    Unlike a convex hull this follows the streets: a river or rail yard the network goes around stays outside.
+    """
+    if len(lats) == 0:
+        return []
+    ref_lat = float(np.mean(lats))
+    x, y = _local_xy(lats, lons, ref_lat)
+    col = np.floor(x / cell_m).astype(np.int64)
+    row = np.floor(y / cell_m).astype(np.int64)
+    # Two empty cells of margin: one for the dilation, one so every occupied cell has all four neighbours.
+    col0, row0 = col.min() - 2, row.min() - 2
+    cells = np.zeros((row.max() - row0 + 3, col.max() - col0 + 3), dtype=bool)
+    cells[row - row0, col - col0] = True
+    grown = cells.copy()
+    grown[1:] |= cells[:-1]
+    grown[:-1] |= cells[1:]
+    cells = grown.copy()
+    cells[:, 1:] |= grown[:, :-1]
+    cells[:, :-1] |= grown[:, 1:]
+
+    # Counter-clockwise boundary edges between (row, col) corners; edges shared by two cells never appear.
+    r, c = np.nonzero(cells)
+    edges: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for side, (dr, dc), start, end in (
+        ("bottom", (-1, 0), (0, 0), (0, 1)), ("right", (0, 1), (0, 1), (1, 1)),
+        ("top", (1, 0), (1, 1), (1, 0)), ("left", (0, -1), (1, 0), (0, 0)),
+    ):
+        open_side = ~cells[r + dr, c + dc]
+        for rr, cc in zip(r[open_side].tolist(), c[open_side].tolist()):
+            edges.setdefault((rr + start[0], cc + start[1]), []).append((rr + end[0], cc + end[1]))
+
+    rings = []
+    while edges:
+        first = next(iter(edges))
+        ring = [first]
+        corner = first
+        while True:
+            following = edges[corner]
+            nxt = following.pop()
+            if not following:
+                del edges[corner]
+            if nxt == first:
+                break
+            ring.append(nxt)
+            corner = nxt
+        # Drop corners in the middle of straight runs.
+        ring = [p for i, p in enumerate(ring)
+                if (p[0] - ring[i - 1][0], p[1] - ring[i - 1][1]) != (ring[(i + 1) % len(ring)][0] - p[0],
+                                                                        ring[(i + 1) % len(ring)][1] - p[1])]
+        area = sum(a[1] * b[0] - b[1] * a[0] for a, b in zip(ring, ring[1:] + ring[:1]))
+        if area > 0:
+            rings.append(ring)
+
+    scale = math.cos(math.radians(ref_lat))
+    return [[[math.degrees((rr + row0) * cell_m / EARTH_RADIUS_M),
+              math.degrees((cc + col0) * cell_m / (EARTH_RADIUS_M * scale))] for rr, cc in ring] for ring in rings]
+
+
+class _SnapGrid:
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_m: float = 250.0):
+        self.ref_lat = float(np.mean(lats)) if len(lats) else 0.0
+        self.cell_m = cell_m
+        self.x, self.y = _local_xy(lats, lons, self.ref_lat)
+        cx = np.floor(self.x / cell_m).astype(np.int64)
+        cy = np.floor(self.y / cell_m).astype(np.int64)
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+        order = np.lexsort((cy, cx))
+        keys = np.stack([cx[order], cy[order]], axis=1)
+        if len(order):
+            breaks = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, breaks):
+                self.cells[(int(cx[chunk[0]]), int(cy[chunk[0]]))] = chunk
+
+    def nearest(self, lat: float, lon: float, max_rings: int = 8) -> Tuple[int, float]:
+        px, py = _local_xy([lat], [lon], self.ref_lat)
+        px, py = float(px[0]), float(py[0])
+        cx, cy = int(math.floor(px / self.cell_m)), int(math.floor(py / self.cell_m))
+        best, best_d = -1, math.inf
+        for ring in range(max_rings + 1):
+            for dx in range(-ring, ring + 1):
+                for dy in range(-ring, ring + 1):
+                    if max(abs(dx), abs(dy)) != ring:
+                        continue
+                    idx = self.cells.get((cx + dx, cy + dy))
+                    if idx is None:
+                        continue
+                    d = np.hypot(self.x[idx] - px, self.y[idx] - py)
+                    j = int(np.argmin(d))
+                    if d[j] < best_d:
+                        best, best_d = int(idx[j]), float(d[j])
+            # Anything in a further ring is at least ring * cell_m away.
+            if best >= 0 and best_d <= ring * self.cell_m:
+                break
+        return best, best_d
+
+
+class WalkingNetwork:
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, indptr: np.ndarray, indices: np.ndarray, lengths_m: np.ndarray):
+        self.lats = lats
+        self.lons = lons
+        self.indptr = indptr
+        self.indices = indices
+        self.lengths_m = lengths_m
+        self._grid = _SnapGrid(lats, lons)
+        # Plain lists are much faster than NumPy scalars inside the Dijkstra loop.
+        self._indptr_list = indptr.tolist()
+        self._indices_list = indices.tolist()
+        self._lengths_list = lengths_m.tolist()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lats)
+
+    @classmethod
+    def from_osm(cls, path: str) -> "WalkingNetwork":
+        coords: Dict[int, Tuple[float, float]] = {}
+        ways: List[List[int]] = []
+        way_nodes: List[int] = []
+        way_tags: Dict[str, str] = {}
+
+        for _, elem in ET.iterparse(path, events=("end",)):
+            tag = elem.tag
+            if tag == "node":
+                coords[int(elem.get("id"))] = (float(elem.get("lat")), float(elem.get("lon")))
+                way_nodes, way_tags = [], {}
+                elem.clear()
+            elif tag == "nd":
+                way_nodes.append(int(elem.get("ref")))
+            elif tag == "tag":
+                way_tags[elem.get("k")] = elem.get("v")
+            elif tag == "way":
+                if cls._is_walkable(way_tags) and len(way_nodes) > 1:
+                    ways.append(way_nodes)
+                way_nodes, way_tags = [], {}
+                elem.clear()
+            elif tag == "relation":
+                way_nodes, way_tags = [], {}
+                elem.clear()
+
+        node_index: Dict[int, int] = {}
+        edges_u: List[int] = []
+        edges_v: List[int] = []
+        for way in ways:
+            refs = [ref for ref in way if ref in coords]
+            for a, b in zip(refs, refs[1:]):
+                if a == b:
+                    continue
+                edges_u.append(node_index.setdefault(a, len(node_index)))
+                edges_v.append(node_index.setdefault(b, len(node_index)))
+
+        lats = np.empty(len(node_index), dtype=np.float64)
+        lons = np.empty(len(node_index), dtype=np.float64)
+        for osm_id, idx in node_index.items():
+            lats[idx], lons[idx] = coords[osm_id]
+
+        u = np.asarray(edges_u, dtype=np.int64)
+        v = np.asarray(edges_v, dtype=np.int64)
+        lengths = _haversine_m(lats[u], lons[u], lats[v], lons[v])
+        return cls._from_edges(lats, lons, u, v, lengths)
+
+    @staticmethod
+    def _is_walkable(tags: Dict[str, str]) -> bool:
+        if tags.get("highway") not in WALKABLE_HIGHWAYS:
+            return False
+        if tags.get("foot") in BLOCKED_ACCESS:
+            return False
+        if tags.get("access") in BLOCKED_ACCESS and tags.get("foot") not in ("yes", "designated", "permissive"):
+            return False
+        return True
+
+    @classmethod
+    def _from_edges(cls, lats, lons, u, v, lengths) -> "WalkingNetwork":
+        # Walking is undirected: store both directions in one CSR adjacency.
+        src = np.concatenate([u, v])
+        dst = np.concatenate([v, u])
+        w = np.concatenate([lengths, lengths])
+        order = np.argsort(src, kind="stable")
+        src, dst, w = src[order], dst[order], w[order]
+        indptr = np.zeros(len(lats) + 1, dtype=np.int64)
+        np.add.at(indptr, src + 1, 1)
+        np.cumsum(indptr, out=indptr)
+        return cls(lats, lons, indptr, dst.astype(np.int64), w.astype(np.float64))
+
+    def snap(self, lat: float, lon: float) -> Tuple[int, float]:
+        return self._grid.nearest(lat, lon)
+
+    def shortest_minutes(self, source: int, cutoff_minutes: float = CUTOFF_MINUTES,
+                         targets: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        cutoff_m = cutoff_minutes * WALK_SPEED_M_PER_MIN
+        remaining = set(targets) if targets is not None else None
+        indptr, indices, lengths = self._indptr_list, self._indices_list, self._lengths_list
+        dist = {source: 0.0}
+        settled: Dict[int, float] = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = d
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+            for k in range(indptr[node], indptr[node + 1]):
+                nd = d + lengths[k]
+                if nd > cutoff_m:
+                    continue
+                nxt = indices[k]
+                if nd < dist.get(nxt, math.inf):
+                    dist[nxt] = nd
+                    heapq.heappush(heap, (nd, nxt))
+        return {node: d / WALK_SPEED_M_PER_MIN for node, d in settled.items()}
+
+    def many_to_many(self, origins: List[Tuple[float, float]], targets: List[Tuple[float, float]],
+                     cutoff_minutes: float = CUTOFF_MINUTES) -> np.ndarray:
+        target_snaps = [self.snap(lat, lon) for lat, lon in targets]
+        target_nodes = {node for node, _ in target_snaps if node >= 0}
+        result = np.full((len(origins), len(targets)), np.nan, dtype=np.float32)
+        by_origin_node: Dict[int, List[Tuple[int, float]]] = {}
+        for i, (lat, lon) in enumerate(origins):
+            node, offset = self.snap(lat, lon)
+            if node >= 0:
+                by_origin_node.setdefault(node, []).append((i, offset))
+
+        for node, rows in by_origin_node.items():
+            minutes = self.shortest_minutes(node, cutoff_minutes, targets=target_nodes)
+            for j, (t_node, t_offset) in enumerate(target_snaps):
+                if t_node < 0 or t_node not in minutes:
+                    continue
+                for i, offset in rows:
+                    result[i, j] = minutes[t_node] + (offset + t_offset) / WALK_SPEED_M_PER_MIN
+        return result
+
+
+class WalkTimeIndex:
+    """Walk times from every destination to every parking spot, precomputed on the network."""
+
+    def __init__(self, spot_ids: List[str], minutes: Dict[str, np.ndarray],
+                 isochrones: Dict[str, Dict[int, List[List[List[float]]]]]):
+        self.spot_ids = spot_ids
+        self.minutes = minutes
+        self.isochrones = isochrones
+        self._position = {spot_id: i for i, spot_id in enumerate(spot_ids)}
+        self._lookup_cache: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def build(cls, network: WalkingNetwork, destinations: Dict[str, Dict], spots: Dict[str, Tuple[float, float]],
+              bands: Tuple[int, ...] = ISOCHRONE_BANDS, cutoff_minutes: float = CUTOFF_MINUTES) -> "WalkTimeIndex":
+        spot_ids = list(spots)
+        spot_snaps = [network.snap(*spots[spot_id]) for spot_id in spot_ids]
+        minutes: Dict[str, np.ndarray] = {}
+        isochrones: Dict[str, Dict[int, List[List[List[float]]]]] = {}
+
+        for name, info in destinations.items():
+            node, offset = network.snap(info["lat"], info["lon"])
+            row = np.full(len(spot_ids), np.nan, dtype=np.float32)
+            if node < 0:
+                # No network node within snapping range: unreachable, not a walk from node -1 (the last node).
+                minutes[name] = row
+                isochrones[name] = {band: [] for band in bands}
+                continue
+            reached = network.shortest_minutes(node, cutoff_minutes)
+            for j, (spot_node, spot_offset) in enumerate(spot_snaps):
+                if spot_node >= 0 and spot_node in reached:
+                    row[j] = reached[spot_node] + (offset + spot_offset) / WALK_SPEED_M_PER_MIN
+            minutes[name] = row
+
+            times = np.full(network.node_count, np.inf)
+            times[np.fromiter(reached.keys(), dtype=np.int64, count=len(reached))] = list(reached.values())
+            isochrones[name] = {
+                band: _cell_outline(*_walked_points(network, times, band, ISOCHRONE_CELL_M / 2)) for band in bands
+            }
+
+        return cls(spot_ids, minutes, isochrones)
+
+    def lookup(self, destination: str) -> Dict[str, float]:
+        if destination not in self._lookup_cache:
+            row = self.minutes.get(destination)
+            if row is None:
+                return {}
+            self._lookup_cache[destination] = {
+                spot_id: float(value) for spot_id, value in zip(self.spot_ids, row.tolist()) if not math.isnan(value)
+            }
+        return self._lookup_cache[destination]
+
+    def walk_minutes(self, destination: str, spot_ids: List[str]) -> np.ndarray:
+        row = self.minutes.get(destination)
+        out = np.full(len(spot_ids), np.nan, dtype=np.float32)
+        if row is None:
+            return out
+        for i, spot_id in enumerate(spot_ids):
+            j = self._position.get(spot_id)
+            if j is not None:
+                out[i] = row[j]
+        return out
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        names = list(self.minutes)
+        np.savez_compressed(
+            path,
+            spot_ids=np.asarray(self.spot_ids),
+            destinations=np.asarray(names),
+            minutes=np.stack([self.minutes[n] for n in names]) if names else np.zeros((0, len(self.spot_ids)), np.float32),
+            isochrones=np.asarray(json.dumps(self.isochrones)),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "WalkTimeIndex":
+        with np.load(path, allow_pickle=False) as data:
+            spot_ids = data["spot_ids"].tolist()
+            names = data["destinations"].tolist()
+            minutes = {name: data["minutes"][i] for i, name in enumerate(names)}
+            raw = json.loads(str(data["isochrones"]))
+        isochrones = {name: {int(band): rings for band, rings in bands.items()} for name, bands in raw.items()}
+        return cls(spot_ids, minutes, isochrones)
+
+
+def _cache_key(osm_path: str, destinations: Dict[str, Dict], spots: Dict[str, Tuple[float, float]],
+               bands: Tuple[int, ...], cutoff_minutes: float) -> str:
+    stat = os.stat(osm_path)
+    digest = hashlib.sha1()
+    digest.update(f"{os.path.abspath(osm_path)}|{stat.st_size}|{stat.st_mtime_ns}|{bands}|{cutoff_minutes}|"
+                  f"{ISOCHRONE_CELL_M}".encode())
+    for name in sorted(destinations):
+        digest.update(f"{name}|{destinations[name]['lat']:.6f}|{destinations[name]['lon']:.6f}".encode())
+    for spot_id in sorted(spots):
+        lat, lon = spots[spot_id]
+        digest.update(f"{spot_id}|{lat:.6f}|{lon:.6f}".encode())
+    return digest.hexdigest()[:16]
+
+
+def load_walk_time_index(destinations: Dict[str, Dict], spots: Dict[str, Tuple[float, float]],
+                         osm_path: str = OSM_EXTRACT_PATH, cache_dir: str = CACHE_DIR,
+                         bands: Tuple[int, ...] = ISOCHRONE_BANDS,
+                         cutoff_minutes: float = CUTOFF_MINUTES) -> Optional[WalkTimeIndex]:
+    if not os.path.exists(osm_path):
+        return None
+
+    cache_path = os.path.join(cache_dir, f"walk_times_{_cache_key(osm_path, destinations, spots, bands, cutoff_minutes)}.npz")
+    if os.path.exists(cache_path):
+        return WalkTimeIndex.load(cache_path)
+
+    network = WalkingNetwork.from_osm(osm_path)
+    index = WalkTimeIndex.build(network, destinations, spots, bands, cutoff_minutes)
+    index.save(cache_path)
+    return index
+
+
+def straight_line_minutes(distance_miles: float) -> float:
+    return distance_miles * 60 / WALK_SPEED_MPH
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Walking-network shortest paths from a local OSM extract")
+    parser.add_argument("--osm", default=OSM_EXTRACT_PATH)
+    parser.add_argument("--from", dest="origin", required=True, help="lat,lon")
+    parser.add_argument("--to", dest="targets", nargs="+", required=True, help="lat,lon [lat,lon ...]")
+    args = parser.parse_args()
+
+    def parse_point(text: str) -> Tuple[float, float]:
+        lat, lon = text.split(",")
+        return float(lat), float(lon)
+
+    network = WalkingNetwork.from_osm(args.osm)
+    matrix = network.many_to_many([parse_point(args.origin)], [parse_point(t) for t in args.targets])
+    for target, value in zip(args.targets, matrix[0]):
+        print(f"{target}\t{'unreachable' if np.isnan(value) else f'{value:.1f} min'}")